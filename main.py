@@ -241,9 +241,9 @@ def main(organization, config, output, output_formats, verbose, validate_config,
 
                 # Create data processor and inject dummy data (convert lists to dictionaries)
                 data_processor = EntitlementDataProcessor(auth, config=app_config.reports)
-                data_processor.users = {user.descriptor: user for user in users}
-                data_processor.groups = {group.descriptor: group for group in groups}
-                data_processor.entitlements = {ent.user_descriptor: ent for ent in entitlements}
+                data_processor.users, data_processor.groups, data_processor.entitlements = (
+                    dummy_generator.get_indexed()
+                )
                 data_processor.memberships = memberships
 
                 logger.info(f"Loaded {len(users)} users, {len(groups)} groups, "
@@ -296,7 +296,9 @@ def main(organization, config, output, output_formats, verbose, validate_config,
                 click.echo("[STEP 4/4] Generating reports...")
                 report_generator = ReportGenerator(
                     app_config.output.directory,
-                    include_timestamp=app_config.output.include_timestamp
+                    include_timestamp=app_config.output.include_timestamp,
+                    mmap_excel_output=app_config.output.mmap_excel_output,
+                    split_excel_sheets=app_config.output.split_excel_sheets
                 )
                 generated_files = report_generator.generate_all_reports(
                     organization_report,
@@ -349,8 +351,7 @@ def main(organization, config, output, output_formats, verbose, validate_config,
                 app_config.output.directory,
                 include_timestamp=app_config.output.include_timestamp
             )
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = consolidated_generator.timestamp
 
             # Generate consolidated user report
             consolidated_user_file = consolidated_generator.generate_consolidated_user_report(
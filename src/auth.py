@@ -4,20 +4,120 @@ Azure DevOps Authentication Module
 Handles Personal Access Token (PAT) authentication for Azure DevOps APIs.
 """
 
-import base64
 import os
-from typing import Optional
+import time
+import hashlib
+import threading
+from typing import Dict, Optional, Tuple
 import logging
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import requests
-from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from pybase64 import b64encode
+except ImportError:  # pragma: no cover - depends on installed packages
+    from base64 import b64encode
 
 
 logger = logging.getLogger(__name__)
 
+# Connections kept per host by each shared adapter; bounds concurrent requests
+SESSION_POOL_MAXSIZE = 50
+
+# Sessions are shared by every AzureDevOpsAuth with the same token,
+# organization and retry count, and all of them reuse one connection pool per
+# host, so TLS handshakes are paid once per host rather than once per auth
+# object. There is one adapter per retry count; it is mounted once, when a
+# session is created, so one client cannot change another's retry or pool
+# settings.
+_ADAPTERS: Dict[int, HTTPAdapter] = {}
+# Oldest sessions are dropped once the cache is full, so a long-running process
+# does not keep the Authorization header of every token it has seen
+_SESSION_CACHE_MAXSIZE = 16
+_SESSION_CACHE: Dict[Tuple[str, str, int], requests.Session] = {}
+_SESSION_CACHE_LOCK = threading.Lock()
+
+# Definitive token validation results (200 or 401), keyed by token digest and
+# validation URL, with the monotonic time they were recorded. Expired and then
+# oldest entries are dropped once the cache is full.
+_TOKEN_VALIDATION_TTL = 300
+_TOKEN_VALIDATION_CACHE_MAXSIZE = 256
+_TOKEN_VALIDATION_CACHE: Dict[Tuple[str, str], Tuple[bool, float]] = {}
+_TOKEN_VALIDATION_CACHE_LOCK = threading.Lock()
+
+
+def clear_session_cache() -> None:
+    """
+    Drop all shared sessions and close their pooled connections.
+
+    Auth objects that already hold a session keep working; their next request
+    opens a new connection.
+    """
+    with _SESSION_CACHE_LOCK:
+        _SESSION_CACHE.clear()
+        for adapter in _ADAPTERS.values():
+            adapter.close()
+        _ADAPTERS.clear()
+
+
+def _cache_token_validation(key: Tuple[str, str], valid: bool) -> None:
+    """
+    Record a token validation result, evicting entries if the cache is full.
+
+    Args:
+        key: Token digest and validation URL
+        valid: Whether the token was accepted
+    """
+    now = time.monotonic()
+    with _TOKEN_VALIDATION_CACHE_LOCK:
+        if key not in _TOKEN_VALIDATION_CACHE and len(_TOKEN_VALIDATION_CACHE) >= _TOKEN_VALIDATION_CACHE_MAXSIZE:
+            expired = [
+                cached_key for cached_key, (_, recorded) in _TOKEN_VALIDATION_CACHE.items()
+                if now - recorded >= _TOKEN_VALIDATION_TTL
+            ]
+            for cached_key in expired:
+                del _TOKEN_VALIDATION_CACHE[cached_key]
+            if len(_TOKEN_VALIDATION_CACHE) >= _TOKEN_VALIDATION_CACHE_MAXSIZE:
+                del _TOKEN_VALIDATION_CACHE[next(iter(_TOKEN_VALIDATION_CACHE))]
+        _TOKEN_VALIDATION_CACHE[key] = (valid, now)
+
+
+def _get_adapter(max_retries: int) -> HTTPAdapter:
+    """
+    Get the shared adapter for a retry count, creating it if needed.
+
+    Must be called with _SESSION_CACHE_LOCK held.
 
-@dataclass
+    Args:
+        max_retries: Maximum number of retries for failed requests
+
+    Returns:
+        Pooled HTTP adapter retrying failed requests up to max_retries times
+    """
+    adapter = _ADAPTERS.get(max_retries)
+    if adapter is None:
+        # 429 is left to the API client, which backs off with jitter and
+        # honours Retry-After; retrying it here as well would multiply attempts.
+        # urllib3 retries any 429 with a Retry-After header unless told not to.
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=SESSION_POOL_MAXSIZE,
+            max_retries=Retry(
+                total=max_retries,
+                status_forcelist=[500, 502, 503, 504],
+                allowed_methods=["HEAD", "GET", "OPTIONS"],
+                backoff_factor=1,
+                respect_retry_after_header=False
+            )
+        )
+        _ADAPTERS[max_retries] = adapter
+    return adapter
+
+
+@dataclass(frozen=True)
 class AuthConfig:
     """Configuration for Azure DevOps authentication."""
     pat_token: str
@@ -25,6 +125,37 @@ class AuthConfig:
     base_url: str = "https://dev.azure.com"
     vssps_base_url: str = "https://vssps.dev.azure.com"
     vsaex_base_url: str = "https://vsaex.dev.azure.com"
+    # Organization URLs derived from the fields above
+    core_url: str = field(init=False, repr=False, compare=False)
+    vssps_url: str = field(init=False, repr=False, compare=False)
+    vsaex_url: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        """Join the base URLs with the organization once."""
+        object.__setattr__(self, "core_url", f"{self.base_url}/{self.organization}")
+        object.__setattr__(self, "vssps_url", f"{self.vssps_base_url}/{self.organization}")
+        object.__setattr__(self, "vsaex_url", f"{self.vsaex_base_url}/{self.organization}")
+
+
+def _validate_auth_config(config: AuthConfig) -> None:
+    """
+    Validate an authentication configuration.
+
+    Args:
+        config: Authentication configuration to check
+
+    Raises:
+        ValueError: If the token or organization is missing
+    """
+    pat_token = config.pat_token
+    if not pat_token:
+        raise ValueError("PAT token is required")
+
+    if not config.organization:
+        raise ValueError("Organization name is required")
+
+    if pat_token.isspace():
+        raise ValueError("PAT token cannot be empty or whitespace")
 
 
 class AzureDevOpsAuth:
@@ -43,19 +174,19 @@ class AzureDevOpsAuth:
             config: Authentication configuration containing PAT token and organization
         """
         self.config = config
-        self._session = None
-        self._validate_config()
-
-    def _validate_config(self) -> None:
-        """Validate the authentication configuration."""
-        if not self.config.pat_token:
-            raise ValueError("PAT token is required")
-
-        if not self.config.organization:
-            raise ValueError("Organization name is required")
-
-        if not self.config.pat_token.strip():
-            raise ValueError("PAT token cannot be empty or whitespace")
+        self._sessions: Dict[int, requests.Session] = {}
+        _validate_auth_config(config)
+        # The header only depends on the token, so it is encoded once
+        self._auth_header = self._create_auth_header()
+        # Caches are keyed on a digest so they never hold the raw token
+        self._token_digest = hashlib.blake2b(
+            self.config.pat_token.encode("utf-8"), digest_size=16
+        ).hexdigest()
+        self._organization_urls = {
+            "core": self.config.core_url,
+            "vssps": self.config.vssps_url,
+            "vsaex": self.config.vsaex_url
+        }
 
     def _create_auth_header(self) -> str:
         """
@@ -66,45 +197,73 @@ class AzureDevOpsAuth:
         """
         # Azure DevOps PAT tokens use empty username with token as password
         auth_string = f":{self.config.pat_token}"
-        encoded_auth = base64.b64encode(auth_string.encode()).decode()
+        encoded_auth = b64encode(auth_string.encode("utf-8")).decode("ascii")
         return f"Basic {encoded_auth}"
 
-    def get_session(self) -> requests.Session:
+    def get_session(self, max_retries: int = 3) -> requests.Session:
         """
         Get an authenticated requests session.
 
+        Args:
+            max_retries: Maximum number of retries for failed requests
+
         Returns:
             Configured requests session with authentication headers
         """
-        if self._session is None:
-            self._session = requests.Session()
-            self._session.headers.update({
-                "Authorization": self._create_auth_header(),
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            })
-
-        return self._session
+        session = self._sessions.get(max_retries)
+        if session is None:
+            key = (self._token_digest, self.config.organization, max_retries)
+
+            with _SESSION_CACHE_LOCK:
+                session = _SESSION_CACHE.get(key)
+                if session is None:
+                    session = requests.Session()
+                    session.headers.update({
+                        "Authorization": self._auth_header,
+                        "Content-Type": "application/json",
+                        "Accept": "application/json"
+                    })
+                    adapter = _get_adapter(max_retries)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    if len(_SESSION_CACHE) >= _SESSION_CACHE_MAXSIZE:
+                        del _SESSION_CACHE[next(iter(_SESSION_CACHE))]
+                    _SESSION_CACHE[key] = session
+
+            self._sessions[max_retries] = session
+
+        return session
 
     def validate_token(self) -> bool:
         """
         Validate the PAT token by making a test API call.
 
+        Successful and unauthorized results are cached for a few minutes, so
+        repeated validations of the same token do not hit the API again.
+
         Returns:
             True if token is valid, False otherwise
         """
+        # Test with a simple profile API call
+        test_url = f"{self._organization_urls['vssps']}/_apis/profile/profiles/me"
+        cache_key = (self._token_digest, test_url)
+
+        with _TOKEN_VALIDATION_CACHE_LOCK:
+            cached = _TOKEN_VALIDATION_CACHE.get(cache_key)
+        if cached is not None and time.monotonic() - cached[1] < _TOKEN_VALIDATION_TTL:
+            return cached[0]
+
         try:
             session = self.get_session()
-            # Test with a simple profile API call
-            test_url = f"{self.config.vssps_base_url}/{self.config.organization}/_apis/profile/profiles/me"
-
             response = session.get(test_url, params={"api-version": "6.0"}, timeout=10)
 
             if response.status_code == 200:
                 logger.info("PAT token validation successful")
+                _cache_token_validation(cache_key, True)
                 return True
             elif response.status_code == 401:
                 logger.error("PAT token validation failed: Unauthorized")
+                _cache_token_validation(cache_key, False)
                 return False
             else:
                 logger.warning(f"PAT token validation returned unexpected status: {response.status_code}")
@@ -124,16 +283,10 @@ class AzureDevOpsAuth:
         Returns:
             Complete base URL for the organization and API type
         """
-        base_urls = {
-            "core": self.config.base_url,
-            "vssps": self.config.vssps_base_url,
-            "vsaex": self.config.vsaex_base_url
-        }
-
-        if api_type not in base_urls:
-            raise ValueError(f"Unknown API type: {api_type}")
-
-        return f"{base_urls[api_type]}/{self.config.organization}"
+        try:
+            return self._organization_urls[api_type]
+        except KeyError:
+            raise ValueError(f"Unknown API type: {api_type}") from None
 
 
 class AuthManager:
@@ -155,11 +308,17 @@ class AuthManager:
         Raises:
             ValueError: If required environment variables are missing
         """
-        # Load environment variables from .env file if it exists
-        load_dotenv()
-
-        pat_token = os.getenv("AZURE_DEVOPS_PAT")
-        env_organization = os.getenv("AZURE_DEVOPS_ORGANIZATION")
+        pat_token = os.environ.get("AZURE_DEVOPS_PAT")
+        env_organization = os.environ.get("AZURE_DEVOPS_ORGANIZATION")
+
+        # Load environment variables from .env file if it exists. load_dotenv
+        # never overrides variables that are already set, so the file only
+        # needs to be read when something is still missing.
+        if not pat_token or not (organization or env_organization):
+            from dotenv import load_dotenv
+            load_dotenv()
+            pat_token = os.environ.get("AZURE_DEVOPS_PAT")
+            env_organization = os.environ.get("AZURE_DEVOPS_ORGANIZATION")
 
         # Use provided organization or fall back to environment
         final_organization = organization or env_organization
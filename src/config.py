@@ -5,17 +5,27 @@ Handles loading and validation of YAML configuration files for Azure DevOps repo
 """
 
 import os
+import json
 import logging
+import tempfile
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass, field
 
-import yaml
 from pydantic import BaseModel, Field, field_validator
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on installed packages
+    orjson = None
+
 
 logger = logging.getLogger(__name__)
 
+_URL_SCHEMES = ('http://', 'https://')
+_SUPPORTED_FORMATS = frozenset({"csv", "json", "excel"})
+_VALID_LOG_LEVELS = frozenset({"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"})
+
 
 class ApiConfig(BaseModel):
     """Azure DevOps API configuration settings."""
@@ -30,7 +40,7 @@ class ApiConfig(BaseModel):
     @classmethod
     def validate_urls(cls, v):
         """Validate that URLs are properly formatted."""
-        if not v.startswith(('http://', 'https://')):
+        if not v.startswith(_URL_SCHEMES):
             raise ValueError('URL must start with http:// or https://')
         return v.rstrip('/')
 
@@ -44,15 +54,22 @@ class OutputConfig(BaseModel):
         default=True,
         description="Include timestamp in report filenames. Set to false for static filenames that overwrite."
     )
+    mmap_excel_output: bool = Field(
+        default=False,
+        description="Write Excel workbooks through a memory map. Can be faster on slow or network filesystems."
+    )
+    split_excel_sheets: bool = Field(
+        default=False,
+        description="Write each Excel worksheet to its own workbook file, generated in parallel."
+    )
 
     @field_validator('formats')
     @classmethod
     def validate_formats(cls, v):
         """Validate supported output formats."""
-        supported_formats = {"csv", "json", "excel"}
-        invalid_formats = set(v) - supported_formats
+        invalid_formats = set(v) - _SUPPORTED_FORMATS
         if invalid_formats:
-            raise ValueError(f"Unsupported formats: {invalid_formats}. Supported: {supported_formats}")
+            raise ValueError(f"Unsupported formats: {invalid_formats}. Supported: {set(_SUPPORTED_FORMATS)}")
         return v
 
     @field_validator('directory')
@@ -74,10 +91,10 @@ class LoggingConfig(BaseModel):
     @classmethod
     def validate_log_level(cls, v):
         """Validate logging level."""
-        valid_levels = {"DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"}
-        if v.upper() not in valid_levels:
-            raise ValueError(f"Invalid log level: {v}. Valid levels: {valid_levels}")
-        return v.upper()
+        level = v.upper()
+        if level not in _VALID_LOG_LEVELS:
+            raise ValueError(f"Invalid log level: {v}. Valid levels: {set(_VALID_LOG_LEVELS)}")
+        return level
 
 
 class ReportsConfig(BaseModel):
@@ -114,11 +131,19 @@ class AppConfig(BaseModel):
         return v
 
 
+# Template for configurations that leave everything at its default. Callers
+# get deep copies because the CLI overrides output settings in place.
+_DEFAULT_APP_CONFIG = AppConfig()
+
+
 class ConfigManager:
     """
     Configuration manager for loading and validating YAML configuration files.
     """
 
+    # Rendered default configuration, shared by all instances
+    _default_yaml: Optional[str] = None
+
     def __init__(self, config_path: Optional[Union[str, Path]] = None):
         """
         Initialize configuration manager.
@@ -150,6 +175,9 @@ class ConfigManager:
         """
         Load and validate configuration from YAML file.
 
+        A path ending in ``.json``, such as a config written by
+        compile_config, is parsed with the much faster JSON parser.
+
         Args:
             override_organizations: Organizations to override config file settings
 
@@ -161,12 +189,21 @@ class ConfigManager:
             yaml.YAMLError: If YAML parsing fails
             ValueError: If configuration validation fails
         """
+        # Imported here so that importing the config models stays cheap
+        import yaml
+
         if not self.config_path.exists():
             raise FileNotFoundError(f"Configuration file not found: {self.config_path}")
 
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as file:
-                config_data = yaml.safe_load(file)
+            if self.config_path.suffix == '.json':
+                config_data = self._load_json_config_data()
+            else:
+                # LibYAML's C loader is much faster; fall back to the
+                # pure-Python loader when PyYAML was built without it.
+                loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+                with open(self.config_path, 'r', encoding='utf-8') as file:
+                    config_data = yaml.load(file, Loader=loader)
 
             if config_data is None:
                 config_data = {}
@@ -176,7 +213,10 @@ class ConfigManager:
                 config_data['organizations'] = override_organizations
 
             # Validate and create configuration object
-            self._config = AppConfig(**config_data)
+            if config_data == {}:
+                self._config = _DEFAULT_APP_CONFIG.model_copy(deep=True)
+            else:
+                self._config = AppConfig.model_validate(config_data)
 
             logger.info(f"Configuration loaded successfully from {self.config_path}")
             return self._config
@@ -191,6 +231,55 @@ class ConfigManager:
             logger.error(error_msg)
             raise ValueError(error_msg)
 
+    def _load_json_config_data(self) -> Optional[Dict[str, Any]]:
+        """
+        Parse a JSON configuration file.
+
+        Uses orjson when it is installed and the standard library otherwise.
+
+        Returns:
+            Configuration dictionary, or None if the file is empty
+        """
+        data = self.config_path.read_bytes()
+        if not data.strip():
+            return None
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+
+    def compile_config(self, output_path: Union[str, Path]) -> Path:
+        """
+        Validate the configuration file and write it as JSON.
+
+        The JSON file can be passed as the config path in place of the YAML
+        file and loads without running the YAML parser. It must be recompiled
+        whenever the YAML file changes.
+
+        Args:
+            output_path: Path of the ``.json`` file to create
+
+        Returns:
+            Path to the compiled config file
+
+        Raises:
+            ValueError: If output_path is not a .json file
+        """
+        output_path = Path(output_path)
+        if output_path.suffix != '.json':
+            raise ValueError(f"Compiled config must be a .json file: {output_path}")
+
+        config_data = self.load_config().model_dump(mode='json')
+        if orjson is not None:
+            data = orjson.dumps(config_data, option=orjson.OPT_INDENT_2)
+        else:
+            data = json.dumps(config_data, indent=2).encode('utf-8')
+
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        output_path.write_bytes(data)
+
+        logger.info(f"Compiled configuration written to {output_path}")
+        return output_path
+
     def get_config(self) -> AppConfig:
         """
         Get the current configuration. Loads if not already loaded.
@@ -218,15 +307,13 @@ class ConfigManager:
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        # Create default configuration
-        default_config = AppConfig()
-        config_dict = default_config.model_dump()
-
-        # Add comments to the YAML output
-        yaml_content = self._generate_commented_yaml(config_dict)
+        # The defaults never change, so the commented YAML is rendered once
+        if ConfigManager._default_yaml is None:
+            ConfigManager._default_yaml = self._generate_commented_yaml(
+                _DEFAULT_APP_CONFIG.model_dump()
+            )
 
-        with open(output_path, 'w', encoding='utf-8') as file:
-            file.write(yaml_content)
+        output_path.write_text(ConfigManager._default_yaml, encoding='utf-8')
 
         logger.info(f"Default configuration created at {output_path}")
         return output_path
@@ -302,9 +389,10 @@ class ConfigManager:
             output_dir = Path(config.output.directory)
             try:
                 output_dir.mkdir(parents=True, exist_ok=True)
-                test_file = output_dir / ".test_write"
-                test_file.touch()
-                test_file.unlink()
+                # A uniquely named probe file, so concurrent validations of
+                # the same directory cannot delete each other's probe
+                with tempfile.TemporaryFile(dir=output_dir):
+                    pass
             except (OSError, PermissionError) as e:
                 logger.error(f"Output directory is not writable: {e}")
                 return False
@@ -6,8 +6,8 @@ groups, entitlements, and memberships for chargeback reporting.
 """
 
 import logging
-from collections import defaultdict
-from typing import Dict, List, Optional, Set, Tuple, Any
+from collections import Counter, defaultdict
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple, Any
 from datetime import datetime, timezone
 
 from src.auth import AzureDevOpsAuth
@@ -17,12 +17,25 @@ from src.data_retrieval import (
 )
 from src.models import (
     User, Group, Entitlement, GroupMembership, UserEntitlementSummary,
-    OrganizationReport, AccessLevel, SubjectKind
+    OrganizationReport, AccessLevel, SubjectKind, GroupType
 )
 
 
 logger = logging.getLogger(__name__)
 
+# Group types synced from external directories that are eligible for chargeback
+_CHARGEBACK_GROUP_TYPES = frozenset({GroupType.AZURE_AD, GroupType.WINDOWS})
+
+
+def _new_chargeback_bucket() -> Dict[str, Any]:
+    """Create an empty per-group accumulator for the chargeback analysis."""
+    return {
+        'users': [],
+        'total_users': 0,
+        'licenses': Counter(),
+        'total_cost': 0.0
+    }
+
 
 class EntitlementDataProcessor:
     """
@@ -66,8 +79,13 @@ class EntitlementDataProcessor:
 
         # Processed data
         self.user_summaries: List[UserEntitlementSummary] = []
-        self.group_memberships_map: Dict[str, List[str]] = defaultdict(list)
-        self.user_memberships_map: Dict[str, List[str]] = defaultdict(list)
+        # Values are insertion-ordered dicts used as ordered sets
+        self.group_memberships_map: Dict[str, Dict[str, None]] = defaultdict(dict)
+        self.user_memberships_map: Dict[str, Dict[str, None]] = defaultdict(dict)
+        # Group descriptor -> display name for groups eligible for chargeback
+        self.chargeback_group_index: Dict[str, str] = {}
+        # Group descriptor -> the group and every group it inherits from
+        self.group_closure_cache: Dict[str, FrozenSet[str]] = {}
 
     def retrieve_all_data(self) -> None:
         """
@@ -152,20 +170,16 @@ class EntitlementDataProcessor:
         Build lookup maps for efficient membership queries.
 
         Creates bidirectional maps for group->members and user->groups relationships.
+        Each entry keeps descriptors in first-seen order, ignoring duplicate memberships.
         """
-        self.group_memberships_map.clear()
-        self.user_memberships_map.clear()
+        group_memberships_map = self.group_memberships_map
+        user_memberships_map = self.user_memberships_map
+        group_memberships_map.clear()
+        user_memberships_map.clear()
 
         for membership in self.memberships:
-            # Group -> Members mapping
-            self.group_memberships_map[membership.group_descriptor].append(
-                membership.member_descriptor
-            )
-
-            # User/Member -> Groups mapping
-            self.user_memberships_map[membership.member_descriptor].append(
-                membership.group_descriptor
-            )
+            group_memberships_map[membership.group_descriptor][membership.member_descriptor] = None
+            user_memberships_map[membership.member_descriptor][membership.group_descriptor] = None
 
     def process_user_entitlements(self) -> None:
         """
@@ -182,6 +196,9 @@ class EntitlementDataProcessor:
             logger.debug("Building membership maps from provided data...")
             self._build_membership_maps()
 
+        self._precompute_chargeback_index()
+        self.group_closure_cache = {}
+
         self.user_summaries = []
         skipped_vsts_users = 0
 
@@ -226,8 +243,11 @@ class EntitlementDataProcessor:
             if desc in self.groups
         ]
 
-        # Get all group memberships (including inherited)
-        all_group_descriptors = self._get_all_user_groups(user.descriptor)
+        # Get all group memberships (including inherited); users in the same
+        # groups share the memoized closures instead of re-walking the graph
+        all_group_descriptors = set()
+        for desc in direct_group_descriptors:
+            all_group_descriptors |= self._get_group_closure(desc)
         all_groups = [
             self.groups[desc] for desc in all_group_descriptors
             if desc in self.groups
@@ -237,7 +257,11 @@ class EntitlementDataProcessor:
         effective_access_level = self._calculate_effective_access_level(user, entitlement, all_groups)
 
         # Determine chargeback groups (security groups for cost allocation)
-        chargeback_groups = self._determine_chargeback_groups(direct_groups)
+        chargeback_index = self.chargeback_group_index
+        chargeback_groups = [
+            chargeback_index[desc] for desc in direct_group_descriptors
+            if desc in chargeback_index
+        ]
 
         # Calculate license cost based on license type
         license_cost = self._calculate_license_cost(entitlement)
@@ -255,7 +279,10 @@ class EntitlementDataProcessor:
 
     def _get_all_user_groups(self, user_descriptor: str, visited: Optional[Set[str]] = None) -> Set[str]:
         """
-        Recursively get all group memberships for a user, including inherited ones.
+        Get all group memberships for a user, including inherited ones.
+
+        Walks the membership graph iteratively, so deeply nested groups cannot
+        hit the recursion limit.
 
         Args:
             user_descriptor: User descriptor
@@ -268,21 +295,43 @@ class EntitlementDataProcessor:
             visited = set()
 
         all_groups = set()
-        direct_groups = self.user_memberships_map.get(user_descriptor, [])
+        memberships_map = self.user_memberships_map
+        # Depth-first, visiting groups in the same order as a recursive walk
+        pending = list(reversed(memberships_map.get(user_descriptor, ())))
 
-        for group_descriptor in direct_groups:
+        while pending:
+            group_descriptor = pending.pop()
             if group_descriptor in visited:
                 continue  # Avoid cycles
 
             visited.add(group_descriptor)
             all_groups.add(group_descriptor)
 
-            # Recursively get parent groups
-            parent_groups = self._get_all_user_groups(group_descriptor, visited)
-            all_groups.update(parent_groups)
+            # Parent groups are walked before the remaining siblings
+            pending.extend(reversed(memberships_map.get(group_descriptor, ())))
 
         return all_groups
 
+    def _get_group_closure(self, group_descriptor: str) -> FrozenSet[str]:
+        """
+        Get a group together with every group it inherits from.
+
+        Each closure is computed with a full walk and memoized for the current run,
+        so membership cycles cannot leave a closure incomplete.
+
+        Args:
+            group_descriptor: Group descriptor
+
+        Returns:
+            Frozen set of the group and its inherited group descriptors
+        """
+        closure = self.group_closure_cache.get(group_descriptor)
+        if closure is None:
+            closure = frozenset(self._get_all_user_groups(group_descriptor, {group_descriptor}))
+            closure |= {group_descriptor}
+            self.group_closure_cache[group_descriptor] = closure
+        return closure
+
     def _calculate_effective_access_level(self, user: User, entitlement: Optional[Entitlement],
                                         groups: List[Group]) -> Optional[AccessLevel]:
         """
@@ -317,21 +366,38 @@ class EntitlementDataProcessor:
         Returns:
             List of group names for chargeback
         """
-        chargeback_groups = []
+        return [group.display_name for group in groups if self._is_chargeback_group(group)]
 
-        for group in groups:
-            # Include security groups from external sources (Azure AD, Windows AD)
-            if group.group_type and group.group_type.value in ['azureActiveDirectory', 'windows']:
-                # Exclude built-in/system groups that are auto-created by Azure DevOps
-                if not self._is_system_group(group):
-                    chargeback_groups.append(group.display_name)
-            # Also check if this is marked as a security group (regardless of origin)
-            elif group.is_security_group:
-                # Exclude built-in/system groups
-                if not self._is_system_group(group):
-                    chargeback_groups.append(group.display_name)
+    def _precompute_chargeback_index(self) -> None:
+        """
+        Index the groups eligible for chargeback by descriptor.
 
-        return chargeback_groups
+        Lets user summaries resolve their chargeback groups with dictionary lookups
+        instead of filtering every group a user belongs to.
+        """
+        self.chargeback_group_index = {
+            descriptor: group.display_name
+            for descriptor, group in self.groups.items()
+            if self._is_chargeback_group(group)
+        }
+
+    def _is_chargeback_group(self, group: Group) -> bool:
+        """
+        Check if a group should be used for chargeback purposes.
+
+        Args:
+            group: Group object
+
+        Returns:
+            True if the group is a non-system security group
+        """
+        # Include security groups from external sources (Azure AD, Windows AD)
+        # and anything marked as a security group, regardless of origin
+        if not (group.group_type in _CHARGEBACK_GROUP_TYPES or group.is_security_group):
+            return False
+
+        # Exclude built-in/system groups that are auto-created by Azure DevOps
+        return not self._is_system_group(group)
 
     def _is_vsts_user(self, user: User) -> bool:
         """
@@ -456,23 +522,18 @@ class EntitlementDataProcessor:
         total_entitlements = len(self.entitlements)
 
         # Analyze groups by type
-        groups_by_type = defaultdict(int)
-        orphaned_groups = []
+        groups = self.groups.values()
+        groups_by_type = Counter(group.group_type.value for group in groups if group.group_type)
 
-        for group in self.groups.values():
-            if group.group_type:
-                groups_by_type[group.group_type.value] += 1
-
-            # Check for orphaned groups (no members)
-            if group.member_count == 0:
-                orphaned_groups.append(group)
+        # Check for orphaned groups (no members)
+        orphaned_groups = [group for group in groups if group.member_count == 0]
 
         # Analyze licenses by type (use license_display_name for accurate license tracking)
-        licenses_by_type = defaultdict(int)
-        for entitlement in self.entitlements.values():
-            # Use license_display_name (e.g., "Basic") instead of access_level (e.g., "express")
-            license_type = entitlement.license_display_name or entitlement.access_level.value or 'Unknown'
-            licenses_by_type[license_type] += 1
+        # Use license_display_name (e.g., "Basic") instead of access_level (e.g., "express")
+        licenses_by_type = Counter(
+            entitlement.license_display_name or entitlement.access_level.value or 'Unknown'
+            for entitlement in self.entitlements.values()
+        )
 
         # Calculate total license cost
         total_license_cost = sum(
@@ -507,15 +568,12 @@ class EntitlementDataProcessor:
         Returns:
             Dictionary with chargeback information per group
         """
-        chargeback_analysis = defaultdict(lambda: {
-            'users': [],
-            'total_users': 0,
-            'licenses': defaultdict(int),
-            'total_cost': 0.0
-        })
+        chargeback_analysis = defaultdict(_new_chargeback_bucket)
 
         for summary in self.user_summaries:
-            user_name = summary.user.display_name
+            if not summary.chargeback_groups:
+                continue
+
             access_level = summary.effective_access_level or AccessLevel.NONE
 
             # Get the actual license type from license_display_name (e.g., "Basic")
@@ -526,31 +584,27 @@ class EntitlementDataProcessor:
             elif access_level:
                 license_type = access_level.value
 
+            license_cost = summary.license_cost or 0.0
+            user_entry = {
+                'name': summary.user.display_name,
+                'email': summary.user.mail_address,
+                'license_type': license_type,
+                'access_level': access_level.value,
+                'license_cost': license_cost
+            }
+
             # Add user to each of their chargeback groups
             for group_name in summary.chargeback_groups:
-                chargeback_analysis[group_name]['users'].append({
-                    'name': user_name,
-                    'email': summary.user.mail_address,
-                    'license_type': license_type,
-                    'access_level': access_level.value,
-                    'license_cost': summary.license_cost or 0.0
-                })
-                chargeback_analysis[group_name]['total_users'] += 1
-                chargeback_analysis[group_name]['licenses'][license_type] += 1
-
-                if summary.license_cost:
-                    chargeback_analysis[group_name]['total_cost'] += summary.license_cost
-
-        # Convert defaultdicts to regular dicts for JSON serialization
-        return {
-            group: {
-                'users': data['users'],
-                'total_users': data['total_users'],
-                'licenses': dict(data['licenses']),
-                'total_cost': data['total_cost']
-            }
-            for group, data in chargeback_analysis.items()
-        }
+                bucket = chargeback_analysis[group_name]
+                bucket['users'].append(dict(user_entry))
+                bucket['total_users'] += 1
+                bucket['licenses'][license_type] += 1
+                bucket['total_cost'] += license_cost
+
+        # Convert Counters to regular dicts for JSON serialization
+        for data in chargeback_analysis.values():
+            data['licenses'] = dict(data['licenses'])
+        return dict(chargeback_analysis)
 
     def run_complete_analysis(self) -> OrganizationReport:
         """
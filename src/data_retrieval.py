@@ -6,23 +6,38 @@ REST APIs including users, groups, entitlements, and memberships.
 """
 
 import time
+import random
 import logging
-from typing import Dict, List, Optional, Any, Union, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Any, Union, Iterator, Tuple
 from urllib.parse import urlencode
 
 import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 
-from src.auth import AzureDevOpsAuth
+from src.auth import AzureDevOpsAuth, SESSION_POOL_MAXSIZE
 from src.models import (
     User, Group, Entitlement, GroupMembership, UserEntitlementSummary,
-    OrganizationReport, ApiResponse, ApiError, SubjectKind, AccessLevel, GroupType
+    OrganizationReport, ApiResponse, ApiError, SubjectKind, AccessLevel, GroupType,
+    LicensingSource, MsdnLicenseType
 )
 
 
 logger = logging.getLogger(__name__)
 
+# Enum members by API value, so parsing skips Enum.__call__ and its ValueError path
+_LICENSING_SOURCES = {source.value: source for source in LicensingSource}
+_MSDN_LICENSE_TYPES = {license_type.value: license_type for license_type in MsdnLicenseType}
+_SUBJECT_KINDS = {kind.value: kind for kind in SubjectKind}
+
+# (accountLicenseType, licensingSource, msdnLicenseType) -> access level, per Microsoft spec
+_ACCESS_LEVEL_MAP = {
+    ('express', LicensingSource.ACCOUNT, MsdnLicenseType.NONE): AccessLevel.BASIC,
+    ('advanced', LicensingSource.ACCOUNT, MsdnLicenseType.NONE): AccessLevel.BASIC_PLUS_TEST_PLANS,
+    ('none', LicensingSource.MSDN, MsdnLicenseType.ELIGIBLE): AccessLevel.VISUAL_STUDIO_SUBSCRIBER,
+    ('none', LicensingSource.MSDN, MsdnLicenseType.ENTERPRISE): AccessLevel.VISUAL_STUDIO_ENTERPRISE,
+    ('stakeholder', LicensingSource.ACCOUNT, MsdnLicenseType.NONE): AccessLevel.STAKEHOLDER,
+}
+
 
 class RateLimitError(Exception):
     """Raised when API rate limit is exceeded."""
@@ -43,36 +58,14 @@ class AzureDevOpsApiClient:
 
         Args:
             auth: Azure DevOps authentication handler
-            max_retries: Maximum number of retry attempts
+            max_retries: Maximum number of retries for failed and rate limited requests
             retry_delay: Delay between retries in seconds
         """
         self.auth = auth
         self.max_retries = max_retries
         self.retry_delay = retry_delay
-        self.session = self._create_session()
-
-    def _create_session(self) -> requests.Session:
-        """
-        Create a requests session with retry configuration.
-
-        Returns:
-            Configured requests session
-        """
-        session = self.auth.get_session()
-
-        # Configure retry strategy
-        retry_strategy = Retry(
-            total=self.max_retries,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods=["HEAD", "GET", "OPTIONS"],
-            backoff_factor=1
-        )
-
-        adapter = HTTPAdapter(max_retries=retry_strategy)
-        session.mount("http://", adapter)
-        session.mount("https://", adapter)
-
-        return session
+        # The shared session already carries the retrying, pooled adapter
+        self.session = self.auth.get_session(max_retries)
 
     def _handle_response(self, response: requests.Response) -> Dict[str, Any]:
         """
@@ -123,34 +116,61 @@ class AzureDevOpsApiClient:
 
         Returns:
             Response data as dictionary
+
+        Raises:
+            RateLimitError: If the rate limit is still exceeded after all retries
+            requests.RequestException: If the request fails
         """
         params = params or {}
         full_url = f"{url}?{urlencode(params)}" if params else url
 
         logger.debug(f"Making API request to: {full_url}")
 
-        try:
-            response = self.session.get(url, params=params, timeout=30)
-            return self._handle_response(response)
-
-        except RateLimitError as e:
-            logger.warning(f"Rate limit hit, waiting {e.retry_after} seconds...")
-            time.sleep(e.retry_after)
-            # Retry once after rate limit
-            response = self.session.get(url, params=params, timeout=30)
-            return self._handle_response(response)
-
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed: {e}")
-            raise
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.get(url, params=params, timeout=30)
+                return self._handle_response(response)
+
+            except RateLimitError as e:
+                if attempt == self.max_retries:
+                    logger.error(f"Rate limit still exceeded after {attempt} retries")
+                    raise
+                delay = self._rate_limit_delay(attempt, e.retry_after)
+                logger.warning(f"Rate limit hit, waiting {delay:.1f} seconds...")
+                time.sleep(delay)
+
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Request failed: {e}")
+                raise
 
-    def _paginate_request(self, url: str, params: Optional[Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+    def _rate_limit_delay(self, attempt: int, retry_after: Optional[int]) -> float:
+        """
+        Compute how long to wait before retrying a rate limited request.
+
+        Uses exponential backoff with random jitter so throttled clients do not
+        retry in lockstep, capped by the server's Retry-After value.
+
+        Args:
+            attempt: Zero-based retry attempt number
+            retry_after: Seconds requested by the Retry-After header, if any
+
+        Returns:
+            Delay in seconds
+        """
+        delay = self.retry_delay * 2 ** attempt + random.uniform(0, 1)
+        if retry_after is not None:
+            delay = min(delay, retry_after)
+        return delay
+
+    def _paginate_request(self, url: str, params: Optional[Dict[str, Any]] = None,
+                          items_key: str = 'value') -> Iterator[Dict[str, Any]]:
         """
         Handle paginated API requests.
 
         Args:
             url: API endpoint URL
             params: Query parameters
+            items_key: Response field holding the items of each page
 
         Yields:
             Individual items from paginated response
@@ -164,10 +184,8 @@ class AzureDevOpsApiClient:
 
             data = self._make_request(url, params)
 
-            # Yield individual items
-            if 'value' in data:
-                for item in data['value']:
-                    yield item
+            # Yield individual items as each page arrives
+            yield from data.get(items_key, ())
 
             # Check for more pages
             continuation_token = data.get('continuationToken')
@@ -192,24 +210,37 @@ class UsersApiClient(AzureDevOpsApiClient):
         """
         logger.info("Retrieving users from Azure DevOps")
 
+        users = list(self.iter_users(subject_types))
+
+        logger.info(f"Retrieved {len(users)} users")
+        return users
+
+    def iter_users(self, subject_types: Optional[List[str]] = None) -> Iterator[User]:
+        """
+        Stream users from the organization page by page.
+
+        Pages are requested lazily as the caller iterates. Entries that cannot
+        be parsed are logged and skipped.
+
+        Args:
+            subject_types: Filter by subject types (user, group, etc.)
+
+        Yields:
+            User objects in API order
+        """
         url = f"{self.auth.get_organization_url('vssps')}/_apis/graph/users"
         params = {"api-version": "7.1-preview.1"}
 
         if subject_types:
             params['subjectTypes'] = ','.join(subject_types)
 
-        users = []
         for user_data in self._paginate_request(url, params):
             try:
-                user = self._parse_user(user_data)
-                users.append(user)
+                yield self._parse_user(user_data)
             except Exception as e:
                 logger.warning(f"Failed to parse user data: {e}")
                 logger.debug(f"User data: {user_data}")
 
-        logger.info(f"Retrieved {len(users)} users")
-        return users
-
     def get_user_by_descriptor(self, descriptor: str) -> Optional[User]:
         """
         Retrieve a specific user by descriptor.
@@ -279,24 +310,37 @@ class GroupsApiClient(AzureDevOpsApiClient):
         """
         logger.info("Retrieving groups from Azure DevOps")
 
+        groups = list(self.iter_groups(subject_types))
+
+        logger.info(f"Retrieved {len(groups)} groups")
+        return groups
+
+    def iter_groups(self, subject_types: Optional[List[str]] = None) -> Iterator[Group]:
+        """
+        Stream groups from the organization page by page.
+
+        Pages are requested lazily as the caller iterates. Entries that cannot
+        be parsed are logged and skipped.
+
+        Args:
+            subject_types: Filter by subject types
+
+        Yields:
+            Group objects in API order
+        """
         url = f"{self.auth.get_organization_url('vssps')}/_apis/graph/groups"
         params = {"api-version": "7.1-preview.1"}
 
         if subject_types:
             params['subjectTypes'] = ','.join(subject_types)
 
-        groups = []
         for group_data in self._paginate_request(url, params):
             try:
-                group = self._parse_group(group_data)
-                groups.append(group)
+                yield self._parse_group(group_data)
             except Exception as e:
                 logger.warning(f"Failed to parse group data: {e}")
                 logger.debug(f"Group data: {group_data}")
 
-        logger.info(f"Retrieved {len(groups)} groups")
-        return groups
-
     def get_group_by_descriptor(self, descriptor: str) -> Optional[Group]:
         """
         Retrieve a specific group by descriptor.
@@ -361,13 +405,29 @@ class GroupsApiClient(AzureDevOpsApiClient):
 class EntitlementsApiClient(AzureDevOpsApiClient):
     """Client for Azure DevOps User Entitlements API."""
 
+    def __init__(self, auth: AzureDevOpsAuth, max_retries: int = 3, retry_delay: int = 1,
+                 max_workers: int = 16):
+        """
+        Initialize the entitlements client.
+
+        Args:
+            auth: Azure DevOps authentication handler
+            max_retries: Maximum number of retries for failed and rate limited requests
+            retry_delay: Delay between retries in seconds
+            max_workers: Maximum concurrent entitlement lookups, capped by the
+                connection pool size
+        """
+        super().__init__(auth, max_retries, retry_delay)
+        self.max_workers = max(1, min(max_workers, SESSION_POOL_MAXSIZE))
+
     def get_entitlements(self, users: Optional[List[User]] = None) -> List[Entitlement]:
         """
         Retrieve all user entitlements from the organization.
 
-        Note: The User Entitlements API requires looking up individual users by their descriptor.
-        You cannot retrieve a list without specifying a user. Service accounts and build service
-        identities don't have entitlements and will be skipped.
+        Lists every entitlement in the organization with paginated requests and joins them
+        against the users. If the listing is rejected, falls back to looking up each user
+        individually. Service accounts and build service identities don't have entitlements
+        and will be skipped.
 
         Args:
             users: List of User objects to lookup entitlements for
@@ -381,9 +441,8 @@ class EntitlementsApiClient(AzureDevOpsApiClient):
             logger.warning("No users provided for entitlement lookup")
             return []
 
-        entitlements = []
-        failed_count = 0
         skipped_service_accounts = 0
+        lookup_users = []
 
         for user in users:
             # Skip service accounts and build service identities
@@ -393,42 +452,96 @@ class EntitlementsApiClient(AzureDevOpsApiClient):
                 logger.debug(f"Skipping service account: {user.display_name}")
                 continue
 
-            # Try descriptor first, then origin_id as fallback
-            user_id = user.descriptor or user.origin_id
-
-            if not user_id:
+            if not (user.descriptor or user.origin_id):
                 logger.debug(f"Skipping user {user.display_name} - no descriptor or origin_id")
                 continue
 
+            lookup_users.append(user)
+
+        results = []
+        if lookup_users:
             try:
-                entitlement = self.get_entitlement_by_user_id(user_id)
-                if entitlement:
-                    entitlements.append(entitlement)
-                else:
-                    logger.debug(f"No entitlement found for user {user.display_name}")
-            except requests.HTTPError as e:
-                if e.response.status_code == 404:
-                    # If descriptor lookup failed, try origin_id as fallback
-                    if user_id == user.descriptor and user.origin_id:
-                        logger.debug(f"Descriptor lookup failed for {user.display_name}, trying origin_id")
-                        try:
-                            entitlement = self.get_entitlement_by_user_id(user.origin_id)
-                            if entitlement:
-                                entitlements.append(entitlement)
-                                continue
-                        except Exception:
-                            pass
-                    logger.debug(f"No entitlement found for user {user.display_name} (user_id: {user_id})")
-                else:
-                    failed_count += 1
-                    logger.warning(f"Failed to retrieve entitlement for user {user.display_name} (user_id: {user_id}): HTTP {e.response.status_code}")
-            except Exception as e:
-                failed_count += 1
-                logger.warning(f"Failed to retrieve entitlement for user {user.display_name} (user_id: {user_id}): {e}")
+                entitlements_by_user = self.get_all_entitlements_bulk()
+            except (requests.RequestException, RateLimitError) as e:
+                logger.warning(f"Listing entitlements failed, looking up users individually: {e}")
+                entitlements_by_user = None
+
+            if entitlements_by_user is None:
+                results = self._lookup_user_entitlements(lookup_users)
+            else:
+                results = [
+                    (entitlements_by_user.get(user.descriptor or user.origin_id), False)
+                    for user in lookup_users
+                ]
+                # Users missing from the listing may still be resolvable by the
+                # per-user endpoint (e.g. a descriptor/origin ID mismatch)
+                missing = [i for i, (entitlement, _) in enumerate(results) if entitlement is None]
+                if missing:
+                    logger.debug(f"{len(missing)} users not found in entitlement listing, looking them up individually")
+                    lookups = self._lookup_user_entitlements([lookup_users[i] for i in missing])
+                    for i, result in zip(missing, lookups):
+                        results[i] = result
+
+        entitlements = [entitlement for entitlement, _ in results if entitlement]
+        failed_count = sum(1 for _, failed in results if failed)
 
         logger.info(f"Retrieved {len(entitlements)} entitlements out of {len(users)} users ({skipped_service_accounts} service accounts, {failed_count} failures)")
         return entitlements
 
+    def _lookup_user_entitlements(self, users: List[User]) -> List[Tuple[Optional[Entitlement], bool]]:
+        """
+        Look up the entitlements of several users individually.
+
+        Args:
+            users: User objects with a descriptor or origin ID
+
+        Returns:
+            List of (entitlement, failed) tuples in the same order as users
+        """
+        # Each lookup is a separate HTTP round trip, so overlap them on the
+        # session's connection pool; map() keeps results in user order
+        workers = min(self.max_workers, len(users))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._lookup_user_entitlement, users))
+
+    def _lookup_user_entitlement(self, user: User) -> Tuple[Optional[Entitlement], bool]:
+        """
+        Look up the entitlement of a single user.
+
+        Tries the descriptor first and falls back to the origin ID.
+
+        Args:
+            user: User object with a descriptor or origin ID
+
+        Returns:
+            Tuple of the entitlement (None if not found) and whether the lookup failed
+        """
+        user_id = user.descriptor or user.origin_id
+
+        try:
+            entitlement = self.get_entitlement_by_user_id(user_id)
+            if not entitlement:
+                logger.debug(f"No entitlement found for user {user.display_name}")
+            return entitlement, False
+        except requests.HTTPError as e:
+            if e.response.status_code == 404:
+                # If descriptor lookup failed, try origin_id as fallback
+                if user_id == user.descriptor and user.origin_id:
+                    logger.debug(f"Descriptor lookup failed for {user.display_name}, trying origin_id")
+                    try:
+                        entitlement = self.get_entitlement_by_user_id(user.origin_id)
+                        if entitlement:
+                            return entitlement, False
+                    except Exception:
+                        pass
+                logger.debug(f"No entitlement found for user {user.display_name} (user_id: {user_id})")
+                return None, False
+            logger.warning(f"Failed to retrieve entitlement for user {user.display_name} (user_id: {user_id}): HTTP {e.response.status_code}")
+            return None, True
+        except Exception as e:
+            logger.warning(f"Failed to retrieve entitlement for user {user.display_name} (user_id: {user_id}): {e}")
+            return None, True
+
     def _is_service_account(self, user: User) -> bool:
         """
         Check if a user is a service account or build service identity.
@@ -462,6 +575,44 @@ class EntitlementsApiClient(AzureDevOpsApiClient):
 
         return any(pattern in display_name_lower for pattern in service_patterns)
 
+    def get_all_entitlements_bulk(self) -> Dict[str, Entitlement]:
+        """
+        Retrieve every user entitlement in the organization with paginated requests.
+
+        Entries that cannot be parsed are logged and skipped.
+
+        Returns:
+            Dictionary of Entitlement objects keyed by user descriptor and,
+            when present, by user origin ID
+
+        Raises:
+            RateLimitError: If the rate limit is still exceeded after all retries
+            requests.RequestException: If a page request fails
+        """
+        logger.debug("Listing all user entitlements")
+
+        url = f"{self.auth.get_organization_url('vsaex')}/_apis/userentitlements"
+        params = {"api-version": "7.1-preview.3"}
+
+        entitlements = {}
+        parsed = 0
+        for entitlement_data in self._paginate_request(url, params, items_key='members'):
+            try:
+                entitlement = self._parse_entitlement(entitlement_data)
+            except Exception as e:
+                logger.warning(f"Failed to parse entitlement data: {e}")
+                logger.debug(f"Entitlement data: {entitlement_data}")
+                continue
+            parsed += 1
+            if entitlement.user_descriptor:
+                entitlements[entitlement.user_descriptor] = entitlement
+            origin_id = entitlement_data.get('user', {}).get('originId')
+            if origin_id:
+                entitlements[origin_id] = entitlement
+
+        logger.debug(f"Listed {parsed} user entitlements")
+        return entitlements
+
     def get_entitlement_by_user_id(self, user_id: str) -> Optional[Entitlement]:
         """
         Retrieve entitlement for a specific user.
@@ -510,8 +661,6 @@ class EntitlementsApiClient(AzureDevOpsApiClient):
         Returns:
             Entitlement object
         """
-        from src.models import LicensingSource, MsdnLicenseType
-
         # Extract user info
         user = entitlement_data.get('user', {})
         user_descriptor = user.get('descriptor', '')
@@ -524,15 +673,13 @@ class EntitlementsApiClient(AzureDevOpsApiClient):
         license_display_name = access_level_data.get('licenseDisplayName')
 
         # Parse enums
-        try:
-            licensing_source = LicensingSource(licensing_source_str.lower())
-        except ValueError:
+        licensing_source = _LICENSING_SOURCES.get(licensing_source_str.lower())
+        if licensing_source is None:
             licensing_source = LicensingSource.NONE
             logger.warning(f"Unknown licensing source: {licensing_source_str}")
 
-        try:
-            msdn_license_type = MsdnLicenseType(msdn_license_type_str.lower())
-        except ValueError:
+        msdn_license_type = _MSDN_LICENSE_TYPES.get(msdn_license_type_str.lower())
+        if msdn_license_type is None:
             msdn_license_type = MsdnLicenseType.NONE
             if msdn_license_type_str and msdn_license_type_str.lower() != 'none':
                 logger.warning(f"Unknown MSDN license type: {msdn_license_type_str}")
@@ -573,8 +720,8 @@ class EntitlementsApiClient(AzureDevOpsApiClient):
     def _determine_access_level(
         self,
         account_license_type: str,
-        licensing_source: 'LicensingSource',
-        msdn_license_type: 'MsdnLicenseType'
+        licensing_source: LicensingSource,
+        msdn_license_type: MsdnLicenseType
     ) -> AccessLevel:
         """
         Determine the access level based on Microsoft's API specification.
@@ -587,39 +734,11 @@ class EntitlementsApiClient(AzureDevOpsApiClient):
         Returns:
             AccessLevel enum value
         """
-        from src.models import LicensingSource, MsdnLicenseType
-
-        account_license_lower = account_license_type.lower()
-
-        # Basic: express + account + none
-        if (account_license_lower == 'express' and
-            licensing_source == LicensingSource.ACCOUNT and
-            msdn_license_type == MsdnLicenseType.NONE):
-            return AccessLevel.BASIC
-
-        # Basic + Test Plans: advanced + account + none
-        if (account_license_lower == 'advanced' and
-            licensing_source == LicensingSource.ACCOUNT and
-            msdn_license_type == MsdnLicenseType.NONE):
-            return AccessLevel.BASIC_PLUS_TEST_PLANS
-
-        # Visual Studio Subscriber: none + msdn + eligible
-        if (account_license_lower == 'none' and
-            licensing_source == LicensingSource.MSDN and
-            msdn_license_type == MsdnLicenseType.ELIGIBLE):
-            return AccessLevel.VISUAL_STUDIO_SUBSCRIBER
-
-        # Visual Studio Enterprise: none + msdn + enterprise
-        if (account_license_lower == 'none' and
-            licensing_source == LicensingSource.MSDN and
-            msdn_license_type == MsdnLicenseType.ENTERPRISE):
-            return AccessLevel.VISUAL_STUDIO_ENTERPRISE
-
-        # Stakeholder: stakeholder + account + none
-        if (account_license_lower == 'stakeholder' and
-            licensing_source == LicensingSource.ACCOUNT and
-            msdn_license_type == MsdnLicenseType.NONE):
-            return AccessLevel.STAKEHOLDER
+        access_level = _ACCESS_LEVEL_MAP.get(
+            (account_license_type.lower(), licensing_source, msdn_license_type)
+        )
+        if access_level is not None:
+            return access_level
 
         # Default case - log for investigation
         logger.warning(
@@ -634,58 +753,108 @@ class EntitlementsApiClient(AzureDevOpsApiClient):
 class MembershipApiClient(AzureDevOpsApiClient):
     """Client for Azure DevOps Group Membership API."""
 
+    def __init__(self, auth: AzureDevOpsAuth, max_retries: int = 3, retry_delay: int = 1):
+        """
+        Initialize the membership client.
+
+        Args:
+            auth: Azure DevOps authentication handler
+            max_retries: Maximum number of retries for failed and rate limited requests
+            retry_delay: Delay between retries in seconds
+        """
+        super().__init__(auth, max_retries, retry_delay)
+        # Descriptor -> memberships already retrieved by this client
+        self._group_memberships_cache: Dict[str, Tuple[GroupMembership, ...]] = {}
+        self._user_memberships_cache: Dict[str, Tuple[GroupMembership, ...]] = {}
+
     def get_group_memberships(self, group_descriptor: str) -> List[GroupMembership]:
         """
         Retrieve all memberships for a specific group.
 
+        Results are cached for the lifetime of the client, so repeated lookups of
+        the same group do not hit the API again.
+
         Args:
             group_descriptor: Group descriptor
 
         Returns:
             List of GroupMembership objects
         """
+        memberships = self._group_memberships_cache.get(group_descriptor)
+        if memberships is None:
+            memberships = tuple(self.iter_group_memberships(group_descriptor))
+            self._group_memberships_cache[group_descriptor] = memberships
+        return list(memberships)
+
+    def iter_group_memberships(self, group_descriptor: str) -> Iterator[GroupMembership]:
+        """
+        Stream the memberships of a specific group page by page.
+
+        Pages are requested lazily as the caller iterates. Entries that cannot
+        be parsed are logged and skipped.
+
+        Args:
+            group_descriptor: Group descriptor
+
+        Yields:
+            GroupMembership objects in API order
+        """
         logger.debug(f"Retrieving memberships for group: {group_descriptor}")
 
         url = f"{self.auth.get_organization_url('vssps')}/_apis/graph/memberships/{group_descriptor}"
         params = {"api-version": "7.1-preview.1", "direction": "down"}
 
-        memberships = []
         for membership_data in self._paginate_request(url, params):
             try:
-                membership = self._parse_membership(membership_data, group_descriptor)
-                memberships.append(membership)
+                yield self._parse_membership(membership_data, group_descriptor)
             except Exception as e:
                 logger.warning(f"Failed to parse membership data: {e}")
                 logger.debug(f"Membership data: {membership_data}")
 
-        return memberships
-
     def get_user_memberships(self, user_descriptor: str) -> List[GroupMembership]:
         """
         Retrieve all group memberships for a specific user.
 
+        Results are cached for the lifetime of the client, so repeated lookups of
+        the same user do not hit the API again.
+
         Args:
             user_descriptor: User descriptor
 
         Returns:
             List of GroupMembership objects
         """
+        memberships = self._user_memberships_cache.get(user_descriptor)
+        if memberships is None:
+            memberships = tuple(self.iter_user_memberships(user_descriptor))
+            self._user_memberships_cache[user_descriptor] = memberships
+        return list(memberships)
+
+    def iter_user_memberships(self, user_descriptor: str) -> Iterator[GroupMembership]:
+        """
+        Stream the group memberships of a specific user page by page.
+
+        Pages are requested lazily as the caller iterates. Entries that cannot
+        be parsed are logged and skipped.
+
+        Args:
+            user_descriptor: User descriptor
+
+        Yields:
+            GroupMembership objects in API order
+        """
         logger.debug(f"Retrieving memberships for user: {user_descriptor}")
 
         url = f"{self.auth.get_organization_url('vssps')}/_apis/graph/memberships/{user_descriptor}"
         params = {"api-version": "7.1-preview.1", "direction": "up"}
 
-        memberships = []
         for membership_data in self._paginate_request(url, params):
             try:
-                membership = self._parse_membership(membership_data, None, user_descriptor)
-                memberships.append(membership)
+                yield self._parse_membership(membership_data, None, user_descriptor)
             except Exception as e:
                 logger.warning(f"Failed to parse membership data: {e}")
                 logger.debug(f"Membership data: {membership_data}")
 
-        return memberships
-
     def _parse_membership(self, membership_data: Dict[str, Any],
                          group_descriptor: Optional[str] = None,
                          member_descriptor: Optional[str] = None) -> GroupMembership:
@@ -707,10 +876,9 @@ class MembershipApiClient(AzureDevOpsApiClient):
         # Determine member type from metadata
         member_subject_kind = SubjectKind.USER  # Default to user
         if 'subjectKind' in membership_data:
-            try:
-                member_subject_kind = SubjectKind(membership_data['subjectKind'].lower())
-            except ValueError:
-                pass
+            member_subject_kind = _SUBJECT_KINDS.get(
+                membership_data['subjectKind'].lower(), member_subject_kind
+            )
 
         return GroupMembership(
             group_descriptor=container_descriptor,
@@ -8,7 +8,7 @@ actual Azure DevOps API access.
 
 import random
 import logging
-from typing import List, Dict, Tuple
+from typing import Dict, FrozenSet, List, Tuple
 from datetime import datetime, timezone
 from faker import Faker
 
@@ -44,6 +44,8 @@ class DummyDataGenerator:
         self.generated_groups: List[Group] = []
         self.generated_entitlements: List[Entitlement] = []
         self.generated_memberships: List[GroupMembership] = []
+        self.generated_user_descriptors: FrozenSet[str] = frozenset()
+        self.generated_group_descriptors: FrozenSet[str] = frozenset()
 
         logger.info("Dummy data generator initialized")
 
@@ -63,7 +65,9 @@ class DummyDataGenerator:
             # Generate user details
             first_name = self.fake.first_name()
             last_name = self.fake.last_name()
-            email = f"{first_name.lower()}.{last_name.lower()}@{self.fake.domain_name()}"
+            # One domain per user: Faker's domain names are its most expensive draws
+            domain = self.fake.domain_name()
+            email = f"{first_name.lower()}.{last_name.lower()}@{domain}"
 
             user = User(
                 descriptor=f"aad.{self.fake.uuid4()}",
@@ -73,11 +77,12 @@ class DummyDataGenerator:
                 mail_address=email,
                 origin="aad",
                 origin_id=self.fake.uuid4(),
-                domain=self.fake.domain_name()
+                domain=domain
             )
             users.append(user)
 
         self.generated_users = users
+        self.generated_user_descriptors = frozenset(user.descriptor for user in users)
         logger.info(f"Generated {len(users)} dummy users")
         return users
 
@@ -137,6 +142,7 @@ class DummyDataGenerator:
             groups.append(group)
 
         self.generated_groups = groups
+        self.generated_group_descriptors = frozenset(group.descriptor for group in groups)
         logger.info(f"Generated {len(groups)} dummy groups")
         return groups
 
@@ -167,31 +173,24 @@ class DummyDataGenerator:
             (AccessLevel.VISUAL_STUDIO_ENTERPRISE, 0.03, "express", LicensingSource.MSDN, MsdnLicenseType.ENTERPRISE),
         ]
 
-        for user in users:
-            # Select access level based on distribution
-            rand = random.random()
-            cumulative = 0
-            selected_level = None
-
-            for level, probability, account_type, licensing_src, msdn_type in access_levels:
-                cumulative += probability
-                if rand <= cumulative:
-                    selected_level = (level, account_type, licensing_src, msdn_type)
-                    break
-
-            if selected_level is None:
-                selected_level = access_levels[0][0:4]  # Default to Basic
-
-            access_level, account_license_type, licensing_source, msdn_license_type = selected_level
-
-            # Generate license display name
-            license_display_names = {
-                AccessLevel.BASIC: "Basic",
-                AccessLevel.STAKEHOLDER: "Stakeholder",
-                AccessLevel.BASIC_PLUS_TEST_PLANS: "Basic + Test Plans",
-                AccessLevel.VISUAL_STUDIO_SUBSCRIBER: "Visual Studio Professional",
-                AccessLevel.VISUAL_STUDIO_ENTERPRISE: "Visual Studio Enterprise"
-            }
+        # License display name per access level
+        license_display_names = {
+            AccessLevel.BASIC: "Basic",
+            AccessLevel.STAKEHOLDER: "Stakeholder",
+            AccessLevel.BASIC_PLUS_TEST_PLANS: "Basic + Test Plans",
+            AccessLevel.VISUAL_STUDIO_SUBSCRIBER: "Visual Studio Professional",
+            AccessLevel.VISUAL_STUDIO_ENTERPRISE: "Visual Studio Enterprise"
+        }
+
+        # Select every user's access level based on the distribution in one draw
+        selected_levels = random.choices(
+            access_levels,
+            weights=[probability for _, probability, *_ in access_levels],
+            k=len(users)
+        )
+
+        for user, selected_level in zip(users, selected_levels):
+            access_level, _, account_license_type, licensing_source, msdn_license_type = selected_level
 
             entitlement = Entitlement(
                 user_descriptor=user.descriptor,
@@ -315,3 +314,16 @@ class DummyDataGenerator:
             'entitlements': self.generated_entitlements,
             'memberships': self.generated_memberships
         }
+
+    def get_indexed(self) -> Tuple[Dict[str, User], Dict[str, Group], Dict[str, Entitlement]]:
+        """
+        Get the generated data keyed the way EntitlementDataProcessor stores it.
+
+        Returns:
+            Tuple of (users by descriptor, groups by descriptor, entitlements by user descriptor)
+        """
+        return (
+            {user.descriptor: user for user in self.generated_users},
+            {group.descriptor: group for group in self.generated_groups},
+            {ent.user_descriptor: ent for ent in self.generated_entitlements}
+        )
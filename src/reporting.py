@@ -6,19 +6,314 @@ for Azure DevOps entitlement reporting and chargeback analysis.
 """
 
 import csv
+import io
 import json
 import logging
+import mmap
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import cached_property
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
-from datetime import datetime, timezone
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Any, Sequence, Set, TextIO, Tuple, Union
+from datetime import date, datetime, timezone
+from enum import Enum
 
-import pandas as pd
+try:
+    import xlsxwriter
+except ImportError:  # pragma: no cover - depends on installed packages
+    xlsxwriter = None
 
-from src.models import OrganizationReport, UserEntitlementSummary, Group, User, Entitlement
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on installed packages
+    orjson = None
+
+from src.models import (
+    OrganizationReport, UserEntitlementSummary, Group, User, Entitlement, AccessLevel, GroupType
+)
 
 
 logger = logging.getLogger(__name__)
 
+# Enum member -> string value, so row builders do one dict lookup per cell
+# instead of a truth test plus an enum .value property access
+_ACCESS_LEVEL_VALUES = {level: level.value for level in AccessLevel}
+_GROUP_TYPE_VALUES = {group_type: group_type.value for group_type in GroupType}
+
+# Display value for optional boolean model fields
+_YES_NO_UNKNOWN = {True: 'Yes', False: 'No', None: 'Unknown'}
+
+# Write buffer for CSV output; rows are small, so a large buffer turns many
+# tiny writes into a few large ones.
+_CSV_BUFFER_SIZE = 1 << 20
+
+
+class _SummaryView(NamedTuple):
+    """Display strings for one user summary, shared by every output format."""
+    direct_group_names: Tuple[str, ...]
+    all_group_names: Tuple[str, ...]
+    chargeback_groups: str
+
+
+class _Sheet(NamedTuple):
+    """Title, header and rows of one Excel worksheet."""
+    title: str
+    header: Sequence[str]
+    rows: Iterable[Sequence[Any]]
+
+
+@dataclass
+class _PreparedReport:
+    """Data derived once per report and reused by the CSV, JSON and Excel writers."""
+    summary_views: List[_SummaryView]
+    chargeback_rows: List[Dict[str, Any]]
+    unique_groups: List[Group]
+    orphan_descriptors: Set[str]
+    license_rows: List[Tuple[str, int, str]]
+    total_licenses: int
+
+
+def _build_chargeback_rows(report: OrganizationReport) -> List[Dict[str, Any]]:
+    """
+    Derive one chargeback row per group with license counts and costs.
+
+    Every chargeback output (per-organization CSV and Excel, consolidated CSV)
+    selects its columns from these rows, so the derivation runs once per report.
+
+    Args:
+        report: Organization report data
+
+    Returns:
+        List of row dictionaries keyed by column name
+    """
+    rows = []
+    for group_name, group_data in report.chargeback_by_group.items():
+        licenses = group_data.get('licenses', {})
+        total_users = group_data.get('total_users', 0)
+        total_cost = group_data.get('total_cost', 0.0)
+
+        basic_count = licenses.get('Basic', 0)
+        stakeholder_count = licenses.get('Stakeholder', 0)
+        vs_subscriber_count = licenses.get('Visual Studio Subscriber', 0)
+        vs_enterprise_count = licenses.get('Visual Studio Enterprise', 0)
+        other_count = total_users - (basic_count + stakeholder_count + vs_subscriber_count + vs_enterprise_count)
+
+        rows.append({
+            'Group Name': group_name,
+            'Total Users': total_users,
+            'Basic Licenses': basic_count,
+            'Stakeholder Licenses': stakeholder_count,
+            'VS Subscriber Licenses': vs_subscriber_count,
+            'VS Enterprise Licenses': vs_enterprise_count,
+            'Other Licenses': max(0, other_count),
+            'Total Cost': total_cost,
+            'Cost Per User': total_cost / total_users if total_users > 0 else 0.0
+        })
+    return rows
+
+
+def _write_xlsxwriter_workbook(target: Union[Path, BinaryIO], sheets: Iterable[_Sheet]) -> None:
+    """
+    Write worksheets with xlsxwriter, streaming each row to disk.
+
+    Rows are written strictly top to bottom, so constant_memory mode keeps only
+    the current row in memory. Strings are always stored as literal text, never
+    converted to formulas or hyperlinks.
+
+    Args:
+        target: Output workbook path or binary file object
+        sheets: Worksheets to write, in order
+    """
+    options = {'constant_memory': True, 'strings_to_formulas': False, 'strings_to_urls': False}
+    with xlsxwriter.Workbook(str(target) if isinstance(target, Path) else target, options) as workbook:
+        header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+        for sheet in sheets:
+            worksheet = workbook.add_worksheet(sheet.title)
+            worksheet.write_row(0, 0, sheet.header, header_format)
+            for row_index, row in enumerate(sheet.rows, start=1):
+                worksheet.write_row(row_index, 0, row)
+
+
+def _write_openpyxl_workbook(target: Union[Path, BinaryIO], sheets: Iterable[_Sheet]) -> None:
+    """
+    Write worksheets with an openpyxl write-only workbook.
+
+    Used when xlsxwriter is not installed. Write-only mode appends rows without
+    keeping a cell object per value. Strings starting with '=' are kept as text.
+
+    Args:
+        target: Output workbook path or binary file object
+        sheets: Worksheets to write, in order
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Alignment, Border, Font, Side
+
+    thin = Side(style='thin')
+    header_font = Font(bold=True)
+    header_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+    header_alignment = Alignment(horizontal='center', vertical='top')
+
+    def text_cell(value: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(worksheet, value=value)
+        cell.data_type = 's'
+        return cell
+
+    workbook = Workbook(write_only=True)
+    for sheet in sheets:
+        worksheet = workbook.create_sheet(sheet.title)
+
+        header = []
+        for title in sheet.header:
+            cell = WriteOnlyCell(worksheet, value=title)
+            cell.font, cell.border, cell.alignment = header_font, header_border, header_alignment
+            header.append(cell)
+        worksheet.append(header)
+
+        for row in sheet.rows:
+            worksheet.append([
+                text_cell(value) if isinstance(value, str) and value.startswith('=') else value
+                for value in row
+            ])
+    workbook.save(target)
+
+
+def _write_file_mmap(file_path: Path, data: bytes) -> None:
+    """
+    Write bytes to a file through a memory map sized to the data.
+
+    The file is truncated to its final size up front and filled with a single
+    copy, instead of the many small writes a zip stream issues. Whether this
+    is faster depends on the filesystem, so callers enable it explicitly.
+
+    Args:
+        file_path: Output file path
+        data: Complete file contents
+    """
+    with open(file_path, 'w+b') as output:
+        if not data:
+            return
+        output.truncate(len(data))
+        with mmap.mmap(output.fileno(), len(data)) as mapped:
+            mapped[:] = data
+            mapped.flush()
+
+
+def _json_default(obj: Any) -> Any:
+    """
+    Convert a value neither JSON backend serializes natively.
+
+    The standard library encoder falls back to this for dates and enums too,
+    so they are rendered the way orjson renders them natively.
+
+    Args:
+        obj: Value to convert
+
+    Returns:
+        JSON-serializable replacement value
+    """
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    return str(obj)
+
+
+def _dump_json(obj: Any, indent: int = 0) -> bytes:
+    """
+    Serialize an object as 2-space indented UTF-8 JSON.
+
+    Uses orjson when it is installed and the standard library otherwise.
+    Continuation lines are shifted right by ``indent`` spaces so the result
+    can be embedded inside an enclosing indented document.
+
+    Args:
+        obj: JSON-serializable object; other types are converted with _json_default
+        indent: Number of spaces to prefix each continuation line with
+
+    Returns:
+        Encoded JSON bytes
+    """
+    if orjson is not None:
+        data = orjson.dumps(obj, default=_json_default, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    else:
+        data = json.dumps(obj, indent=2, ensure_ascii=False, default=_json_default).encode('utf-8')
+    if indent:
+        data = data.replace(b'\n', b'\n' + b' ' * indent)
+    return data
+
+
+def _open_csv(file_path: Path) -> TextIO:
+    """Open a CSV file for writing with a large write buffer."""
+    return open(file_path, 'w', newline='', encoding='utf-8', buffering=_CSV_BUFFER_SIZE)
+
+
+def _needs_csv_quoting(value: str) -> bool:
+    """Return True if a field would be quoted by ``csv.writer`` with default dialect."""
+    return any(char in value for char in ',"\r\n')
+
+
+def _build_license_rows(report: OrganizationReport) -> Tuple[List[Tuple[str, int, str]], int]:
+    """
+    Derive the license breakdown rows shared by the CSV and Excel license reports.
+
+    Args:
+        report: Organization report data
+
+    Returns:
+        Tuple of (rows of license name, count and formatted percentage, total license count)
+    """
+    total_licenses = sum(report.licenses_by_type.values())
+    rows = []
+    for license_type, count in report.licenses_by_type.items():
+        percentage = (count / total_licenses * 100) if total_licenses > 0 else 0.0
+        rows.append((license_type.replace('_', ' ').title(), count, f"{percentage:.1f}%"))
+    return rows, total_licenses
+
+
+def _collect_all_groups(report: OrganizationReport) -> Tuple[List[Group], Set[str]]:
+    """
+    Collect the unique non-VSTS groups of a report and its orphaned descriptors.
+
+    Groups are taken from user memberships first, then orphaned groups, keeping
+    the first occurrence of each descriptor.
+
+    Args:
+        report: Organization report data
+
+    Returns:
+        Tuple of (unique groups in report order, set of orphaned group descriptors)
+    """
+    seen = set()
+    unique_groups = []
+    member_groups = chain.from_iterable(summary.all_groups for summary in report.user_summaries)
+    for group in chain(member_groups, report.orphaned_groups):
+        descriptor = group.descriptor
+        if descriptor in seen or (group.origin and group.origin.lower() == 'vsts'):
+            continue
+        seen.add(descriptor)
+        unique_groups.append(group)
+
+    orphan_descriptors = {group.descriptor for group in report.orphaned_groups}
+    return unique_groups, orphan_descriptors
+
+
+def _csv_field(value: str) -> str:
+    """Quote a CSV field the way ``csv.writer`` does with the default dialect."""
+    if _needs_csv_quoting(value):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def _build_summary_view(summary: UserEntitlementSummary) -> _SummaryView:
+    """Build the display-string view for a single user summary."""
+    return _SummaryView(
+        direct_group_names=tuple(g.display_name for g in summary.direct_groups),
+        all_group_names=tuple(g.display_name for g in summary.all_groups),
+        chargeback_groups='; '.join(summary.chargeback_groups)
+    )
+
 
 class ConsolidatedReportGenerator:
     """
@@ -42,6 +337,15 @@ class ConsolidatedReportGenerator:
         logger.info(f"Consolidated report generator initialized with output directory: {self.output_directory}, "
                    f"include_timestamp: {self.include_timestamp}")
 
+    @cached_property
+    def timestamp(self) -> str:
+        """
+        Filename timestamp shared by every consolidated report of this run.
+
+        Computed on first use so co-generated reports get matching filenames.
+        """
+        return datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+
     def generate_consolidated_user_report(self, reports: List[OrganizationReport],
                                          timestamp: str = None) -> Path:
         """
@@ -54,35 +358,41 @@ class ConsolidatedReportGenerator:
 
         Args:
             reports: List of organization reports
-            timestamp: Timestamp string for filename (optional, used if include_timestamp is True)
+            timestamp: Timestamp string for filename (optional, used if include_timestamp is True;
+                       defaults to the generator's shared run timestamp)
 
         Returns:
             Path to generated consolidated CSV file
         """
         if self.include_timestamp:
             if not timestamp:
-                timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+                timestamp = self.timestamp
             file_path = self.output_directory / f"all_organizations_users_{timestamp}.csv"
         else:
             file_path = self.output_directory / f"all_organizations_users.csv"
 
         logger.info(f"Generating consolidated user report: {file_path}")
 
-        # Build user index by email/principal name
+        # Build user index by email/principal name. Chargeback group names are
+        # interned to integer ids so each user only holds a small set of ints.
         user_data_by_key = {}
+        group_ids: Dict[str, int] = {}
 
         for report in reports:
+            organization = report.organization
             for summary in report.user_summaries:
                 user = summary.user
                 entitlement = summary.entitlement
+                license_cost = summary.license_cost or 0.0
 
                 # Create unique key for user (email is best, fallback to principal name)
                 user_key = user.mail_address or user.principal_name or user.descriptor
+                existing = user_data_by_key.get(user_key)
 
-                if user_key not in user_data_by_key:
+                if existing is None:
                     # First time seeing this user
                     user_data_by_key[user_key] = {
-                        'organizations': [report.organization],
+                        'organizations': [organization],
                         'user_name': user.display_name,
                         'email': user.mail_address or '',
                         'principal_name': user.principal_name or '',
@@ -91,26 +401,37 @@ class ConsolidatedReportGenerator:
                         'origin': user.origin or '',
                         'domain': user.domain or '',
                         'license_display_names': [entitlement.license_display_name if entitlement else 'None'],
-                        'total_license_cost': summary.license_cost or 0.0,
-                        'chargeback_groups': set(summary.chargeback_groups),
+                        'total_license_cost': license_cost,
+                        'chargeback_groups': {group_ids.setdefault(name, len(group_ids))
+                                              for name in summary.chargeback_groups},
                         'is_active': user.is_active,
                         'last_accessed': entitlement.last_accessed_date if entitlement else None
                     }
-                else:
-                    # User exists in multiple orgs - merge data
-                    existing = user_data_by_key[user_key]
-                    existing['organizations'].append(report.organization)
-                    if entitlement and entitlement.license_display_name:
+                    continue
+
+                # User exists in multiple orgs - merge data
+                existing['organizations'].append(organization)
+                existing['total_license_cost'] += license_cost
+                existing['chargeback_groups'].update(group_ids.setdefault(name, len(group_ids))
+                                                     for name in summary.chargeback_groups)
+                if entitlement:
+                    if entitlement.license_display_name:
                         existing['license_display_names'].append(entitlement.license_display_name)
-                    existing['total_license_cost'] += (summary.license_cost or 0.0)
-                    existing['chargeback_groups'].update(summary.chargeback_groups)
                     # Update last accessed to most recent
-                    if entitlement and entitlement.last_accessed_date:
-                        if not existing['last_accessed'] or entitlement.last_accessed_date > existing['last_accessed']:
-                            existing['last_accessed'] = entitlement.last_accessed_date
+                    last_accessed = entitlement.last_accessed_date
+                    if last_accessed and (not existing['last_accessed'] or last_accessed > existing['last_accessed']):
+                        existing['last_accessed'] = last_accessed
+
+        # Rank ids by group name once so per-user sorting compares ints, and
+        # format each distinct group combination only once
+        group_names = sorted(group_ids)
+        rank_by_id = [0] * len(group_ids)
+        for rank, name in enumerate(group_names):
+            rank_by_id[group_ids[name]] = rank
+        formatted_groups: Dict[frozenset, str] = {}
 
         # Write consolidated CSV
-        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+        with _open_csv(file_path) as csvfile:
             fieldnames = [
                 'User Name', 'Email', 'Principal Name', 'Organizations', 'License Types',
                 'Total License Cost', 'Chargeback Groups', 'Is Active', 'Last Accessed'
@@ -119,6 +440,12 @@ class ConsolidatedReportGenerator:
             writer.writeheader()
 
             for user_data in user_data_by_key.values():
+                ids = frozenset(user_data['chargeback_groups'])
+                chargeback_groups = formatted_groups.get(ids)
+                if chargeback_groups is None:
+                    chargeback_groups = '; '.join(group_names[rank] for rank in sorted(rank_by_id[i] for i in ids))
+                    formatted_groups[ids] = chargeback_groups
+
                 writer.writerow({
                     'User Name': user_data['user_name'],
                     'Email': user_data['email'],
@@ -126,8 +453,8 @@ class ConsolidatedReportGenerator:
                     'Organizations': ', '.join(user_data['organizations']),
                     'License Types': ', '.join(set(user_data['license_display_names'])),
                     'Total License Cost': f"{user_data['total_license_cost']:.2f}",
-                    'Chargeback Groups': '; '.join(sorted(user_data['chargeback_groups'])),
-                    'Is Active': 'Yes' if user_data['is_active'] else 'No' if user_data['is_active'] is not None else 'Unknown',
+                    'Chargeback Groups': chargeback_groups,
+                    'Is Active': _YES_NO_UNKNOWN[user_data['is_active']],
                     'Last Accessed': user_data['last_accessed'].strftime('%Y-%m-%d') if user_data['last_accessed'] else ''
                 })
 
@@ -141,14 +468,15 @@ class ConsolidatedReportGenerator:
 
         Args:
             reports: List of organization reports
-            timestamp: Timestamp string for filename (optional, used if include_timestamp is True)
+            timestamp: Timestamp string for filename (optional, used if include_timestamp is True;
+                       defaults to the generator's shared run timestamp)
 
         Returns:
             Path to generated consolidated CSV file
         """
         if self.include_timestamp:
             if not timestamp:
-                timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+                timestamp = self.timestamp
             file_path = self.output_directory / f"all_organizations_chargeback_{timestamp}.csv"
         else:
             file_path = self.output_directory / f"all_organizations_chargeback.csv"
@@ -159,26 +487,21 @@ class ConsolidatedReportGenerator:
         chargeback_data = []
 
         for report in reports:
-            for group_name, group_data in report.chargeback_by_group.items():
-                licenses = group_data.get('licenses', {})
-                total_users = group_data.get('total_users', 0)
-                total_cost = group_data.get('total_cost', 0.0)
-                cost_per_user = total_cost / total_users if total_users > 0 else 0.0
-
+            for row in _build_chargeback_rows(report):
                 chargeback_data.append({
                     'Organization': report.organization,
-                    'Group Name': group_name,
-                    'Total Users': total_users,
-                    'Basic Licenses': licenses.get('Basic', 0),
-                    'Stakeholder Licenses': licenses.get('Stakeholder', 0),
-                    'VS Subscriber Licenses': licenses.get('Visual Studio Subscriber', 0),
-                    'VS Enterprise Licenses': licenses.get('Visual Studio Enterprise', 0),
-                    'Total Cost': f"{total_cost:.2f}",
-                    'Cost Per User': f"{cost_per_user:.2f}"
+                    'Group Name': row['Group Name'],
+                    'Total Users': row['Total Users'],
+                    'Basic Licenses': row['Basic Licenses'],
+                    'Stakeholder Licenses': row['Stakeholder Licenses'],
+                    'VS Subscriber Licenses': row['VS Subscriber Licenses'],
+                    'VS Enterprise Licenses': row['VS Enterprise Licenses'],
+                    'Total Cost': f"{row['Total Cost']:.2f}",
+                    'Cost Per User': f"{row['Cost Per User']:.2f}"
                 })
 
         # Write consolidated CSV
-        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
+        with _open_csv(file_path) as csvfile:
             fieldnames = [
                 'Organization', 'Group Name', 'Total Users', 'Basic Licenses',
                 'Stakeholder Licenses', 'VS Subscriber Licenses', 'VS Enterprise Licenses',
@@ -198,17 +521,30 @@ class ReportGenerator:
     for Azure DevOps entitlement reporting.
     """
 
-    def __init__(self, output_directory: Union[str, Path] = "./reports", include_timestamp: bool = True):
+    # Output format name -> name of the method writing it from prepared data
+    _FORMAT_GENERATORS = {
+        'csv': '_generate_csv_reports',
+        'json': '_generate_json_report',
+        'excel': '_generate_excel_report'
+    }
+
+    def __init__(self, output_directory: Union[str, Path] = "./reports", include_timestamp: bool = True,
+                 mmap_excel_output: bool = False, split_excel_sheets: bool = False):
         """
         Initialize the report generator.
 
         Args:
             output_directory: Directory to save reports
             include_timestamp: Whether to include timestamp in filenames (for static filenames, set to False)
+            mmap_excel_output: Build Excel workbooks in memory and write them through a memory map
+                               (can be faster on slow or network filesystems)
+            split_excel_sheets: Write each Excel worksheet to its own workbook, in parallel
         """
         self.output_directory = Path(output_directory)
         self.output_directory.mkdir(parents=True, exist_ok=True)
         self.include_timestamp = include_timestamp
+        self.mmap_excel_output = mmap_excel_output
+        self.split_excel_sheets = split_excel_sheets
         logger.info(f"Report generator initialized with output directory: {self.output_directory}, "
                    f"include_timestamp: {self.include_timestamp}")
 
@@ -223,26 +559,75 @@ class ReportGenerator:
         Returns:
             Dictionary mapping format names to generated file paths
         """
-        generated_files = {}
-
+        requested = []
         for format_type in formats:
-            try:
-                if format_type.lower() == 'csv':
-                    file_path = self.generate_csv_reports(report)
-                    generated_files['csv'] = file_path
-                elif format_type.lower() == 'json':
-                    file_path = self.generate_json_report(report)
-                    generated_files['json'] = file_path
-                elif format_type.lower() == 'excel':
-                    file_path = self.generate_excel_report(report)
-                    generated_files['excel'] = file_path
-                else:
-                    logger.warning(f"Unknown format type: {format_type}")
+            format_key = format_type.lower()
+            if format_key not in self._FORMAT_GENERATORS:
+                logger.warning(f"Unknown format type: {format_type}")
+            elif format_key not in requested:
+                requested.append(format_key)
+
+        if not requested:
+            return {}
+
+        # Derive shared per-summary data once before fanning out to the formats;
+        # the writers only read it, so they can safely run on separate threads
+        prepared = self._prepare(report)
+
+        results = {}
+        with ThreadPoolExecutor(max_workers=len(requested)) as executor:
+            futures = {executor.submit(self._generate_format, key, report, prepared): key for key in requested}
+            for future in as_completed(futures):
+                result = future.result()
+                if result is not None:
+                    results[futures[future]] = result
+
+        # Keep the requested format order regardless of completion order
+        return {key: results[key] for key in requested if key in results}
+
+    def _generate_format(self, format_key: str, report: OrganizationReport,
+                         prepared: _PreparedReport) -> Optional[Any]:
+        """
+        Generate a single output format, logging instead of raising on failure.
 
-            except Exception as e:
-                logger.error(f"Failed to generate {format_type} report: {e}")
+        Args:
+            format_key: Normalized format name ('csv', 'json' or 'excel')
+            report: Organization report data
+            prepared: Data derived from the report
 
-        return generated_files
+        Returns:
+            The generator's result, or None if generation failed
+        """
+        try:
+            return getattr(self, self._FORMAT_GENERATORS[format_key])(report, prepared)
+        except Exception as e:
+            logger.error(f"Failed to generate {format_key} report: {e}")
+            return None
+
+    def _prepare(self, report: OrganizationReport) -> _PreparedReport:
+        """
+        Derive the data shared by the CSV, JSON and Excel writers.
+
+        The result is built fresh on every call and passed to the writers
+        explicitly, so a report that changes between calls never sees data
+        derived from its earlier contents.
+
+        Args:
+            report: Organization report data
+
+        Returns:
+            Prepared data for the report
+        """
+        unique_groups, orphan_descriptors = _collect_all_groups(report)
+        license_rows, total_licenses = _build_license_rows(report)
+        return _PreparedReport(
+            summary_views=[_build_summary_view(s) for s in report.user_summaries],
+            chargeback_rows=_build_chargeback_rows(report),
+            unique_groups=unique_groups,
+            orphan_descriptors=orphan_descriptors,
+            license_rows=license_rows,
+            total_licenses=total_licenses
+        )
 
     def generate_csv_reports(self, report: OrganizationReport) -> Dict[str, Path]:
         """
@@ -254,6 +639,10 @@ class ReportGenerator:
         Returns:
             Dictionary mapping report types to file paths
         """
+        return self._generate_csv_reports(report, self._prepare(report))
+
+    def _generate_csv_reports(self, report: OrganizationReport, prepared: _PreparedReport) -> Dict[str, Path]:
+        """Generate the CSV reports from already prepared report data."""
         org_name = report.organization
 
         # Build filename suffix (timestamp or empty)
@@ -263,179 +652,159 @@ class ReportGenerator:
         else:
             suffix = ""
 
-        csv_files = {}
-
-        # 1. User Summary Report
-        user_summary_file = self.output_directory / f"{org_name}_user_summary{suffix}.csv"
-        csv_files['user_summary'] = self._generate_user_summary_csv(report, user_summary_file)
-
-        # 2. Chargeback Report
-        chargeback_file = self.output_directory / f"{org_name}_chargeback{suffix}.csv"
-        csv_files['chargeback'] = self._generate_chargeback_csv(report, chargeback_file)
-
-        # 3. Group Analysis Report
-        group_analysis_file = self.output_directory / f"{org_name}_group_analysis{suffix}.csv"
-        csv_files['group_analysis'] = self._generate_group_analysis_csv(report, group_analysis_file)
+        writers = {
+            # 1. User Summary Report
+            'user_summary': (self._generate_user_summary_csv, f"{org_name}_user_summary{suffix}.csv"),
+            # 2. Chargeback Report
+            'chargeback': (self._generate_chargeback_csv, f"{org_name}_chargeback{suffix}.csv"),
+            # 3. Group Analysis Report
+            'group_analysis': (self._generate_group_analysis_csv, f"{org_name}_group_analysis{suffix}.csv"),
+            # 4. License Summary Report
+            'license_summary': (self._generate_license_summary_csv, f"{org_name}_license_summary{suffix}.csv"),
+        }
 
-        # 4. License Summary Report
-        license_summary_file = self.output_directory / f"{org_name}_license_summary{suffix}.csv"
-        csv_files['license_summary'] = self._generate_license_summary_csv(report, license_summary_file)
+        # Each report writes its own file from read-only prepared data, so the
+        # four files are written concurrently; errors propagate via result()
+        with ThreadPoolExecutor(max_workers=len(writers)) as executor:
+            futures = {
+                report_type: executor.submit(writer, report, prepared, self.output_directory / file_name)
+                for report_type, (writer, file_name) in writers.items()
+            }
+            csv_files = {report_type: future.result() for report_type, future in futures.items()}
 
         logger.info(f"Generated {len(csv_files)} CSV reports")
         return csv_files
 
-    def _generate_user_summary_csv(self, report: OrganizationReport, file_path: Path) -> Path:
+    def _generate_user_summary_csv(self, report: OrganizationReport, prepared: _PreparedReport,
+                                   file_path: Path) -> Path:
         """Generate detailed user summary CSV report."""
         logger.debug(f"Generating user summary CSV: {file_path}")
 
-        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = [
+        with _open_csv(file_path) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow([
                 'Organization', 'User Name', 'Email', 'Principal Name', 'Unique Name', 'User ID', 'Origin ID',
                 'Descriptor', 'Origin', 'Domain', 'Access Level', 'License Display Name',
                 'Is Active', 'Direct Groups', 'All Groups', 'Chargeback Groups',
                 'License Cost', 'Last Accessed'
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-
-            for summary in report.user_summaries:
-                user = summary.user
-                entitlement = summary.entitlement
-
-                writer.writerow({
-                    'Organization': report.organization,
-                    'User Name': user.display_name,
-                    'Email': user.mail_address or '',
-                    'Principal Name': user.principal_name or '',
-                    'Unique Name': user.unique_name or '',
-                    'User ID': user.id or '',
-                    'Origin ID': user.origin_id or '',
-                    'Descriptor': user.descriptor,
-                    'Origin': user.origin or '',
-                    'Domain': user.domain or '',
-                    'Access Level': summary.effective_access_level.value if summary.effective_access_level else 'none',
-                    'License Display Name': entitlement.license_display_name if entitlement else '',
-                    'Is Active': 'Yes' if user.is_active else 'No' if user.is_active is not None else 'Unknown',
-                    'Direct Groups': '; '.join([g.display_name for g in summary.direct_groups]),
-                    'All Groups': '; '.join([g.display_name for g in summary.all_groups]),
-                    'Chargeback Groups': '; '.join(summary.chargeback_groups),
-                    'License Cost': summary.license_cost or 0.0,
-                    'Last Accessed': entitlement.last_accessed_date.strftime('%Y-%m-%d') if entitlement and entitlement.last_accessed_date else ''
-                })
+            ])
+            writer.writerows(self._iter_user_summary_rows(report, prepared))
 
         return file_path
 
-    def _generate_chargeback_csv(self, report: OrganizationReport, file_path: Path) -> Path:
+    def _iter_user_summary_rows(self, report: OrganizationReport,
+                                prepared: _PreparedReport) -> Iterator[Tuple[Any, ...]]:
+        """Yield user summary CSV rows as tuples in column order."""
+        organization = report.organization
+        for summary, view in zip(report.user_summaries, prepared.summary_views):
+            user = summary.user
+            entitlement = summary.entitlement
+            access_level = summary.effective_access_level
+            last_accessed = entitlement.last_accessed_date if entitlement else None
+
+            yield (
+                organization,
+                user.display_name,
+                user.mail_address or '',
+                user.principal_name or '',
+                user.unique_name or '',
+                user.id or '',
+                user.origin_id or '',
+                user.descriptor,
+                user.origin or '',
+                user.domain or '',
+                _ACCESS_LEVEL_VALUES.get(access_level, 'none'),
+                entitlement.license_display_name if entitlement else '',
+                _YES_NO_UNKNOWN[user.is_active],
+                '; '.join(view.direct_group_names),
+                '; '.join(view.all_group_names),
+                view.chargeback_groups,
+                summary.license_cost or 0.0,
+                last_accessed.strftime('%Y-%m-%d') if last_accessed else ''
+            )
+
+    def _generate_chargeback_csv(self, report: OrganizationReport, prepared: _PreparedReport,
+                                 file_path: Path) -> Path:
         """Generate chargeback analysis CSV report."""
         logger.debug(f"Generating chargeback CSV: {file_path}")
 
-        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = [
+        # Rows are mostly numeric, so they are written as preformatted lines;
+        # csv.writer is only used when a name needs quoting.
+        organization = report.organization
+        org_needs_quoting = _needs_csv_quoting(organization)
+
+        with _open_csv(file_path) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow([
                 'Organization', 'Group Name', 'Total Users', 'Basic Licenses', 'Stakeholder Licenses',
                 'VS Subscriber Licenses', 'VS Enterprise Licenses', 'Other Licenses',
                 'Total Cost', 'Cost Per User'
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-
-            for group_name, group_data in report.chargeback_by_group.items():
-                licenses = group_data.get('licenses', {})
-                total_users = group_data.get('total_users', 0)
-                total_cost = group_data.get('total_cost', 0.0)
-                cost_per_user = total_cost / total_users if total_users > 0 else 0.0
-
-                # Count license types
-                basic_count = licenses.get('Basic', 0)
-                stakeholder_count = licenses.get('Stakeholder', 0)
-                vs_subscriber_count = licenses.get('Visual Studio Subscriber', 0)
-                vs_enterprise_count = licenses.get('Visual Studio Enterprise', 0)
-                other_count = total_users - (basic_count + stakeholder_count + vs_subscriber_count + vs_enterprise_count)
-
-                writer.writerow({
-                    'Organization': report.organization,
-                    'Group Name': group_name,
-                    'Total Users': total_users,
-                    'Basic Licenses': basic_count,
-                    'Stakeholder Licenses': stakeholder_count,
-                    'VS Subscriber Licenses': vs_subscriber_count,
-                    'VS Enterprise Licenses': vs_enterprise_count,
-                    'Other Licenses': max(0, other_count),
-                    'Total Cost': f"{total_cost:.2f}",
-                    'Cost Per User': f"{cost_per_user:.2f}"
-                })
+            ])
+
+            for row in prepared.chargeback_rows:
+                group_name = row['Group Name']
+                values = (
+                    row['Total Users'], row['Basic Licenses'], row['Stakeholder Licenses'],
+                    row['VS Subscriber Licenses'], row['VS Enterprise Licenses'], row['Other Licenses'],
+                    f"{row['Total Cost']:.2f}", f"{row['Cost Per User']:.2f}"
+                )
+                if org_needs_quoting or _needs_csv_quoting(group_name):
+                    writer.writerow((organization, group_name) + values)
+                else:
+                    csvfile.write(f"{organization},{group_name},{','.join(map(str, values))}\r\n")
 
         return file_path
 
-    def _generate_group_analysis_csv(self, report: OrganizationReport, file_path: Path) -> Path:
+    def _generate_group_analysis_csv(self, report: OrganizationReport, prepared: _PreparedReport,
+                                     file_path: Path) -> Path:
         """Generate group analysis CSV report."""
         logger.debug(f"Generating group analysis CSV: {file_path}")
 
-        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = [
+        with _open_csv(file_path) as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow([
                 'Organization', 'Group Name', 'Group Type', 'Member Count', 'Is Security Group',
                 'Domain', 'Origin', 'Is Orphaned', 'Principal Name'
-            ]
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-
-            # Get all groups from user summaries
-            all_groups = {}
-            for summary in report.user_summaries:
-                for group in summary.all_groups:
-                    # Skip VSTS built-in groups
-                    if group.origin and group.origin.lower() == 'vsts':
-                        continue
-                    all_groups[group.descriptor] = group
-
-            # Add orphaned groups (excluding VSTS)
-            for group in report.orphaned_groups:
-                if group.origin and group.origin.lower() == 'vsts':
-                    continue
-                all_groups[group.descriptor] = group
-
-            for group in all_groups.values():
-                is_orphaned = group in report.orphaned_groups
-
-                writer.writerow({
-                    'Organization': report.organization,
-                    'Group Name': group.display_name,
-                    'Group Type': group.group_type.value if group.group_type else 'unknown',
-                    'Member Count': group.member_count or 0,
-                    'Is Security Group': 'Yes' if group.is_security_group else 'No' if group.is_security_group is not None else 'Unknown',
-                    'Domain': group.domain or '',
-                    'Origin': group.origin or '',
-                    'Is Orphaned': 'Yes' if is_orphaned else 'No',
-                    'Principal Name': group.principal_name or ''
-                })
+            ])
+
+            unique_groups = prepared.unique_groups
+            orphan_descriptors = prepared.orphan_descriptors
+
+            organization = report.organization
+            writer.writerows(
+                (
+                    organization,
+                    group.display_name,
+                    _GROUP_TYPE_VALUES.get(group.group_type, 'unknown'),
+                    group.member_count or 0,
+                    _YES_NO_UNKNOWN[group.is_security_group],
+                    group.domain or '',
+                    group.origin or '',
+                    'Yes' if group.descriptor in orphan_descriptors else 'No',
+                    group.principal_name or ''
+                )
+                for group in unique_groups
+            )
 
         return file_path
 
-    def _generate_license_summary_csv(self, report: OrganizationReport, file_path: Path) -> Path:
+    def _generate_license_summary_csv(self, report: OrganizationReport, prepared: _PreparedReport,
+                                      file_path: Path) -> Path:
         """Generate license summary CSV report."""
         logger.debug(f"Generating license summary CSV: {file_path}")
 
-        with open(file_path, 'w', newline='', encoding='utf-8') as csvfile:
-            fieldnames = ['License Type', 'Count', 'Percentage']
-            writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-            writer.writeheader()
-
-            total_licenses = sum(report.licenses_by_type.values())
+        # The report is only a handful of rows, so it is assembled in memory
+        # and written with a single call
+        lines = ['License Type,Count,Percentage\r\n']
+        lines.extend(
+            f"{_csv_field(license_name)},{count},{percentage}\r\n"
+            for license_name, count, percentage in prepared.license_rows
+        )
+        # Add summary row
+        lines.append(f"TOTAL,{prepared.total_licenses},100.0%\r\n")
 
-            for license_type, count in report.licenses_by_type.items():
-                percentage = (count / total_licenses * 100) if total_licenses > 0 else 0.0
-
-                writer.writerow({
-                    'License Type': license_type.replace('_', ' ').title(),
-                    'Count': count,
-                    'Percentage': f"{percentage:.1f}%"
-                })
-
-            # Add summary row
-            writer.writerow({
-                'License Type': 'TOTAL',
-                'Count': total_licenses,
-                'Percentage': '100.0%'
-            })
+        with _open_csv(file_path) as csvfile:
+            csvfile.write(''.join(lines))
 
         return file_path
 
@@ -449,6 +818,10 @@ class ReportGenerator:
         Returns:
             Path to generated JSON file
         """
+        return self._generate_json_report(report, self._prepare(report))
+
+    def _generate_json_report(self, report: OrganizationReport, prepared: _PreparedReport) -> Path:
+        """Generate the JSON report from already prepared report data."""
         org_name = report.organization
 
         # Build filename with or without timestamp
@@ -460,17 +833,55 @@ class ReportGenerator:
 
         logger.debug(f"Generating JSON report: {file_path}")
 
-        # Convert the report to a JSON-serializable format
-        report_data = self._prepare_json_data(report)
-
-        with open(file_path, 'w', encoding='utf-8') as jsonfile:
-            json.dump(report_data, jsonfile, indent=2, ensure_ascii=False, default=str)
+        with open(file_path, 'wb', buffering=_CSV_BUFFER_SIZE) as jsonfile:
+            self._write_json(report, prepared, jsonfile)
 
         logger.info(f"Generated JSON report: {file_path}")
         return file_path
 
-    def _prepare_json_data(self, report: OrganizationReport) -> Dict[str, Any]:
-        """Prepare report data for JSON serialization."""
+    def _write_json(self, report: OrganizationReport, prepared: _PreparedReport, output: BinaryIO) -> None:
+        """
+        Write the JSON report to a binary stream.
+
+        Args:
+            report: Organization report data
+            prepared: Data derived from the report
+            output: Binary file-like object to write to
+        """
+        for chunk in self._iter_json_chunks(report, prepared):
+            output.write(chunk)
+
+    def _iter_json_chunks(self, report: OrganizationReport, prepared: _PreparedReport) -> Iterator[bytes]:
+        """
+        Yield the JSON report as serialized byte segments.
+
+        The small sections are serialized whole, while user summaries are built
+        and serialized one at a time, so only a single summary's data is held
+        in memory instead of the full report as one nested structure.
+
+        Args:
+            report: Organization report data
+            prepared: Data derived from the report
+
+        Yields:
+            Consecutive segments of the indented JSON document
+        """
+        yield b'{'
+        for key, value in self._prepare_json_header(report).items():
+            yield b'\n  "' + key.encode('utf-8') + b'": ' + _dump_json(value, indent=2) + b','
+
+        yield b'\n  "user_summaries": ['
+        separator = b'\n    '
+        for summary, view in zip(report.user_summaries, prepared.summary_views):
+            yield separator + _dump_json(self._prepare_json_user_summary(summary, view), indent=4)
+            separator = b',\n    '
+        yield b'\n  ],' if report.user_summaries else b'],'
+
+        orphaned_groups = self._prepare_json_orphaned_groups(report)
+        yield b'\n  "orphaned_groups": ' + _dump_json(orphaned_groups, indent=2) + b'\n}'
+
+    def _prepare_json_header(self, report: OrganizationReport) -> Dict[str, Any]:
+        """Prepare the metadata, license and chargeback sections of the JSON report."""
         return {
             'metadata': {
                 'organization': report.organization,
@@ -484,89 +895,146 @@ class ReportGenerator:
                 'licenses_by_type': report.licenses_by_type,
                 'groups_by_type': report.groups_by_type
             },
-            'chargeback_analysis': report.chargeback_by_group,
-            'user_summaries': [
-                {
-                    'user': {
-                        'display_name': summary.user.display_name,
-                        'email': summary.user.mail_address,
-                        'unique_name': summary.user.unique_name,
-                        'principal_name': summary.user.principal_name,
-                        'user_id': summary.user.id,
-                        'origin_id': summary.user.origin_id,
-                        'descriptor': summary.user.descriptor,
-                        'origin': summary.user.origin,
-                        'domain': summary.user.domain,
-                        'is_active': summary.user.is_active
-                    },
-                    'entitlement': {
-                        'access_level': summary.effective_access_level.value if summary.effective_access_level else None,
-                        'license_display_name': summary.entitlement.license_display_name if summary.entitlement else None,
-                        'license_cost': summary.license_cost,
-                        'last_accessed': summary.entitlement.last_accessed_date.isoformat() if summary.entitlement and summary.entitlement.last_accessed_date else None
-                    },
-                    'groups': {
-                        'direct_groups': [g.display_name for g in summary.direct_groups],
-                        'all_groups': [g.display_name for g in summary.all_groups],
-                        'chargeback_groups': summary.chargeback_groups
-                    },
-                    'last_updated': summary.last_updated.isoformat()
-                }
-                for summary in report.user_summaries
-            ],
-            'orphaned_groups': [
-                {
-                    'display_name': group.display_name,
-                    'group_type': group.group_type.value if group.group_type else None,
-                    'origin': group.origin,
-                    'member_count': group.member_count or 0
-                }
-                for group in report.orphaned_groups
-            ]
+            'chargeback_analysis': report.chargeback_by_group
+        }
+
+    def _prepare_json_user_summary(self, summary: UserEntitlementSummary, view: _SummaryView) -> Dict[str, Any]:
+        """Prepare one entry of the JSON report's user_summaries array."""
+        user = summary.user
+        entitlement = summary.entitlement
+        access_level = summary.effective_access_level
+        last_accessed = entitlement.last_accessed_date if entitlement else None
+
+        return {
+            'user': {
+                'display_name': user.display_name,
+                'email': user.mail_address,
+                'unique_name': user.unique_name,
+                'principal_name': user.principal_name,
+                'user_id': user.id,
+                'origin_id': user.origin_id,
+                'descriptor': user.descriptor,
+                'origin': user.origin,
+                'domain': user.domain,
+                'is_active': user.is_active
+            },
+            'entitlement': {
+                'access_level': _ACCESS_LEVEL_VALUES.get(access_level),
+                'license_display_name': entitlement.license_display_name if entitlement else None,
+                'license_cost': summary.license_cost,
+                'last_accessed': last_accessed.isoformat() if last_accessed else None
+            },
+            'groups': {
+                'direct_groups': view.direct_group_names,
+                'all_groups': view.all_group_names,
+                'chargeback_groups': summary.chargeback_groups
+            },
+            'last_updated': summary.last_updated.isoformat()
         }
 
-    def generate_excel_report(self, report: OrganizationReport) -> Path:
+    def _prepare_json_orphaned_groups(self, report: OrganizationReport) -> List[Dict[str, Any]]:
+        """Prepare the orphaned_groups section of the JSON report."""
+        return [
+            {
+                'display_name': group.display_name,
+                'group_type': _GROUP_TYPE_VALUES.get(group.group_type),
+                'origin': group.origin,
+                'member_count': group.member_count or 0
+            }
+            for group in report.orphaned_groups
+        ]
+
+    def generate_excel_report(self, report: OrganizationReport) -> Union[Path, Dict[str, Path]]:
         """
         Generate comprehensive Excel report with multiple worksheets.
 
+        When ``split_excel_sheets`` is enabled, each worksheet is instead written
+        to its own workbook, all in parallel.
+
         Args:
             report: Organization report data
 
         Returns:
-            Path to generated Excel file
+            Path to generated Excel file, or a dictionary mapping sheet keys to
+            file paths when sheets are split
         """
+        return self._generate_excel_report(report, self._prepare(report))
+
+    def _generate_excel_report(self, report: OrganizationReport,
+                               prepared: _PreparedReport) -> Union[Path, Dict[str, Path]]:
+        """Generate the Excel report from already prepared report data."""
         org_name = report.organization
 
-        # Build filename with or without timestamp
+        # Build filename suffix (timestamp or empty)
         if self.include_timestamp:
             timestamp = report.generated_at.strftime("%Y%m%d_%H%M%S")
-            file_path = self.output_directory / f"{org_name}_report_{timestamp}.xlsx"
+            suffix = f"_{timestamp}"
         else:
-            file_path = self.output_directory / f"{org_name}_report.xlsx"
+            suffix = ""
 
-        logger.debug(f"Generating Excel report: {file_path}")
+        # Sheet rows may be consumed on worker threads; they only read prepared data
+        sheets = {
+            'summary': self._summary_sheet(report),
+            'user_details': self._user_details_sheet(report, prepared),
+            'chargeback': self._chargeback_sheet(prepared),
+            'group_analysis': self._group_analysis_sheet(report, prepared),
+            'license_analysis': self._license_analysis_sheet(prepared)
+        }
 
-        with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-            # Summary worksheet
-            self._create_summary_worksheet(report, writer)
+        if self.split_excel_sheets:
+            # Each workbook only reads prepared data, so they are written concurrently
+            with ThreadPoolExecutor(max_workers=len(sheets)) as executor:
+                futures = {
+                    sheet_key: executor.submit(
+                        self._write_workbook, self.output_directory / f"{org_name}_{sheet_key}{suffix}.xlsx", [sheet]
+                    )
+                    for sheet_key, sheet in sheets.items()
+                }
+                excel_files = {sheet_key: future.result() for sheet_key, future in futures.items()}
 
-            # User details worksheet
-            self._create_user_details_worksheet(report, writer)
+            logger.info(f"Generated {len(excel_files)} Excel reports")
+            return excel_files
 
-            # Chargeback worksheet
-            self._create_chargeback_worksheet(report, writer)
+        file_path = self._write_workbook(self.output_directory / f"{org_name}_report{suffix}.xlsx", sheets.values())
+        logger.info(f"Generated Excel report: {file_path}")
+        return file_path
 
-            # Group analysis worksheet
-            self._create_group_analysis_worksheet(report, writer)
+    def _write_workbook(self, file_path: Path, sheets: Iterable[_Sheet]) -> Path:
+        """
+        Write worksheets to an Excel workbook file.
 
-            # License analysis worksheet
-            self._create_license_analysis_worksheet(report, writer)
+        Args:
+            file_path: Output workbook path
+            sheets: Worksheets to write, in order
+
+        Returns:
+            Path to the written workbook
+        """
+        logger.debug(f"Generating Excel report: {file_path}")
+
+        # Rows go straight to the Excel library rather than through DataFrames;
+        # openpyxl is only a fallback when xlsxwriter is not installed
+        write_workbook = _write_xlsxwriter_workbook if xlsxwriter is not None else _write_openpyxl_workbook
+        if self.mmap_excel_output:
+            buffer = io.BytesIO()
+            write_workbook(buffer, sheets)
+            _write_file_mmap(file_path, buffer.getvalue())
+        else:
+            write_workbook(file_path, sheets)
 
-        logger.info(f"Generated Excel report: {file_path}")
         return file_path
 
-    def _create_summary_worksheet(self, report: OrganizationReport, writer: pd.ExcelWriter) -> None:
-        """Create summary worksheet for Excel report."""
+    def _summary_sheet(self, report: OrganizationReport) -> _Sheet:
+        """Build the summary worksheet for the Excel report."""
+        license_rows = [
+            [f"  {license_type.replace('_', ' ').title()}", count]
+            for license_type, count in report.licenses_by_type.items()
+        ]
+        group_type_rows = [
+            [f"  {group_type.replace('_', ' ').title()}", count]
+            for group_type, count in report.groups_by_type.items()
+        ]
+
         summary_data = [
             ['Organization', report.organization],
             ['Report Generated', report.generated_at.strftime('%Y-%m-%d %H:%M:%S UTC')],
@@ -576,129 +1044,90 @@ class ReportGenerator:
             ['Total License Cost', f"${report.total_license_cost:.2f}" if report.total_license_cost else 'N/A'],
             [''],
             ['License Distribution', ''],
-        ]
-
-        # Add license breakdown
-        for license_type, count in report.licenses_by_type.items():
-            summary_data.append([f"  {license_type.replace('_', ' ').title()}", count])
-
-        summary_data.extend([
+            *license_rows,
             [''],
             ['Group Type Distribution', ''],
-        ])
-
-        # Add group type breakdown
-        for group_type, count in report.groups_by_type.items():
-            summary_data.append([f"  {group_type.replace('_', ' ').title()}", count])
-
-        summary_df = pd.DataFrame(summary_data, columns=['Metric', 'Value'])
-        summary_df.to_excel(writer, sheet_name='Summary', index=False)
-
-    def _create_user_details_worksheet(self, report: OrganizationReport, writer: pd.ExcelWriter) -> None:
-        """Create user details worksheet for Excel report."""
-        user_data = []
+            *group_type_rows
+        ]
 
-        for summary in report.user_summaries:
+        return _Sheet('Summary', ('Metric', 'Value'), summary_data)
+
+    def _user_details_sheet(self, report: OrganizationReport, prepared: _PreparedReport) -> _Sheet:
+        """Build the user details worksheet for the Excel report."""
+        header = (
+            'Organization', 'User Name', 'Email', 'Principal Name', 'Unique Name', 'User ID', 'Origin ID',
+            'Descriptor', 'Origin', 'Domain', 'Access Level', 'License Display Name', 'Is Active',
+            'Direct Groups Count', 'Total Groups Count', 'Chargeback Groups', 'License Cost', 'Last Accessed'
+        )
+        return _Sheet('User Details', header, self._iter_user_detail_rows(report, prepared))
+
+    def _iter_user_detail_rows(self, report: OrganizationReport,
+                               prepared: _PreparedReport) -> Iterator[Tuple[Any, ...]]:
+        """Yield User Details worksheet rows as tuples in column order."""
+        organization = report.organization
+        for summary, view in zip(report.user_summaries, prepared.summary_views):
             user = summary.user
             entitlement = summary.entitlement
-
-            user_data.append({
-                'Organization': report.organization,
-                'User Name': user.display_name,
-                'Email': user.mail_address or '',
-                'Principal Name': user.principal_name or '',
-                'Unique Name': user.unique_name or '',
-                'User ID': user.id or '',
-                'Origin ID': user.origin_id or '',
-                'Descriptor': user.descriptor,
-                'Origin': user.origin or '',
-                'Domain': user.domain or '',
-                'Access Level': summary.effective_access_level.value if summary.effective_access_level else 'none',
-                'License Display Name': entitlement.license_display_name if entitlement else '',
-                'Is Active': 'Yes' if user.is_active else 'No' if user.is_active is not None else 'Unknown',
-                'Direct Groups Count': len(summary.direct_groups),
-                'Total Groups Count': len(summary.all_groups),
-                'Chargeback Groups': '; '.join(summary.chargeback_groups),
-                'License Cost': summary.license_cost or 0.0,
-                'Last Accessed': entitlement.last_accessed_date.strftime('%Y-%m-%d') if entitlement and entitlement.last_accessed_date else ''
-            })
-
-        user_df = pd.DataFrame(user_data)
-        user_df.to_excel(writer, sheet_name='User Details', index=False)
-
-    def _create_chargeback_worksheet(self, report: OrganizationReport, writer: pd.ExcelWriter) -> None:
-        """Create chargeback analysis worksheet for Excel report."""
-        chargeback_data = []
-
-        for group_name, group_data in report.chargeback_by_group.items():
-            licenses = group_data.get('licenses', {})
-            total_users = group_data.get('total_users', 0)
-            total_cost = group_data.get('total_cost', 0.0)
-
-            chargeback_data.append({
-                'Group Name': group_name,
-                'Total Users': total_users,
-                'Basic Licenses': licenses.get('basic', 0),
-                'Stakeholder Licenses': licenses.get('stakeholder', 0),
-                'VS Subscriber Licenses': licenses.get('visualStudioSubscriber', 0),
-                'VS Enterprise Licenses': licenses.get('visualStudioEnterprise', 0),
-                'Total Cost': total_cost,
-                'Cost Per User': total_cost / total_users if total_users > 0 else 0.0
-            })
-
-        chargeback_df = pd.DataFrame(chargeback_data)
-        chargeback_df.to_excel(writer, sheet_name='Chargeback Analysis', index=False)
-
-    def _create_group_analysis_worksheet(self, report: OrganizationReport, writer: pd.ExcelWriter) -> None:
-        """Create group analysis worksheet for Excel report."""
-        group_data = []
-
-        # Collect all unique groups (excluding VSTS)
-        all_groups = {}
-        for summary in report.user_summaries:
-            for group in summary.all_groups:
-                # Skip VSTS built-in groups
-                if group.origin and group.origin.lower() == 'vsts':
-                    continue
-                all_groups[group.descriptor] = group
-
-        for group in report.orphaned_groups:
-            # Skip VSTS built-in groups
-            if group.origin and group.origin.lower() == 'vsts':
-                continue
-            all_groups[group.descriptor] = group
-
-        for group in all_groups.values():
-            is_orphaned = group in report.orphaned_groups
-
-            group_data.append({
-                'Organization': report.organization,
-                'Group Name': group.display_name,
-                'Group Type': group.group_type.value if group.group_type else 'unknown',
-                'Member Count': group.member_count or 0,
-                'Is Security Group': 'Yes' if group.is_security_group else 'No' if group.is_security_group is not None else 'Unknown',
-                'Domain': group.domain or '',
-                'Origin': group.origin or '',
-                'Is Orphaned': 'Yes' if is_orphaned else 'No'
-            })
-
-        group_df = pd.DataFrame(group_data)
-        group_df.to_excel(writer, sheet_name='Group Analysis', index=False)
-
-    def _create_license_analysis_worksheet(self, report: OrganizationReport, writer: pd.ExcelWriter) -> None:
-        """Create license analysis worksheet for Excel report."""
-        license_data = []
-        total_licenses = sum(report.licenses_by_type.values())
-
-        for license_type, count in report.licenses_by_type.items():
-            percentage = (count / total_licenses * 100) if total_licenses > 0 else 0.0
-
-            license_data.append({
-                'License Type': license_type.replace('_', ' ').title(),
-                'Count': count,
-                'Percentage': f"{percentage:.1f}%",
-                'Cost Estimate': 'N/A'  # Could be expanded with actual cost data
-            })
-
-        license_df = pd.DataFrame(license_data)
-        license_df.to_excel(writer, sheet_name='License Analysis', index=False)
\ No newline at end of file
+            access_level = summary.effective_access_level
+            last_accessed = entitlement.last_accessed_date if entitlement else None
+
+            yield (
+                organization,
+                user.display_name,
+                user.mail_address or '',
+                user.principal_name or '',
+                user.unique_name or '',
+                user.id or '',
+                user.origin_id or '',
+                user.descriptor,
+                user.origin or '',
+                user.domain or '',
+                _ACCESS_LEVEL_VALUES.get(access_level, 'none'),
+                entitlement.license_display_name if entitlement else '',
+                _YES_NO_UNKNOWN[user.is_active],
+                len(summary.direct_groups),
+                len(view.all_group_names),
+                view.chargeback_groups,
+                summary.license_cost or 0.0,
+                last_accessed.strftime('%Y-%m-%d') if last_accessed else ''
+            )
+
+    def _chargeback_sheet(self, prepared: _PreparedReport) -> _Sheet:
+        """Build the chargeback analysis worksheet for the Excel report."""
+        header = (
+            'Group Name', 'Total Users', 'Basic Licenses', 'Stakeholder Licenses',
+            'VS Subscriber Licenses', 'VS Enterprise Licenses', 'Total Cost', 'Cost Per User'
+        )
+        rows = ([row[column] for column in header] for row in prepared.chargeback_rows)
+        return _Sheet('Chargeback Analysis', header, rows)
+
+    def _group_analysis_sheet(self, report: OrganizationReport, prepared: _PreparedReport) -> _Sheet:
+        """Build the group analysis worksheet for the Excel report."""
+        header = (
+            'Organization', 'Group Name', 'Group Type', 'Member Count', 'Is Security Group',
+            'Domain', 'Origin', 'Is Orphaned'
+        )
+        orphan_descriptors = prepared.orphan_descriptors
+        rows = (
+            (
+                report.organization,
+                group.display_name,
+                _GROUP_TYPE_VALUES.get(group.group_type, 'unknown'),
+                group.member_count or 0,
+                _YES_NO_UNKNOWN[group.is_security_group],
+                group.domain or '',
+                group.origin or '',
+                'Yes' if group.descriptor in orphan_descriptors else 'No'
+            )
+            for group in prepared.unique_groups
+        )
+        return _Sheet('Group Analysis', header, rows)
+
+    def _license_analysis_sheet(self, prepared: _PreparedReport) -> _Sheet:
+        """Build the license analysis worksheet for the Excel report."""
+        rows = (
+            # Cost Estimate could be expanded with actual cost data
+            (license_name, count, percentage, 'N/A')
+            for license_name, count, percentage in prepared.license_rows
+        )
+        return _Sheet('License Analysis', ('License Type', 'Count', 'Percentage', 'Cost Estimate'), rows)
@@ -0,0 +1,92 @@
+"""
+Shared pytest fixtures.
+"""
+
+import copy
+
+import pytest
+import yaml
+
+from src.auth import AzureDevOpsAuth, AuthConfig
+from src.data_processor import EntitlementDataProcessor
+
+
+def pytest_addoption(parser):
+    """Add the ``--run-slow`` command line option."""
+    parser.addoption("--run-slow", action="store_true", default=False, help="run tests marked as slow")
+
+
+def pytest_configure(config):
+    """Register the ``slow`` marker."""
+    config.addinivalue_line("markers", "slow: test is slow to run, skipped unless --run-slow is given")
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip tests marked as slow unless ``--run-slow`` is given."""
+    if config.getoption("--run-slow"):
+        return
+    skip_slow = pytest.mark.skip(reason="slow test, use --run-slow to run")
+    for item in items:
+        if "slow" in item.keywords:
+            item.add_marker(skip_slow)
+
+
+SHARED_CONFIG_DATA = {
+    "organizations": ["test-org"],
+    "api": {"timeout": 60},
+    "output": {"formats": ["csv"]},
+    "reports": {"group_details": False}
+}
+
+
+@pytest.fixture(scope="session")
+def yaml_config_path(tmp_path_factory):
+    """Write the shared test configuration to a YAML file once per session.
+
+    Tests must treat the file as read-only.
+
+    Returns:
+        Path to the YAML configuration file.
+    """
+    config_path = tmp_path_factory.mktemp("config") / "config.yaml"
+    with open(config_path, 'w') as f:
+        yaml.dump(SHARED_CONFIG_DATA, f)
+    return config_path
+
+
+@pytest.fixture(scope="session")
+def auth():
+    """Authentication handler for the test organization, shared by all tests.
+
+    Returns:
+        AzureDevOpsAuth for organization ``test-org``.
+    """
+    return AzureDevOpsAuth(AuthConfig(pat_token="test-token", organization="test-org"))
+
+
+@pytest.fixture(scope="session")
+def processor_template(auth):
+    """Build a processor and its API clients once per session.
+
+    Returns:
+        EntitlementDataProcessor that tests must not modify; use ``processor``.
+    """
+    return EntitlementDataProcessor(auth)
+
+
+@pytest.fixture
+def processor(processor_template):
+    """Copy the template processor for a single test.
+
+    The API clients are shared with the template, so tests replace them with
+    mocks rather than mutating them. Data containers are copied so each test
+    starts empty.
+
+    Returns:
+        EntitlementDataProcessor owned by the calling test.
+    """
+    instance = copy.copy(processor_template)
+    for name, value in vars(processor_template).items():
+        if isinstance(value, (dict, list)):
+            setattr(instance, name, copy.copy(value))
+    return instance
@@ -0,0 +1,37 @@
+"""
+Shared model instances and factories for tests.
+
+The instances are built once and shared between tests, so treat them as
+read-only; take a model_copy() before changing one.
+"""
+
+from functools import lru_cache
+from typing import Optional
+
+from src.models import User, Group, Entitlement, AccessLevel, GroupType
+
+
+JOHN = User(descriptor="user-1", display_name="John Doe", mail_address="john@test.com")
+JANE = User(descriptor="user-2", display_name="Jane Smith", mail_address="jane@test.com")
+JOHN_BASIC = Entitlement(user_descriptor="user-1", access_level=AccessLevel.BASIC)
+JANE_STAKEHOLDER = Entitlement(user_descriptor="user-2", access_level=AccessLevel.STAKEHOLDER)
+DEVELOPERS = Group(descriptor="group-1", display_name="Developers", group_type=GroupType.AZURE_AD)
+EMPTY_DEVELOPERS = DEVELOPERS.model_copy(update={"member_count": 0})
+
+
+@lru_cache(maxsize=None)
+def make_user(descriptor: str = "user-1", name: str = "John Doe", origin: Optional[str] = None) -> User:
+    """
+    Get a user with only the identifying fields set.
+
+    Repeated calls with the same arguments return the same instance.
+
+    Args:
+        descriptor: User descriptor
+        name: Display name
+        origin: Origin of the user, e.g. 'aad' or 'vsts'
+
+    Returns:
+        Shared User instance
+    """
+    return User(descriptor=descriptor, display_name=name, origin=origin)
@@ -3,14 +3,30 @@ Tests for the Azure DevOps authentication module.
 """
 
 import base64
+import dataclasses
 import os
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 import requests
+import responses
 
+from src import auth as auth_module
 from src.auth import AzureDevOpsAuth, AuthConfig, AuthManager
 
 
+PROFILE_URL = "https://vssps.dev.azure.com/test-org/_apis/profile/profiles/me"
+
+
+@pytest.fixture(autouse=True)
+def clear_token_validation_cache():
+    """Keep cached token validations and sessions from leaking between tests."""
+    auth_module._TOKEN_VALIDATION_CACHE.clear()
+    auth_module.clear_session_cache()
+    yield
+    auth_module._TOKEN_VALIDATION_CACHE.clear()
+    auth_module.clear_session_cache()
+
+
 class TestAuthConfig:
     """Tests for AuthConfig dataclass."""
 
@@ -39,6 +55,27 @@ class TestAuthConfig:
         assert config.base_url == "https://custom.dev.azure.com"
         assert config.vssps_base_url == "https://custom.vssps.dev.azure.com"
 
+    def test_auth_config_organization_urls(self):
+        """Test that organization URLs are joined at construction."""
+        config = AuthConfig(
+            pat_token="test-token",
+            organization="test-org",
+            vsaex_base_url="https://custom.vsaex.dev.azure.com"
+        )
+
+        assert config.core_url == "https://dev.azure.com/test-org"
+        assert config.vssps_url == "https://vssps.dev.azure.com/test-org"
+        assert config.vsaex_url == "https://custom.vsaex.dev.azure.com/test-org"
+
+    def test_auth_config_is_immutable(self):
+        """Test that AuthConfig cannot be modified and is hashable."""
+        config = AuthConfig(pat_token="test-token", organization="test-org")
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            config.organization = "other-org"
+
+        assert hash(config) == hash(AuthConfig(pat_token="test-token", organization="test-org"))
+
 
 class TestAzureDevOpsAuth:
     """Tests for AzureDevOpsAuth class."""
@@ -49,7 +86,7 @@ class TestAzureDevOpsAuth:
         auth = AzureDevOpsAuth(config)
 
         assert auth.config == config
-        assert auth._session is None
+        assert auth._sessions == {}
 
     def test_init_empty_token(self):
         """Test initialization with empty PAT token."""
@@ -86,6 +123,15 @@ class TestAzureDevOpsAuth:
         encoded_part = header.split(" ")[1]
         decoded = base64.b64decode(encoded_part).decode()
         assert decoded == ":test-token"
+        assert auth._auth_header == header
+
+    def test_create_auth_header_matches_stdlib(self):
+        """Test the header encoding is bit-for-bit identical to stdlib base64."""
+        for token in ("a", "ab", "abc", "x" * 52, "tøkén-with-ünicode"):
+            auth = AzureDevOpsAuth(AuthConfig(pat_token=token, organization="test-org"))
+
+            expected = base64.b64encode(f":{token}".encode()).decode()
+            assert auth._create_auth_header() == f"Basic {expected}"
 
     def test_get_session(self):
         """Test getting authenticated session."""
@@ -95,7 +141,7 @@ class TestAzureDevOpsAuth:
         session = auth.get_session()
 
         assert isinstance(session, requests.Session)
-        assert "Authorization" in session.headers
+        assert session.headers["Authorization"] == auth._auth_header
         assert "Content-Type" in session.headers
         assert session.headers["Content-Type"] == "application/json"
         assert session.headers["Accept"] == "application/json"
@@ -104,6 +150,54 @@ class TestAzureDevOpsAuth:
         session2 = auth.get_session()
         assert session is session2
 
+    def test_get_session_shared_between_instances(self):
+        """Test that auth objects for the same token and organization share a session."""
+        auth1 = AzureDevOpsAuth(AuthConfig(pat_token="shared-token", organization="shared-org"))
+        auth2 = AzureDevOpsAuth(AuthConfig(pat_token="shared-token", organization="shared-org"))
+        other_org = AzureDevOpsAuth(AuthConfig(pat_token="shared-token", organization="other-org"))
+        other_token = AzureDevOpsAuth(AuthConfig(pat_token="other-token", organization="shared-org"))
+
+        session = auth1.get_session()
+
+        assert auth2.get_session() is session
+        assert other_org.get_session() is not session
+        assert other_token.get_session() is not session
+        assert other_token.get_session().headers["Authorization"] == other_token._auth_header
+
+    def test_get_session_per_retry_count(self):
+        """Test that each retry count gets its own session and retrying adapter."""
+        auth = AzureDevOpsAuth(AuthConfig(pat_token="test-token", organization="test-org"))
+
+        default = auth.get_session()
+        patient = auth.get_session(max_retries=5)
+
+        assert patient is not default
+        assert auth.get_session(max_retries=5) is patient
+        assert default.get_adapter("https://dev.azure.com").max_retries.total == 3
+        assert patient.get_adapter("https://dev.azure.com").max_retries.total == 5
+
+    def test_session_cache_is_bounded(self):
+        """Test that the oldest shared session is dropped once the cache is full."""
+        auths = [
+            AzureDevOpsAuth(AuthConfig(pat_token=f"token-{i}", organization="test-org"))
+            for i in range(auth_module._SESSION_CACHE_MAXSIZE + 1)
+        ]
+        sessions = [auth.get_session() for auth in auths]
+
+        assert len(auth_module._SESSION_CACHE) == auth_module._SESSION_CACHE_MAXSIZE
+        assert sessions[0] not in auth_module._SESSION_CACHE.values()
+        assert sessions[-1] in auth_module._SESSION_CACHE.values()
+
+    def test_clear_session_cache(self):
+        """Test that clearing the cache gives new auth objects a new session."""
+        config = AuthConfig(pat_token="test-token", organization="test-org")
+        session = AzureDevOpsAuth(config).get_session()
+
+        auth_module.clear_session_cache()
+
+        assert auth_module._SESSION_CACHE == {}
+        assert AzureDevOpsAuth(config).get_session() is not session
+
     def test_get_organization_url(self):
         """Test getting organization URLs for different API types."""
         config = AuthConfig(pat_token="test-token", organization="test-org")
@@ -125,12 +219,10 @@ class TestAzureDevOpsAuth:
         with pytest.raises(ValueError, match="Unknown API type: invalid"):
             auth.get_organization_url("invalid")
 
-    @patch('src.auth.requests.Session.get')
-    def test_validate_token_success(self, mock_get):
+    @responses.activate
+    def test_validate_token_success(self):
         """Test successful token validation."""
-        mock_response = MagicMock()
-        mock_response.status_code = 200
-        mock_get.return_value = mock_response
+        responses.add(responses.GET, PROFILE_URL, status=200)
 
         config = AuthConfig(pat_token="test-token", organization="test-org")
         auth = AzureDevOpsAuth(config)
@@ -138,14 +230,13 @@ class TestAzureDevOpsAuth:
         result = auth.validate_token()
 
         assert result is True
-        mock_get.assert_called_once()
+        assert len(responses.calls) == 1
+        assert responses.calls[0].request.headers["Authorization"] == auth._auth_header
 
-    @patch('src.auth.requests.Session.get')
-    def test_validate_token_unauthorized(self, mock_get):
+    @responses.activate
+    def test_validate_token_unauthorized(self):
         """Test token validation with unauthorized response."""
-        mock_response = MagicMock()
-        mock_response.status_code = 401
-        mock_get.return_value = mock_response
+        responses.add(responses.GET, PROFILE_URL, status=401)
 
         config = AuthConfig(pat_token="test-token", organization="test-org")
         auth = AzureDevOpsAuth(config)
@@ -154,12 +245,10 @@ class TestAzureDevOpsAuth:
 
         assert result is False
 
-    @patch('src.auth.requests.Session.get')
-    def test_validate_token_unexpected_status(self, mock_get):
+    @responses.activate
+    def test_validate_token_unexpected_status(self):
         """Test token validation with unexpected status code."""
-        mock_response = MagicMock()
-        mock_response.status_code = 500
-        mock_get.return_value = mock_response
+        responses.add(responses.GET, PROFILE_URL, status=500)
 
         config = AuthConfig(pat_token="test-token", organization="test-org")
         auth = AzureDevOpsAuth(config)
@@ -168,10 +257,13 @@ class TestAzureDevOpsAuth:
 
         assert result is False
 
-    @patch('src.auth.requests.Session.get')
-    def test_validate_token_request_exception(self, mock_get):
+    @responses.activate
+    def test_validate_token_request_exception(self):
         """Test token validation with request exception."""
-        mock_get.side_effect = requests.exceptions.RequestException("Network error")
+        responses.add(
+            responses.GET, PROFILE_URL,
+            body=requests.exceptions.ConnectionError("Network error")
+        )
 
         config = AuthConfig(pat_token="test-token", organization="test-org")
         auth = AzureDevOpsAuth(config)
@@ -180,6 +272,52 @@ class TestAzureDevOpsAuth:
 
         assert result is False
 
+    @responses.activate
+    def test_validate_token_cached(self):
+        """Test that a successful validation is not repeated within the TTL."""
+        responses.add(responses.GET, PROFILE_URL, status=200)
+
+        config = AuthConfig(pat_token="test-token", organization="test-org")
+
+        assert AzureDevOpsAuth(config).validate_token() is True
+        assert AzureDevOpsAuth(config).validate_token() is True
+        assert len(responses.calls) == 1
+
+        # Expired entries trigger a fresh request
+        with patch('src.auth.time.monotonic', return_value=auth_module.time.monotonic() + 301):
+            assert AzureDevOpsAuth(config).validate_token() is True
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_validate_token_errors_not_cached(self):
+        """Test that transient failures are retried on the next validation."""
+        responses.add(
+            responses.GET, PROFILE_URL,
+            body=requests.exceptions.ConnectionError("Network error")
+        )
+
+        auth = AzureDevOpsAuth(AuthConfig(pat_token="test-token", organization="test-org"))
+
+        assert auth.validate_token() is False
+        assert auth.validate_token() is False
+        assert len(responses.calls) == 2
+
+    @patch.object(auth_module, '_TOKEN_VALIDATION_CACHE_MAXSIZE', 3)
+    def test_token_validation_cache_is_bounded(self):
+        """Test that a full validation cache drops expired entries first, then the oldest."""
+        with patch('src.auth.time.monotonic', return_value=0):
+            auth_module._cache_token_validation(("a", PROFILE_URL), True)
+        with patch('src.auth.time.monotonic', return_value=400):
+            auth_module._cache_token_validation(("b", PROFILE_URL), True)
+            auth_module._cache_token_validation(("c", PROFILE_URL), False)
+            auth_module._cache_token_validation(("d", PROFILE_URL), True)
+
+            assert [key for key, _ in auth_module._TOKEN_VALIDATION_CACHE] == ["b", "c", "d"]
+
+            auth_module._cache_token_validation(("e", PROFILE_URL), True)
+
+        assert [key for key, _ in auth_module._TOKEN_VALIDATION_CACHE] == ["c", "d", "e"]
+
 
 class TestAuthManager:
     """Tests for AuthManager class."""
@@ -206,20 +344,43 @@ class TestAuthManager:
         assert auth.config.pat_token == "env-token"
         assert auth.config.organization == "override-org"
 
-    @patch('src.auth.load_dotenv')
+    @patch('dotenv.load_dotenv')
     @patch.dict(os.environ, {}, clear=True)
     def test_from_environment_missing_token(self, mock_load_dotenv):
         """Test creating auth from environment with missing PAT token."""
         with pytest.raises(ValueError, match="AZURE_DEVOPS_PAT environment variable is required"):
             AuthManager.from_environment()
 
-    @patch('src.auth.load_dotenv')
+    @patch('dotenv.load_dotenv')
     @patch.dict(os.environ, {'AZURE_DEVOPS_PAT': 'env-token'}, clear=True)
     def test_from_environment_missing_organization(self, mock_load_dotenv):
         """Test creating auth from environment with missing organization."""
         with pytest.raises(ValueError, match="Organization name is required"):
             AuthManager.from_environment()
 
+    @patch('dotenv.load_dotenv')
+    @patch.dict(os.environ, {'AZURE_DEVOPS_PAT': 'env-token'}, clear=True)
+    def test_from_environment_skips_dotenv_when_set(self, mock_load_dotenv):
+        """Test that the .env file is not read when the environment is complete."""
+        auth = AuthManager.from_environment(organization="param-org")
+
+        assert auth.config.organization == "param-org"
+        mock_load_dotenv.assert_not_called()
+
+    @patch.dict(os.environ, {}, clear=True)
+    def test_from_environment_loads_dotenv_when_missing(self):
+        """Test that variables missing from the environment are read from .env."""
+        def fake_load_dotenv():
+            os.environ['AZURE_DEVOPS_PAT'] = 'dotenv-token'
+            os.environ['AZURE_DEVOPS_ORGANIZATION'] = 'dotenv-org'
+
+        with patch('dotenv.load_dotenv', side_effect=fake_load_dotenv) as mock_load_dotenv:
+            auth = AuthManager.from_environment()
+
+        mock_load_dotenv.assert_called_once()
+        assert auth.config.pat_token == "dotenv-token"
+        assert auth.config.organization == "dotenv-org"
+
     def test_from_token(self):
         """Test creating auth from explicit token and organization."""
         auth = AuthManager.from_token("explicit-token", "explicit-org")
@@ -2,10 +2,10 @@
 Tests for the configuration management module.
 """
 
-import os
-import tempfile
+import importlib.util
+import json
+
 import pytest
-from pathlib import Path
 from unittest.mock import patch, mock_open
 
 import yaml
@@ -17,6 +17,9 @@ from src.config import (
 )
 
 
+HAS_BENCHMARK = importlib.util.find_spec("pytest_benchmark") is not None
+
+
 class TestApiConfig:
     """Tests for ApiConfig model."""
 
@@ -205,166 +208,222 @@ class TestConfigManager:
         with pytest.raises(FileNotFoundError, match="Configuration file not found"):
             manager.load_config()
 
-    def test_load_config_success(self):
+    def test_load_config_success(self, yaml_config_path):
         """Test successful config loading."""
-        config_data = {
-            "organizations": ["test-org"],
-            "api": {"timeout": 45},
-            "output": {"formats": ["json"]}
-        }
-
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_path = f.name
-
-        try:
-            manager = ConfigManager(temp_path)
-            config = manager.load_config()
+        manager = ConfigManager(str(yaml_config_path))
+        config = manager.load_config()
 
-            assert config.organizations == ["test-org"]
-            assert config.api.timeout == 45
-            assert config.output.formats == ["json"]
-        finally:
-            os.unlink(temp_path)
+        assert config.organizations == ["test-org"]
+        assert config.api.timeout == 60
+        assert config.output.formats == ["csv"]
 
-    def test_load_config_with_override_organizations(self):
+    def test_load_config_with_override_organizations(self, tmp_path):
         """Test loading config with organization override."""
         config_data = {"organizations": ["original-org"]}
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(yaml.safe_dump(config_data))
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_path = f.name
-
-        try:
-            manager = ConfigManager(temp_path)
-            config = manager.load_config(override_organizations=["override-org"])
+        manager = ConfigManager(str(config_path))
+        config = manager.load_config(override_organizations=["override-org"])
 
-            assert config.organizations == ["override-org"]
-        finally:
-            os.unlink(temp_path)
+        assert config.organizations == ["override-org"]
 
-    def test_load_config_empty_file(self):
+    def test_load_config_empty_file(self, tmp_path):
         """Test loading config from empty file."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            f.write("")
-            temp_path = f.name
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text("")
+
+        manager = ConfigManager(str(config_path))
+        config = manager.load_config()
+
+        # Should create config with defaults
+        assert isinstance(config, AppConfig)
+        assert config.organizations == []
 
-        try:
-            manager = ConfigManager(temp_path)
-            config = manager.load_config()
+    def test_load_config_empty_file_returns_independent_copies(self, tmp_path):
+        """Test that default configs from empty files do not share state."""
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text("")
 
-            # Should create config with defaults
-            assert isinstance(config, AppConfig)
-            assert config.organizations == []
-        finally:
-            os.unlink(temp_path)
+        first = ConfigManager(str(config_path)).load_config()
+        first.output.directory = "/tmp/changed"
+        first.organizations.append("changed-org")
 
-    def test_load_config_invalid_yaml(self):
+        second = ConfigManager(str(config_path)).load_config()
+
+        assert second == AppConfig()
+
+    def test_load_config_invalid_yaml(self, tmp_path):
         """Test loading config with invalid YAML."""
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            f.write("invalid: yaml: content: [")
-            temp_path = f.name
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text("invalid: yaml: content: [")
 
-        try:
-            manager = ConfigManager(temp_path)
+        manager = ConfigManager(str(config_path))
 
-            with pytest.raises(yaml.YAMLError, match="Error parsing YAML"):
-                manager.load_config()
-        finally:
-            os.unlink(temp_path)
+        with pytest.raises(yaml.YAMLError, match="Error parsing YAML"):
+            manager.load_config()
 
-    def test_load_config_invalid_configuration(self):
+    def test_load_config_invalid_configuration(self, tmp_path):
         """Test loading config with invalid configuration values."""
         config_data = {"api": {"timeout": "invalid"}}
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(yaml.safe_dump(config_data))
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_path = f.name
+        manager = ConfigManager(str(config_path))
 
-        try:
-            manager = ConfigManager(temp_path)
+        with pytest.raises(ValueError, match="Error loading configuration"):
+            manager.load_config()
 
-            with pytest.raises(ValueError, match="Error loading configuration"):
-                manager.load_config()
-        finally:
-            os.unlink(temp_path)
+    def test_load_config_non_mapping(self, tmp_path):
+        """Test loading config whose top level is not a mapping."""
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(yaml.safe_dump(["test-org"]))
 
-    def test_get_config_loads_if_not_loaded(self):
-        """Test that get_config loads config if not already loaded."""
-        config_data = {"organizations": ["test-org"]}
+        manager = ConfigManager(str(config_path))
+
+        with pytest.raises(ValueError, match="Error loading configuration"):
+            manager.load_config()
+
+    def test_compile_config_matches_yaml(self, yaml_config_path, tmp_path):
+        """Test that a compiled config loads the same as its YAML source."""
+        manager = ConfigManager(str(yaml_config_path))
+        compiled_path = manager.compile_config(tmp_path / "compiled_config.json")
+
+        compiled = ConfigManager(compiled_path).load_config()
+
+        assert compiled == manager.load_config()
+        assert ConfigManager(compiled_path).load_config(
+            override_organizations=["override-org"]
+        ).organizations == ["override-org"]
+
+    def test_compile_config_rejects_python_output(self, yaml_config_path, tmp_path):
+        """Test that configs are only compiled to JSON."""
+        manager = ConfigManager(str(yaml_config_path))
+
+        with pytest.raises(ValueError, match="must be a .json file"):
+            manager.compile_config(tmp_path / "compiled_config.py")
+
+    def test_load_config_does_not_execute_python(self, tmp_path):
+        """Test that a .py config path is parsed, never executed."""
+        marker = tmp_path / "executed"
+        config_path = tmp_path / "config.py"
+        config_path.write_text(f"open({str(marker)!r}, 'w').close()\nCONFIG_DATA = {{}}\n")
+
+        with pytest.raises(ValueError, match="Error loading configuration"):
+            ConfigManager(config_path).load_config()
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_path = f.name
+        assert not marker.exists()
 
-        try:
-            manager = ConfigManager(temp_path)
-            config = manager.get_config()
+    def test_load_config_json_matches_yaml(self, yaml_config_path, tmp_path):
+        """Test that a JSON config loads the same as the equivalent YAML."""
+        json_path = tmp_path / "config.json"
+        json_path.write_text(json.dumps(yaml.safe_load(yaml_config_path.read_text())))
 
-            assert config.organizations == ["test-org"]
-            # Second call should return cached config
-            config2 = manager.get_config()
-            assert config is config2
-        finally:
-            os.unlink(temp_path)
+        config = ConfigManager(str(json_path)).load_config()
 
-    def test_create_default_config(self):
+        assert config == ConfigManager(str(yaml_config_path)).load_config()
+
+    def test_load_config_json_stdlib_fallback(self, tmp_path):
+        """Test JSON config loading without orjson, including empty files."""
+        json_path = tmp_path / "config.json"
+        json_path.write_text('{"organizations": ["json-org"]}')
+        empty_path = tmp_path / "empty.json"
+        empty_path.write_text("")
+
+        with patch('src.config.orjson', None):
+            config = ConfigManager(str(json_path)).load_config()
+            empty_config = ConfigManager(str(empty_path)).load_config()
+
+        assert config.organizations == ["json-org"]
+        assert empty_config == AppConfig()
+
+    def test_load_config_invalid_json(self, tmp_path):
+        """Test loading config with invalid JSON."""
+        json_path = tmp_path / "config.json"
+        json_path.write_text('{"organizations": [')
+
+        with pytest.raises(ValueError, match="Error loading configuration"):
+            ConfigManager(str(json_path)).load_config()
+
+    def test_get_config_loads_if_not_loaded(self, yaml_config_path):
+        """Test that get_config loads config if not already loaded."""
+        manager = ConfigManager(str(yaml_config_path))
+        config = manager.get_config()
+
+        assert config.organizations == ["test-org"]
+        # Second call should return cached config
+        config2 = manager.get_config()
+        assert config is config2
+
+    def test_create_default_config(self, tmp_path):
         """Test creating default configuration file."""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_path = Path(temp_dir) / "test_config.yaml"
-            manager = ConfigManager()
+        output_path = tmp_path / "test_config.yaml"
+        manager = ConfigManager()
+
+        created_path = manager.create_default_config(output_path)
+
+        assert created_path == output_path
+        assert output_path.exists()
+
+        # Verify the created file can be loaded
+        content = output_path.read_text()
+        assert "Azure DevOps Entitlement Reporting Configuration" in content
+        assert "organizations:" in content
 
-            created_path = manager.create_default_config(output_path)
+    def test_load_config_matches_safe_load(self, tmp_path):
+        """Test that the C loader parses the default config like yaml.safe_load."""
+        output_path = tmp_path / "test_config.yaml"
+        manager = ConfigManager(output_path)
+        manager.create_default_config(output_path)
 
-            assert created_path == output_path
-            assert output_path.exists()
+        expected = AppConfig(**(yaml.safe_load(output_path.read_text()) or {}))
 
-            # Verify the created file can be loaded
-            with open(output_path, 'r') as f:
-                content = f.read()
-                assert "Azure DevOps Entitlement Reporting Configuration" in content
-                assert "organizations:" in content
+        assert manager.load_config() == expected
 
-    def test_validate_config_directory_creation_failure(self):
+    def test_validate_config_writable_directory(self, tmp_path):
+        """Test config validation with a writable output directory."""
+        output_dir = tmp_path / "reports"
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(yaml.safe_dump({
+            "organizations": ["test-org"],
+            "output": {"directory": str(output_dir)}
+        }))
+
+        manager = ConfigManager(str(config_path))
+
+        assert manager.validate_config() is True
+        assert list(output_dir.iterdir()) == []
+
+    def test_validate_config_directory_creation_failure(self, tmp_path):
         """Test config validation when directory creation fails."""
         config_data = {"output": {"directory": "/root/invalid/path"}}
+        config_path = tmp_path / "config.yaml"
+        config_path.write_text(yaml.safe_dump(config_data))
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_path = f.name
+        manager = ConfigManager(str(config_path))
+        manager.load_config()
 
-        try:
-            manager = ConfigManager(temp_path)
-            manager.load_config()
-
-            # This should fail because /root/invalid/path is not writable
-            result = manager.validate_config()
-            assert result is False
-        finally:
-            os.unlink(temp_path)
+        # This should fail because /root/invalid/path is not writable
+        result = manager.validate_config()
+        assert result is False
 
-    def test_get_organization_config(self):
+    def test_get_organization_config(self, yaml_config_path):
         """Test getting organization-specific configuration."""
-        config_data = {
-            "organizations": ["test-org"],
-            "api": {"timeout": 60},
-            "output": {"formats": ["csv"]},
-            "reports": {"group_details": False}
-        }
+        manager = ConfigManager(str(yaml_config_path))
+        manager.load_config()
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.yaml', delete=False) as f:
-            yaml.dump(config_data, f)
-            temp_path = f.name
+        org_config = manager.get_organization_config("test-org")
 
-        try:
-            manager = ConfigManager(temp_path)
-            manager.load_config()
+        assert org_config['organization'] == "test-org"
+        assert org_config['api']['timeout'] == 60
+        assert org_config['output']['formats'] == ["csv"]
+        assert org_config['reports']['group_details'] is False
+
+    @pytest.mark.skipif(not HAS_BENCHMARK, reason="pytest-benchmark not installed")
+    def test_bench_load_config(self, benchmark, yaml_config_path):
+        """Benchmark config loading to catch parse-time regressions."""
+        manager = ConfigManager(str(yaml_config_path))
 
-            org_config = manager.get_organization_config("test-org")
+        config = benchmark(manager.load_config)
 
-            assert org_config['organization'] == "test-org"
-            assert org_config['api']['timeout'] == 60
-            assert org_config['output']['formats'] == ["csv"]
-            assert org_config['reports']['group_details'] is False
-        finally:
-            os.unlink(temp_path)
\ No newline at end of file
+        assert config.organizations == ["test-org"]
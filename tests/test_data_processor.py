@@ -2,84 +2,183 @@
 Tests for the data processor module.
 """
 
+import copy
+import sys
+from types import SimpleNamespace
+from unittest.mock import Mock
+
 import pytest
-from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime, timezone
 
-from src.auth import AzureDevOpsAuth, AuthConfig
-from src.data_processor import EntitlementDataProcessor
+from src.config import ReportsConfig
 from src.models import (
     User, Group, Entitlement, GroupMembership, UserEntitlementSummary,
     OrganizationReport, SubjectKind, AccessLevel, GroupType
 )
+from tests.factories import (
+    JOHN, JANE, JOHN_BASIC, JANE_STAKEHOLDER, DEVELOPERS, EMPTY_DEVELOPERS, make_user
+)
+
+
+CHARGEBACK_CANDIDATE_GROUPS = [
+    Group(
+        descriptor="group-1",
+        display_name="Developers Team",
+        group_type=GroupType.AZURE_AD,
+        origin="aad"  # External group
+    ),
+    Group(
+        descriptor="group-2",
+        display_name="Project Collection Administrators",  # System group
+        group_type=GroupType.AZURE_AD,
+        origin="vsts"  # Built-in VSTS group
+    ),
+    Group(
+        descriptor="group-3",
+        display_name="Marketing Team",
+        group_type=GroupType.WINDOWS,
+        origin="aad"  # External group
+    ),
+    Group(
+        descriptor="group-4",
+        display_name="Custom Group",
+        group_type=GroupType.UNKNOWN  # Should be excluded
+    )
+]
+
+
+# Users returned by the stubbed users client: a mix of regular and VSTS users
+MIXED_USERS = [
+    User(descriptor="user-1", display_name="John Doe", origin="aad"),
+    User(descriptor="user-2", display_name="Build Service", origin="vsts"),
+    User(descriptor="user-3", display_name="Jane Smith", origin="aad")
+]
+
+
+def _mixed_groups():
+    """Build fresh groups for each retrieval, which updates their member counts."""
+    return [
+        Group(descriptor="group-1", display_name="Developers", origin="aad"),
+        Group(descriptor="group-2", display_name="Contributors", origin="vsts"),
+        Group(descriptor="group-3", display_name="QA Team", origin="aad")
+    ]
+
+
+def _stub_clients(processor, users, groups, get_entitlements, memberships):
+    """Replace the processor's API clients with plain stubs.
+
+    Args:
+        processor: Processor whose clients are replaced
+        users: Callable returning the users
+        groups: Callable returning the groups
+        get_entitlements: Callable taking the users and returning their entitlements
+        memberships: Memberships returned for every group
+    """
+    processor.users_client = SimpleNamespace(get_users=users)
+    processor.groups_client = SimpleNamespace(get_groups=groups)
+    processor.entitlements_client = SimpleNamespace(get_entitlements=get_entitlements)
+    processor.membership_client = SimpleNamespace(
+        get_group_memberships=lambda group_descriptor: list(memberships)
+    )
+
+
+@pytest.fixture
+def mocked_processor(processor):
+    """Processor whose API clients return the mixed regular and VSTS data.
+
+    Entitlements are returned for whichever users the processor asks about.
+
+    Returns:
+        EntitlementDataProcessor with stubbed API clients.
+    """
+    _stub_clients(
+        processor,
+        users=lambda: list(MIXED_USERS),
+        groups=_mixed_groups,
+        get_entitlements=lambda users: [
+            Entitlement(user_descriptor=user.descriptor, access_level=AccessLevel.BASIC)
+            for user in users
+        ],
+        memberships=[]
+    )
+    return processor
+
+
+@pytest.fixture(scope="module")
+def populated_processor(processor_template):
+    """Processor holding the canonical two-user scenario, built once.
+
+    Only for tests that read the processor state; use ``processor`` to mutate.
+
+    Returns:
+        EntitlementDataProcessor with users, groups, entitlements and summaries.
+    """
+    populated = copy.copy(processor_template)
+    populated.users = {"user-1": JOHN, "user-2": JANE}
+    populated.groups = {"group-1": EMPTY_DEVELOPERS}
+    populated.entitlements = {"user-1": JOHN_BASIC, "user-2": JANE_STAKEHOLDER}
+    populated.user_summaries = [
+        UserEntitlementSummary(
+            user=JOHN,
+            entitlement=JOHN_BASIC,
+            effective_access_level=AccessLevel.BASIC,
+            chargeback_groups=["Developers", "Team Leads"],
+            license_cost=50.0
+        ),
+        UserEntitlementSummary(
+            user=JANE,
+            entitlement=JANE_STAKEHOLDER,
+            effective_access_level=AccessLevel.STAKEHOLDER,
+            chargeback_groups=["Developers"],
+            license_cost=25.0
+        )
+    ]
+    return populated
 
 
 class TestEntitlementDataProcessor:
     """Tests for EntitlementDataProcessor."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        config = AuthConfig(pat_token="test-token", organization="test-org")
-        self.auth = AzureDevOpsAuth(config)
-        self.processor = EntitlementDataProcessor(self.auth)
-
-    def test_init(self):
+    def test_init(self, processor, auth):
         """Test processor initialization."""
-        assert self.processor.auth == self.auth
-        assert self.processor.organization == "test-org"
-        assert len(self.processor.users) == 0
-        assert len(self.processor.groups) == 0
-        assert len(self.processor.entitlements) == 0
+        assert processor.auth == auth
+        assert processor.organization == "test-org"
+        assert len(processor.users) == 0
+        assert len(processor.groups) == 0
+        assert len(processor.entitlements) == 0
 
-    def test_retrieve_all_data(self):
+    def test_retrieve_all_data(self, processor):
         """Test complete data retrieval process."""
-        # Mock the API clients directly on the processor instance
-        self.processor.users_client = Mock()
-        self.processor.groups_client = Mock()
-        self.processor.entitlements_client = Mock()
-        self.processor.membership_client = Mock()
-
-        # Mock users
-        self.processor.users_client.get_users.return_value = [
-            User(descriptor="user-1", display_name="John Doe"),
-            User(descriptor="user-2", display_name="Jane Smith")
-        ]
-
-        # Mock groups
-        self.processor.groups_client.get_groups.return_value = [
-            Group(descriptor="group-1", display_name="Developers"),
-            Group(descriptor="group-2", display_name="Admins")
-        ]
-
-        # Mock entitlements
-        self.processor.entitlements_client.get_entitlements.return_value = [
-            Entitlement(user_descriptor="user-1", access_level=AccessLevel.BASIC),
-            Entitlement(user_descriptor="user-2", access_level=AccessLevel.STAKEHOLDER)
-        ]
-
-        # Mock memberships
-        self.processor.membership_client.get_group_memberships.return_value = [
-            GroupMembership(
-                group_descriptor="group-1",
-                member_descriptor="user-1",
-                member_type=SubjectKind.USER
-            )
-        ]
+        _stub_clients(
+            processor,
+            users=lambda: [make_user(), make_user("user-2", "Jane Smith")],
+            groups=lambda: [
+                Group(descriptor="group-1", display_name="Developers"),
+                Group(descriptor="group-2", display_name="Admins")
+            ],
+            get_entitlements=lambda users: [JOHN_BASIC, JANE_STAKEHOLDER],
+            memberships=[
+                GroupMembership(
+                    group_descriptor="group-1",
+                    member_descriptor="user-1",
+                    member_type=SubjectKind.USER
+                )
+            ]
+        )
 
         # Run data retrieval
-        self.processor.retrieve_all_data()
+        processor.retrieve_all_data()
 
         # Verify data was retrieved and stored
-        assert len(self.processor.users) == 2
-        assert len(self.processor.groups) == 2
-        assert len(self.processor.entitlements) == 2
-        assert "user-1" in self.processor.users
-        assert "group-1" in self.processor.groups
+        assert len(processor.users) == 2
+        assert len(processor.groups) == 2
+        assert len(processor.entitlements) == 2
+        assert "user-1" in processor.users
+        assert "group-1" in processor.groups
 
-    def test_build_membership_maps(self):
+    def test_build_membership_maps(self, processor):
         """Test building membership lookup maps."""
         # Set up test data
-        self.processor.memberships = [
+        processor.memberships = [
             GroupMembership(
                 group_descriptor="group-1",
                 member_descriptor="user-1",
@@ -97,36 +196,40 @@ class TestEntitlementDataProcessor:
             )
         ]
 
-        self.processor._build_membership_maps()
+        processor._build_membership_maps()
 
-        # Check group -> members mapping
-        assert len(self.processor.group_memberships_map["group-1"]) == 2
-        assert "user-1" in self.processor.group_memberships_map["group-1"]
-        assert "user-2" in self.processor.group_memberships_map["group-1"]
-        assert len(self.processor.group_memberships_map["group-2"]) == 1
+        # Check group -> members mapping; lengths guard against duplicates
+        assert len(processor.group_memberships_map["group-1"]) == 2
+        assert set(processor.group_memberships_map["group-1"]) == {"user-1", "user-2"}
+        assert list(processor.group_memberships_map["group-2"]) == ["user-1"]
 
         # Check user -> groups mapping
-        assert len(self.processor.user_memberships_map["user-1"]) == 2
-        assert "group-1" in self.processor.user_memberships_map["user-1"]
-        assert "group-2" in self.processor.user_memberships_map["user-1"]
+        assert len(processor.user_memberships_map["user-1"]) == 2
+        assert set(processor.user_memberships_map["user-1"]) == {"group-1", "group-2"}
+
+    def test_build_membership_maps_ignores_duplicates(self, processor):
+        """Test that repeated memberships are recorded once, in first-seen order."""
+        processor.memberships = [
+            GroupMembership(group_descriptor=group, member_descriptor="user-1",
+                            member_type=SubjectKind.USER)
+            for group in ("group-2", "group-1", "group-2")
+        ]
+
+        processor._build_membership_maps()
+
+        assert list(processor.user_memberships_map["user-1"]) == ["group-2", "group-1"]
+        assert list(processor.group_memberships_map["group-2"]) == ["user-1"]
 
-    def test_create_user_summary(self):
+    def test_create_user_summary(self, processor):
         """Test creating user entitlement summary."""
         # Set up test data
-        user = User(descriptor="user-1", display_name="John Doe", mail_address="john@test.com")
-        entitlement = Entitlement(user_descriptor="user-1", access_level=AccessLevel.BASIC)
-        group = Group(
-            descriptor="group-1",
-            display_name="Developers",
-            group_type=GroupType.AZURE_AD
-        )
-
-        self.processor.users = {"user-1": user}
-        self.processor.groups = {"group-1": group}
-        self.processor.entitlements = {"user-1": entitlement}
-        self.processor.user_memberships_map = {"user-1": ["group-1"]}
+        processor.users = {"user-1": JOHN}
+        processor.groups = {"group-1": DEVELOPERS}
+        processor.entitlements = {"user-1": JOHN_BASIC}
+        processor.user_memberships_map = {"user-1": ["group-1"]}
+        processor._precompute_chargeback_index()
 
-        summary = self.processor._create_user_summary(user)
+        summary = processor._create_user_summary(JOHN)
 
         assert summary.user.descriptor == "user-1"
         assert summary.entitlement.access_level == AccessLevel.BASIC
@@ -136,182 +239,155 @@ class TestEntitlementDataProcessor:
         assert len(summary.chargeback_groups) == 1
         assert "Developers" in summary.chargeback_groups
 
-    def test_get_all_user_groups_recursive(self):
-        """Test recursive group membership resolution."""
-        # Set up nested group structure
+    @pytest.mark.parametrize("membership_map, expected", [
         # user-1 -> group-1 -> group-2 -> group-3
-        self.processor.user_memberships_map = {
+        ({
             "user-1": ["group-1"],
             "group-1": ["group-2"],
             "group-2": ["group-3"]
-        }
-
-        all_groups = self.processor._get_all_user_groups("user-1")
-
-        assert len(all_groups) == 3
-        assert "group-1" in all_groups
-        assert "group-2" in all_groups
-        assert "group-3" in all_groups
-
-    def test_get_all_user_groups_cycle_detection(self):
-        """Test cycle detection in group membership."""
-        # Set up circular reference: group-1 -> group-2 -> group-1
-        self.processor.user_memberships_map = {
+        }, {"group-1", "group-2", "group-3"}),
+        # Circular reference: group-1 -> group-2 -> group-1
+        ({
             "user-1": ["group-1"],
             "group-1": ["group-2"],
-            "group-2": ["group-1"]  # Circular reference
+            "group-2": ["group-1"]
+        }, {"group-1", "group-2"}),
+    ], ids=["acyclic", "cycle"])
+    def test_get_all_user_groups(self, processor, membership_map, expected):
+        """Test recursive group membership resolution, including cycles."""
+        processor.user_memberships_map = membership_map
+
+        all_groups = processor._get_all_user_groups("user-1")
+
+        # Should not get stuck in infinite loop and must not repeat groups
+        assert len(all_groups) == len(expected)
+        assert set(all_groups) == expected
+
+    def test_get_all_user_groups_deep_nesting(self, processor):
+        """Test group resolution deeper than the interpreter recursion limit."""
+        depth = sys.getrecursionlimit() + 100
+        processor.user_memberships_map = {"user-1": ["group-0"]}
+        for level in range(depth - 1):
+            processor.user_memberships_map[f"group-{level}"] = [f"group-{level + 1}"]
+
+        all_groups = processor._get_all_user_groups("user-1")
+
+        assert len(all_groups) == depth
+
+    def test_process_user_entitlements_shares_group_closures(self, processor):
+        """Test that memoized group closures match a full walk for every user."""
+        processor.users = {f"user-{i}": make_user(f"user-{i}", f"User {i}") for i in range(4)}
+        processor.groups = {
+            f"group-{i}": Group(descriptor=f"group-{i}", display_name=f"Group {i}")
+            for i in range(5)
+        }
+        processor.user_memberships_map = {
+            "user-0": ["group-0"],
+            "user-1": ["group-1", "group-3"],
+            "user-2": ["group-2"],
+            "user-3": [],
+            # group-0 -> group-1 -> group-2 -> group-1 (cycle), group-3 -> group-4
+            "group-0": ["group-1"],
+            "group-1": ["group-2"],
+            "group-2": ["group-1"],
+            "group-3": ["group-4"],
         }
 
-        all_groups = self.processor._get_all_user_groups("user-1")
+        processor.process_user_entitlements()
 
-        # Should not get stuck in infinite loop
-        assert len(all_groups) == 2
-        assert "group-1" in all_groups
-        assert "group-2" in all_groups
+        for summary in processor.user_summaries:
+            resolved = {group.descriptor for group in summary.all_groups}
+            assert resolved == processor._get_all_user_groups(summary.user.descriptor)
+        assert processor.group_closure_cache["group-2"] == {"group-1", "group-2"}
 
-    def test_calculate_effective_access_level(self):
+    @pytest.mark.parametrize("entitlement, expected_level", [
+        (JOHN_BASIC, AccessLevel.BASIC),
+        (None, AccessLevel.NONE),
+    ], ids=["with_entitlement", "without_entitlement"])
+    def test_calculate_effective_access_level(self, processor, entitlement, expected_level):
         """Test effective access level calculation."""
-        user = User(descriptor="user-1", display_name="John Doe")
-        entitlement = Entitlement(user_descriptor="user-1", access_level=AccessLevel.BASIC)
-        groups = []
+        user = make_user()
 
-        # With entitlement
-        access_level = self.processor._calculate_effective_access_level(user, entitlement, groups)
-        assert access_level == AccessLevel.BASIC
+        access_level = processor._calculate_effective_access_level(user, entitlement, [])
 
-        # Without entitlement
-        access_level = self.processor._calculate_effective_access_level(user, None, groups)
-        assert access_level == AccessLevel.NONE
+        assert access_level == expected_level
 
-    def test_determine_chargeback_groups(self):
+    @pytest.mark.parametrize("display_name, included", [
+        pytest.param("Developers Team", True, id="azure_ad"),
+        pytest.param("Project Collection Administrators", False, id="system"),
+        pytest.param("Marketing Team", True, id="windows"),
+        pytest.param("Custom Group", False, id="unknown_type"),
+    ])
+    def test_determine_chargeback_groups(self, processor, display_name, included):
         """Test determining chargeback groups."""
-        groups = [
-            Group(
-                descriptor="group-1",
-                display_name="Developers Team",
-                group_type=GroupType.AZURE_AD,
-                origin="aad"  # External group
-            ),
-            Group(
-                descriptor="group-2",
-                display_name="Project Collection Administrators",  # System group
-                group_type=GroupType.AZURE_AD,
-                origin="vsts"  # Built-in VSTS group
-            ),
-            Group(
-                descriptor="group-3",
-                display_name="Marketing Team",
-                group_type=GroupType.WINDOWS,
-                origin="aad"  # External group
-            ),
-            Group(
-                descriptor="group-4",
-                display_name="Custom Group",
-                group_type=GroupType.UNKNOWN  # Should be excluded
-            )
-        ]
-
-        chargeback_groups = self.processor._determine_chargeback_groups(groups)
+        chargeback_groups = processor._determine_chargeback_groups(CHARGEBACK_CANDIDATE_GROUPS)
 
         # Should include Azure AD and Windows groups, but exclude system and unknown groups
         assert len(chargeback_groups) == 2
-        assert "Developers Team" in chargeback_groups
-        assert "Marketing Team" in chargeback_groups
-        assert "Project Collection Administrators" not in chargeback_groups
-        assert "Custom Group" not in chargeback_groups
-
-    def test_is_system_group(self):
+        assert (display_name in chargeback_groups) is included
+
+    def test_precompute_chargeback_index(self, processor):
+        """Test that only chargeback-eligible groups are indexed by descriptor."""
+        processor.groups = {group.descriptor: group for group in CHARGEBACK_CANDIDATE_GROUPS}
+
+        processor._precompute_chargeback_index()
+
+        assert sorted(processor.chargeback_group_index.values()) == ["Developers Team", "Marketing Team"]
+        for descriptor, display_name in processor.chargeback_group_index.items():
+            assert processor.groups[descriptor].display_name == display_name
+
+    @pytest.mark.parametrize("group, expected", [
+        # System groups have 'vsts' origin
+        pytest.param(
+            Group(descriptor="group-sys", display_name="Project Collection Administrators", origin="vsts"),
+            True, id="system"
+        ),
+        # User groups typically have other origins
+        pytest.param(
+            Group(descriptor="group-user", display_name="Development Team", origin="aad"),
+            False, id="user"
+        ),
+    ])
+    def test_is_system_group(self, processor, group, expected):
         """Test system group detection."""
-        system_group = Group(
-            descriptor="group-sys",
-            display_name="Project Collection Administrators",
-            origin="vsts"  # System groups have 'vsts' origin
-        )
-        user_group = Group(
-            descriptor="group-user",
-            display_name="Development Team",
-            origin="aad"  # User groups typically have other origins
-        )
-
-        assert self.processor._is_system_group(system_group) is True
-        assert self.processor._is_system_group(user_group) is False
+        assert processor._is_system_group(group) is expected
 
-    def test_process_user_entitlements(self):
+    def test_process_user_entitlements(self, processor):
         """Test processing user entitlements."""
         # Set up test data
-        user1 = User(descriptor="user-1", display_name="John Doe")
-        user2 = User(descriptor="user-2", display_name="Jane Smith")
+        user1 = make_user()
+        user2 = make_user("user-2", "Jane Smith")
 
-        self.processor.users = {"user-1": user1, "user-2": user2}
-        self.processor.groups = {}
-        self.processor.entitlements = {
-            "user-1": Entitlement(user_descriptor="user-1", access_level=AccessLevel.BASIC)
-        }
-        self.processor.user_memberships_map = defaultdict(list)
+        processor.users = {"user-1": user1, "user-2": user2}
+        processor.groups = {}
+        processor.entitlements = {"user-1": JOHN_BASIC}
+        processor.user_memberships_map = {}
 
-        self.processor.process_user_entitlements()
+        processor.process_user_entitlements()
 
-        assert len(self.processor.user_summaries) == 2
-        assert self.processor.user_summaries[0].user.descriptor in ["user-1", "user-2"]
+        assert len(processor.user_summaries) == 2
+        assert processor.user_summaries[0].user.descriptor in ["user-1", "user-2"]
 
-    def test_generate_organization_report(self):
+    def test_generate_organization_report(self, populated_processor):
         """Test generating organization report."""
-        # Set up test data
-        user = User(descriptor="user-1", display_name="John Doe")
-        group = Group(
-            descriptor="group-1",
-            display_name="Developers",
-            group_type=GroupType.AZURE_AD,
-            member_count=0
-        )
-        entitlement = Entitlement(user_descriptor="user-1", access_level=AccessLevel.BASIC)
-
-        summary = UserEntitlementSummary(
-            user=user,
-            entitlement=entitlement,
-            chargeback_groups=["Developers"]
-        )
-
-        self.processor.users = {"user-1": user}
-        self.processor.groups = {"group-1": group}
-        self.processor.entitlements = {"user-1": entitlement}
-        self.processor.user_summaries = [summary]
-
-        report = self.processor.generate_organization_report()
-
-        assert report.organization == "test-org"
-        assert report.total_users == 1
-        assert report.total_groups == 1
-        assert report.total_entitlements == 1
-        assert len(report.user_summaries) == 1
-        assert report.groups_by_type["azureActiveDirectory"] == 1
+        report = populated_processor.generate_organization_report()
+
+        expected = {
+            "organization": "test-org",
+            "total_users": 2,
+            "total_groups": 1,
+            "total_entitlements": 2,
+            "groups_by_type": {"azureActiveDirectory": 1},
+            "licenses_by_type": {"basic": 1, "stakeholder": 1},
+            "total_license_cost": 75.0,
+        }
+        assert {field: getattr(report, field) for field in expected} == expected
+        assert len(report.user_summaries) == 2
         assert len(report.orphaned_groups) == 1  # group has 0 members
-        assert report.licenses_by_type["basic"] == 1
 
-    def test_generate_chargeback_analysis(self):
+    def test_generate_chargeback_analysis(self, populated_processor):
         """Test generating chargeback analysis."""
-        user1 = User(descriptor="user-1", display_name="John Doe", mail_address="john@test.com")
-        user2 = User(descriptor="user-2", display_name="Jane Smith", mail_address="jane@test.com")
-
-        summary1 = UserEntitlementSummary(
-            user=user1,
-            entitlement=Entitlement(user_descriptor="user-1", access_level=AccessLevel.BASIC),
-            effective_access_level=AccessLevel.BASIC,
-            chargeback_groups=["Developers", "Team Leads"],
-            license_cost=50.0
-        )
-
-        summary2 = UserEntitlementSummary(
-            user=user2,
-            entitlement=Entitlement(user_descriptor="user-2", access_level=AccessLevel.STAKEHOLDER),
-            effective_access_level=AccessLevel.STAKEHOLDER,
-            chargeback_groups=["Developers"],
-            license_cost=25.0
-        )
-
-        self.processor.user_summaries = [summary1, summary2]
-
-        chargeback_analysis = self.processor._generate_chargeback_analysis()
+        chargeback_analysis = populated_processor._generate_chargeback_analysis()
 
         # Check Developers group
         developers_data = chargeback_analysis["Developers"]
@@ -327,81 +403,46 @@ class TestEntitlementDataProcessor:
         assert len(team_leads_data["users"]) == 1
         assert team_leads_data["total_cost"] == 50.0
 
-    @patch.object(EntitlementDataProcessor, 'retrieve_all_data')
-    @patch.object(EntitlementDataProcessor, 'process_user_entitlements')
-    @patch.object(EntitlementDataProcessor, 'generate_organization_report')
-    def test_run_complete_analysis(self, mock_generate_report, mock_process_entitlements, mock_retrieve_data):
+    def test_run_complete_analysis(self, processor, monkeypatch):
         """Test running complete analysis."""
         mock_report = OrganizationReport(organization="test-org")
-        mock_generate_report.return_value = mock_report
+        mock_retrieve_data = Mock()
+        mock_process_entitlements = Mock()
+        mock_generate_report = Mock(return_value=mock_report)
+        monkeypatch.setattr(processor, "retrieve_all_data", mock_retrieve_data)
+        monkeypatch.setattr(processor, "process_user_entitlements", mock_process_entitlements)
+        monkeypatch.setattr(processor, "generate_organization_report", mock_generate_report)
 
-        result = self.processor.run_complete_analysis()
+        result = processor.run_complete_analysis()
 
         mock_retrieve_data.assert_called_once()
         mock_process_entitlements.assert_called_once()
         mock_generate_report.assert_called_once()
         assert result == mock_report
 
-    def test_is_vsts_user(self):
+    @pytest.mark.parametrize("display_name, origin, expected", [
+        pytest.param("Test User", "vsts", True, id="vsts_origin"),
+        pytest.param("Project Collection Build Service", None, True, id="service_account_name"),
+        pytest.param("John Doe", "aad", False, id="regular"),
+    ])
+    def test_is_vsts_user(self, processor, display_name, origin, expected):
         """Test VSTS user detection."""
-        # VSTS user by origin
-        vsts_user = User(descriptor="user-1", display_name="Test User", origin="vsts")
-        assert self.processor._is_vsts_user(vsts_user) is True
-
-        # Service account by name
-        service_user = User(descriptor="user-2", display_name="Project Collection Build Service")
-        assert self.processor._is_vsts_user(service_user) is True
-
-        # Regular user
-        regular_user = User(descriptor="user-3", display_name="John Doe", origin="aad")
-        assert self.processor._is_vsts_user(regular_user) is False
-
-    def test_is_vsts_group(self):
+        user = make_user("user-1", display_name, origin)
+        assert processor._is_vsts_user(user) is expected
+
+    @pytest.mark.parametrize("display_name, origin, expected", [
+        pytest.param("Contributors", "vsts", True, id="vsts"),
+        pytest.param("Dev Team", "aad", False, id="regular"),
+    ])
+    def test_is_vsts_group(self, processor, display_name, origin, expected):
         """Test VSTS group detection."""
-        # VSTS group
-        vsts_group = Group(descriptor="group-1", display_name="Contributors", origin="vsts")
-        assert self.processor._is_vsts_group(vsts_group) is True
-
-        # Regular group
-        regular_group = Group(descriptor="group-2", display_name="Dev Team", origin="aad")
-        assert self.processor._is_vsts_group(regular_group) is False
+        group = Group(descriptor="group-1", display_name=display_name, origin=origin)
+        assert processor._is_vsts_group(group) is expected
 
-    def test_retrieve_all_data_with_filtering(self):
+    def test_retrieve_all_data_with_filtering(self, mocked_processor):
         """Test data retrieval with VSTS filtering enabled."""
-        from src.config import ReportsConfig
-
-        # Create processor with filtering enabled
-        config = ReportsConfig(exclude_vsts_users=True, exclude_vsts_groups=True)
-        processor = EntitlementDataProcessor(self.auth, config=config)
-
-        # Mock API clients
-        processor.users_client = Mock()
-        processor.groups_client = Mock()
-        processor.entitlements_client = Mock()
-        processor.membership_client = Mock()
-
-        # Mock users (mix of regular and VSTS)
-        processor.users_client.get_users.return_value = [
-            User(descriptor="user-1", display_name="John Doe", origin="aad"),
-            User(descriptor="user-2", display_name="Build Service", origin="vsts"),  # Should be filtered
-            User(descriptor="user-3", display_name="Jane Smith", origin="aad")
-        ]
-
-        # Mock groups (mix of regular and VSTS)
-        processor.groups_client.get_groups.return_value = [
-            Group(descriptor="group-1", display_name="Developers", origin="aad"),
-            Group(descriptor="group-2", display_name="Contributors", origin="vsts"),  # Should be filtered
-            Group(descriptor="group-3", display_name="QA Team", origin="aad")
-        ]
-
-        # Mock entitlements
-        processor.entitlements_client.get_entitlements.return_value = [
-            Entitlement(user_descriptor="user-1", access_level=AccessLevel.BASIC),
-            Entitlement(user_descriptor="user-3", access_level=AccessLevel.BASIC)
-        ]
-
-        # Mock memberships
-        processor.membership_client.get_group_memberships.return_value = []
+        processor = mocked_processor
+        processor.config = ReportsConfig(exclude_vsts_users=True, exclude_vsts_groups=True)
 
         # Retrieve data
         processor.retrieve_all_data()
@@ -411,49 +452,17 @@ class TestEntitlementDataProcessor:
         assert "user-1" in processor.users
         assert "user-2" not in processor.users  # VSTS user filtered
         assert "user-3" in processor.users
+        assert set(processor.entitlements) == {"user-1", "user-3"}
 
         assert len(processor.groups) == 2  # Only 2 regular groups
         assert "group-1" in processor.groups
         assert "group-2" not in processor.groups  # VSTS group filtered
         assert "group-3" in processor.groups
 
-    def test_retrieve_all_data_without_filtering(self):
+    def test_retrieve_all_data_without_filtering(self, mocked_processor):
         """Test data retrieval with VSTS filtering disabled."""
-        from src.config import ReportsConfig
-
-        # Create processor with filtering disabled
-        config = ReportsConfig(exclude_vsts_users=False, exclude_vsts_groups=False)
-        processor = EntitlementDataProcessor(self.auth, config=config)
-
-        # Mock API clients
-        processor.users_client = Mock()
-        processor.groups_client = Mock()
-        processor.entitlements_client = Mock()
-        processor.membership_client = Mock()
-
-        # Mock users (mix of regular and VSTS)
-        processor.users_client.get_users.return_value = [
-            User(descriptor="user-1", display_name="John Doe", origin="aad"),
-            User(descriptor="user-2", display_name="Build Service", origin="vsts"),
-            User(descriptor="user-3", display_name="Jane Smith", origin="aad")
-        ]
-
-        # Mock groups (mix of regular and VSTS)
-        processor.groups_client.get_groups.return_value = [
-            Group(descriptor="group-1", display_name="Developers", origin="aad"),
-            Group(descriptor="group-2", display_name="Contributors", origin="vsts"),
-            Group(descriptor="group-3", display_name="QA Team", origin="aad")
-        ]
-
-        # Mock entitlements
-        processor.entitlements_client.get_entitlements.return_value = [
-            Entitlement(user_descriptor="user-1", access_level=AccessLevel.BASIC),
-            Entitlement(user_descriptor="user-2", access_level=AccessLevel.BASIC),
-            Entitlement(user_descriptor="user-3", access_level=AccessLevel.BASIC)
-        ]
-
-        # Mock memberships
-        processor.membership_client.get_group_memberships.return_value = []
+        processor = mocked_processor
+        processor.config = ReportsConfig(exclude_vsts_users=False, exclude_vsts_groups=False)
 
         # Retrieve data
         processor.retrieve_all_data()
@@ -463,12 +472,9 @@ class TestEntitlementDataProcessor:
         assert "user-1" in processor.users
         assert "user-2" in processor.users  # VSTS user included
         assert "user-3" in processor.users
+        assert len(processor.entitlements) == 3
 
         assert len(processor.groups) == 3  # All groups included
         assert "group-1" in processor.groups
         assert "group-2" in processor.groups  # VSTS group included
         assert "group-3" in processor.groups
-
-
-# Helper for defaultdict import in test
-from collections import defaultdict
\ No newline at end of file
@@ -2,27 +2,54 @@
 Tests for the data retrieval module.
 """
 
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, Dict
+
 import pytest
-from unittest.mock import Mock, patch, MagicMock
+from unittest.mock import patch
 import requests
+import responses
 from requests.exceptions import HTTPError, RequestException
 
-from src.auth import AzureDevOpsAuth, AuthConfig
 from src.data_retrieval import (
     AzureDevOpsApiClient, UsersApiClient, GroupsApiClient,
     EntitlementsApiClient, MembershipApiClient, RateLimitError
 )
-from src.models import User, Group, Entitlement, GroupMembership, SubjectKind, AccessLevel
+from src.models import User, Entitlement, SubjectKind, AccessLevel
+
+
+@dataclass
+class FakeResponse:
+    """Plain stand-in for requests.Response with only what the client reads."""
+
+    status_code: int = 200
+    headers: Dict[str, str] = field(default_factory=dict)
+    json_data: Any = None
+    text: str = ""
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self) -> Any:
+        if self.json_data is None:
+            raise ValueError("No JSON body")
+        return self.json_data
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise HTTPError(f"{self.status_code} Error", response=self)
 
 
 class TestAzureDevOpsApiClient:
     """Tests for AzureDevOpsApiClient base class."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        config = AuthConfig(pat_token="test-token", organization="test-org")
-        self.auth = AzureDevOpsAuth(config)
-        self.client = AzureDevOpsApiClient(self.auth)
+    @pytest.fixture(autouse=True)
+    def setup_client(self, auth):
+        """Set up a client on the shared session authentication handler."""
+        self.auth = auth
+        self.client = AzureDevOpsApiClient(auth)
 
     def test_init(self):
         """Test client initialization."""
@@ -31,6 +58,26 @@ class TestAzureDevOpsApiClient:
         assert self.client.retry_delay == 1
         assert self.client.session is not None
 
+    def test_init_pool_size(self):
+        """Test that the session's adapter keeps enough connections for concurrent lookups."""
+        adapter = self.client.session.get_adapter("https://vsaex.dev.azure.com")
+
+        assert adapter._pool_maxsize >= EntitlementsApiClient(self.auth).max_workers
+        assert adapter._pool_maxsize >= 32
+        assert adapter.max_retries.total == 3
+
+    def test_init_keeps_shared_adapter(self):
+        """Test that new clients reuse the session's adapter instead of replacing it."""
+        adapter = self.client.session.get_adapter("https://vsaex.dev.azure.com")
+
+        client = AzureDevOpsApiClient(self.auth)
+        other = AzureDevOpsApiClient(self.auth, max_retries=5)
+
+        assert client.session is self.client.session
+        assert client.session.get_adapter("https://vsaex.dev.azure.com") is adapter
+        assert other.session.get_adapter("https://vsaex.dev.azure.com").max_retries.total == 5
+        assert adapter.max_retries.total == 3
+
     def test_init_custom_settings(self):
         """Test client initialization with custom settings."""
         client = AzureDevOpsApiClient(self.auth, max_retries=5, retry_delay=2)
@@ -40,10 +87,7 @@ class TestAzureDevOpsApiClient:
     @patch('src.data_retrieval.requests.Session.get')
     def test_handle_response_success(self, mock_get):
         """Test successful response handling."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.ok = True
-        mock_response.json.return_value = {"test": "data"}
+        mock_response = FakeResponse(json_data={"test": "data"})
 
         result = self.client._handle_response(mock_response)
         assert result == {"test": "data"}
@@ -51,9 +95,7 @@ class TestAzureDevOpsApiClient:
     @patch('src.data_retrieval.requests.Session.get')
     def test_handle_response_rate_limit(self, mock_get):
         """Test rate limit response handling."""
-        mock_response = Mock()
-        mock_response.status_code = 429
-        mock_response.headers = {'Retry-After': '60'}
+        mock_response = FakeResponse(status_code=429, headers={'Retry-After': '60'})
 
         with pytest.raises(RateLimitError) as exc_info:
             self.client._handle_response(mock_response)
@@ -63,11 +105,7 @@ class TestAzureDevOpsApiClient:
     @patch('src.data_retrieval.requests.Session.get')
     def test_handle_response_http_error(self, mock_get):
         """Test HTTP error response handling."""
-        mock_response = Mock()
-        mock_response.status_code = 404
-        mock_response.ok = False
-        mock_response.json.return_value = {"message": "Not found"}
-        mock_response.raise_for_status.side_effect = HTTPError("404 Error")
+        mock_response = FakeResponse(status_code=404, json_data={"message": "Not found"})
 
         with pytest.raises(HTTPError):
             self.client._handle_response(mock_response)
@@ -75,54 +113,68 @@ class TestAzureDevOpsApiClient:
     @patch('src.data_retrieval.requests.Session.get')
     def test_make_request_success(self, mock_get):
         """Test successful API request."""
-        mock_response = Mock()
-        mock_response.status_code = 200
-        mock_response.ok = True
-        mock_response.json.return_value = {"test": "data"}
-        mock_get.return_value = mock_response
+        mock_get.return_value = FakeResponse(json_data={"test": "data"})
 
         result = self.client._make_request("https://api.test.com", {"param": "value"})
         assert result == {"test": "data"}
 
     @patch('src.data_retrieval.requests.Session.get')
     @patch('src.data_retrieval.time.sleep')
-    def test_make_request_rate_limit_retry(self, mock_sleep, mock_get):
+    @patch('src.data_retrieval.random.uniform', return_value=0.0)
+    def test_make_request_rate_limit_retry(self, mock_uniform, mock_sleep, mock_get):
         """Test rate limit handling with retry."""
         # First call returns rate limit, second succeeds
-        rate_limit_response = Mock()
-        rate_limit_response.status_code = 429
-        rate_limit_response.headers = {'Retry-After': '2'}
-
-        success_response = Mock()
-        success_response.status_code = 200
-        success_response.ok = True
-        success_response.json.return_value = {"test": "data"}
+        rate_limit_response = FakeResponse(status_code=429, headers={'Retry-After': '2'})
+        success_response = FakeResponse(json_data={"test": "data"})
 
         mock_get.side_effect = [rate_limit_response, success_response]
 
         result = self.client._make_request("https://api.test.com")
         assert result == {"test": "data"}
-        mock_sleep.assert_called_once_with(2)
+        # First backoff step (retry_delay * 2**0) is below the Retry-After cap
+        mock_sleep.assert_called_once_with(1.0)
+
+    @patch('src.data_retrieval.requests.Session.get')
+    @patch('src.data_retrieval.time.sleep')
+    @patch('src.data_retrieval.random.uniform', return_value=0.5)
+    def test_make_request_rate_limit_exhausted(self, mock_uniform, mock_sleep, mock_get):
+        """Test exponential backoff capped by Retry-After until retries run out."""
+        mock_get.return_value = FakeResponse(status_code=429, headers={'Retry-After': '3'})
+
+        with pytest.raises(RateLimitError):
+            self.client._make_request("https://api.test.com")
+
+        assert mock_get.call_count == self.client.max_retries + 1
+        assert [c.args[0] for c in mock_sleep.call_args_list] == [1.5, 2.5, 3]
+
+    @responses.activate
+    @patch('src.data_retrieval.time.sleep')
+    @patch('src.data_retrieval.random.uniform', return_value=0.0)
+    def test_make_request_rate_limit_not_retried_by_adapter(self, mock_uniform, mock_sleep):
+        """Test that 429 responses reach the client's backoff instead of the adapter's retries."""
+        url = "https://api.test.com/rate-limited"
+        responses.add(responses.GET, url, status=429, headers={'Retry-After': '2'})
+        responses.add(responses.GET, url, json={"test": "data"})
+
+        result = self.client._make_request(url)
+
+        assert result == {"test": "data"}
+        assert len(responses.calls) == 2
+        mock_sleep.assert_called_once_with(1.0)
 
     @patch('src.data_retrieval.requests.Session.get')
     def test_paginate_request(self, mock_get):
         """Test paginated request handling."""
         # First page
-        page1_response = Mock()
-        page1_response.status_code = 200
-        page1_response.ok = True
-        page1_response.json.return_value = {
+        page1_response = FakeResponse(json_data={
             "value": [{"id": 1}, {"id": 2}],
             "continuationToken": "token123"
-        }
+        })
 
         # Second page
-        page2_response = Mock()
-        page2_response.status_code = 200
-        page2_response.ok = True
-        page2_response.json.return_value = {
+        page2_response = FakeResponse(json_data={
             "value": [{"id": 3}, {"id": 4}]
-        }
+        })
 
         mock_get.side_effect = [page1_response, page2_response]
 
@@ -135,11 +187,11 @@ class TestAzureDevOpsApiClient:
 class TestUsersApiClient:
     """Tests for UsersApiClient."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        config = AuthConfig(pat_token="test-token", organization="test-org")
-        self.auth = AzureDevOpsAuth(config)
-        self.client = UsersApiClient(self.auth)
+    @pytest.fixture(autouse=True)
+    def setup_client(self, auth):
+        """Set up a client on the shared session authentication handler."""
+        self.auth = auth
+        self.client = UsersApiClient(auth)
 
     @patch.object(UsersApiClient, '_paginate_request')
     def test_get_users(self, mock_paginate):
@@ -166,6 +218,22 @@ class TestUsersApiClient:
         assert users[1].descriptor == "user-2"
         assert users[1].display_name == "Jane Smith"
 
+    @patch.object(UsersApiClient, '_make_request')
+    def test_iter_users_fetches_pages_lazily(self, mock_request):
+        """Test that later pages are only requested once the caller reaches them."""
+        mock_request.side_effect = [
+            {"value": [{"descriptor": "user-1", "displayName": "John Doe"}],
+             "continuationToken": "token123"},
+            {"value": [{"descriptor": "user-2", "displayName": "Jane Smith"}]}
+        ]
+
+        users = self.client.iter_users()
+
+        assert next(users).descriptor == "user-1"
+        assert mock_request.call_count == 1
+        assert [user.descriptor for user in users] == ["user-2"]
+        assert mock_request.call_count == 2
+
     @patch.object(UsersApiClient, '_make_request')
     def test_get_user_by_descriptor_success(self, mock_request):
         """Test retrieving user by descriptor successfully."""
@@ -183,8 +251,7 @@ class TestUsersApiClient:
     @patch.object(UsersApiClient, '_make_request')
     def test_get_user_by_descriptor_not_found(self, mock_request):
         """Test retrieving non-existent user."""
-        mock_response = Mock()
-        mock_response.status_code = 404
+        mock_response = FakeResponse(status_code=404)
         error = HTTPError("Not found")
         error.response = mock_response
         mock_request.side_effect = error
@@ -217,11 +284,11 @@ class TestUsersApiClient:
 class TestGroupsApiClient:
     """Tests for GroupsApiClient."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        config = AuthConfig(pat_token="test-token", organization="test-org")
-        self.auth = AzureDevOpsAuth(config)
-        self.client = GroupsApiClient(self.auth)
+    @pytest.fixture(autouse=True)
+    def setup_client(self, auth):
+        """Set up a client on the shared session authentication handler."""
+        self.auth = auth
+        self.client = GroupsApiClient(auth)
 
     @patch.object(GroupsApiClient, '_paginate_request')
     def test_get_groups(self, mock_paginate):
@@ -275,35 +342,36 @@ class TestGroupsApiClient:
 class TestEntitlementsApiClient:
     """Tests for EntitlementsApiClient."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        config = AuthConfig(pat_token="test-token", organization="test-org")
-        self.auth = AzureDevOpsAuth(config)
-        self.client = EntitlementsApiClient(self.auth)
+    @pytest.fixture(autouse=True)
+    def setup_client(self, auth):
+        """Set up a client on the shared session authentication handler."""
+        self.auth = auth
+        self.client = EntitlementsApiClient(auth)
 
     @patch.object(EntitlementsApiClient, 'get_entitlement_by_user_id')
-    def test_get_entitlements(self, mock_get_by_id):
-        """Test retrieving entitlements."""
+    @patch.object(EntitlementsApiClient, '_paginate_request')
+    def test_get_entitlements(self, mock_paginate, mock_get_by_id):
+        """Test retrieving entitlements from a single listing."""
         # Create test users
         test_users = [
             User(descriptor="user-1", display_name="John Doe"),
             User(descriptor="user-2", display_name="Jane Smith")
         ]
 
-        # Mock the individual entitlement lookups
-        mock_get_by_id.side_effect = [
-            Entitlement(
-                user_descriptor="user-1",
-                access_level=AccessLevel.BASIC,
-                account_license_type="basic",
-                license_display_name="Basic"
-            ),
-            Entitlement(
-                user_descriptor="user-2",
-                access_level=AccessLevel.STAKEHOLDER,
-                account_license_type="stakeholder",
-                license_display_name="Stakeholder"
-            )
+        # The listing returns every entitlement in the organization, in any order
+        mock_paginate.return_value = [
+            {
+                "user": {"descriptor": "user-2"},
+                "accessLevel": {"accountLicenseType": "stakeholder", "licensingSource": "account"}
+            },
+            {
+                "user": {"descriptor": "user-9"},
+                "accessLevel": {"accountLicenseType": "express", "licensingSource": "account"}
+            },
+            {
+                "user": {"descriptor": "user-1"},
+                "accessLevel": {"accountLicenseType": "express", "licensingSource": "account"}
+            }
         ]
 
         entitlements = self.client.get_entitlements(users=test_users)
@@ -312,6 +380,80 @@ class TestEntitlementsApiClient:
         assert entitlements[0].access_level == AccessLevel.BASIC
         assert entitlements[1].user_descriptor == "user-2"
         assert entitlements[1].access_level == AccessLevel.STAKEHOLDER
+        assert mock_paginate.call_args.kwargs["items_key"] == "members"
+        mock_get_by_id.assert_not_called()
+
+    @patch.object(EntitlementsApiClient, 'get_entitlement_by_user_id')
+    @patch.object(EntitlementsApiClient, 'get_all_entitlements_bulk',
+                  side_effect=HTTPError("403 Forbidden"))
+    def test_get_entitlements_concurrent_keeps_user_order(self, mock_bulk, mock_get_by_id):
+        """Test that per-user fallback lookups return entitlements in user order."""
+        test_users = [User(descriptor=f"user-{i}", display_name=f"User {i}") for i in range(40)]
+
+        def lookup(user_id):
+            if user_id == "user-7":
+                raise RequestException("Network error")
+            return Entitlement(user_descriptor=user_id, access_level=AccessLevel.BASIC)
+
+        mock_get_by_id.side_effect = lookup
+
+        entitlements = self.client.get_entitlements(users=test_users)
+
+        assert [e.user_descriptor for e in entitlements] == [
+            f"user-{i}" for i in range(40) if i != 7
+        ]
+        assert mock_get_by_id.call_count == 40
+
+    @patch.object(EntitlementsApiClient, 'get_entitlement_by_user_id')
+    @patch.object(EntitlementsApiClient, '_paginate_request')
+    def test_get_entitlements_matches_origin_id(self, mock_paginate, mock_get_by_id):
+        """Test that users without a descriptor are joined on their origin ID."""
+        test_users = [User(descriptor="", origin_id="origin-1", display_name="John Doe")]
+        mock_paginate.return_value = [
+            {
+                "user": {"descriptor": "aad.user-1", "originId": "origin-1"},
+                "accessLevel": {"accountLicenseType": "express", "licensingSource": "account"}
+            }
+        ]
+
+        entitlements = self.client.get_entitlements(users=test_users)
+
+        assert [e.user_descriptor for e in entitlements] == ["aad.user-1"]
+        mock_get_by_id.assert_not_called()
+
+    @patch.object(EntitlementsApiClient, 'get_entitlement_by_user_id')
+    @patch.object(EntitlementsApiClient, '_paginate_request')
+    def test_get_entitlements_looks_up_users_missing_from_listing(self, mock_paginate, mock_get_by_id):
+        """Test that users absent from the listing are looked up individually."""
+        test_users = [
+            User(descriptor="user-1", display_name="John Doe"),
+            User(descriptor="user-2", display_name="Jane Smith"),
+            User(descriptor="user-3", display_name="Bob Jones")
+        ]
+        mock_paginate.return_value = [
+            {
+                "user": {"descriptor": "user-2"},
+                "accessLevel": {"accountLicenseType": "stakeholder", "licensingSource": "account"}
+            }
+        ]
+
+        def lookup(user_id):
+            if user_id == "user-3":
+                return None
+            return Entitlement(user_descriptor=user_id, access_level=AccessLevel.BASIC)
+
+        mock_get_by_id.side_effect = lookup
+
+        entitlements = self.client.get_entitlements(users=test_users)
+
+        assert [e.user_descriptor for e in entitlements] == ["user-1", "user-2"]
+        assert sorted(call.args[0] for call in mock_get_by_id.call_args_list) == ["user-1", "user-3"]
+
+    def test_max_workers_capped_by_pool_size(self):
+        """Test that concurrency never exceeds the connection pool size."""
+        assert self.client.max_workers == 16
+        assert EntitlementsApiClient(self.auth, max_workers=500).max_workers == 50
+        assert EntitlementsApiClient(self.auth, max_workers=0).max_workers == 1
 
     def test_parse_entitlement(self):
         """Test parsing entitlement data per Microsoft API spec."""
@@ -392,11 +534,11 @@ class TestEntitlementsApiClient:
 class TestMembershipApiClient:
     """Tests for MembershipApiClient."""
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        config = AuthConfig(pat_token="test-token", organization="test-org")
-        self.auth = AzureDevOpsAuth(config)
-        self.client = MembershipApiClient(self.auth)
+    @pytest.fixture(autouse=True)
+    def setup_client(self, auth):
+        """Set up a client on the shared session authentication handler."""
+        self.auth = auth
+        self.client = MembershipApiClient(auth)
 
     @patch.object(MembershipApiClient, '_paginate_request')
     def test_get_group_memberships(self, mock_paginate):
@@ -422,6 +564,20 @@ class TestMembershipApiClient:
         assert memberships[0].member_descriptor == "user-1"
         assert memberships[0].member_type == SubjectKind.USER
 
+    @patch.object(MembershipApiClient, '_paginate_request')
+    def test_iter_group_memberships_streams(self, mock_paginate):
+        """Test that memberships are parsed as they are read, not collected first."""
+        raw_memberships = iter([
+            {"containerDescriptor": "group-1", "memberDescriptor": f"user-{i}", "subjectKind": "user"}
+            for i in range(5)
+        ])
+        mock_paginate.return_value = raw_memberships
+
+        first_two = list(islice(self.client.iter_group_memberships("group-1"), 2))
+
+        assert [m.member_descriptor for m in first_two] == ["user-0", "user-1"]
+        assert len(list(raw_memberships)) == 3
+
     @patch.object(MembershipApiClient, '_paginate_request')
     def test_get_user_memberships(self, mock_paginate):
         """Test retrieving user memberships."""
@@ -439,6 +595,21 @@ class TestMembershipApiClient:
         assert memberships[0].group_descriptor == "group-1"
         assert memberships[0].member_descriptor == "user-1"
 
+    @patch.object(MembershipApiClient, '_paginate_request')
+    def test_caches_repeat_lookups(self, mock_paginate):
+        """Test that repeated lookups of the same descriptor hit the API once."""
+        mock_paginate.side_effect = lambda url, params: iter([
+            {"containerDescriptor": "group-1", "memberDescriptor": "user-1", "subjectKind": "user"}
+        ])
+
+        first = self.client.get_group_memberships("group-1")
+        first.clear()
+        second = self.client.get_group_memberships("group-1")
+        self.client.get_group_memberships("group-2")
+
+        assert [m.member_descriptor for m in second] == ["user-1"]
+        assert mock_paginate.call_count == 2
+
     def test_parse_membership(self):
         """Test parsing membership data."""
         membership_data = {
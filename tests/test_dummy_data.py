@@ -2,11 +2,26 @@
 Tests for the dummy data generator module.
 """
 
+from collections import Counter
+
 import pytest
 from src.dummy_data import DummyDataGenerator
 from src.models import User, Group, Entitlement, GroupMembership, SubjectKind, AccessLevel
 
 
+@pytest.fixture(scope="module")
+def hundred_user_entitlements():
+    """Entitlements for 100 users from a freshly seeded generator, built once.
+
+    Tests must treat the list as read-only.
+
+    Returns:
+        List of 100 Entitlement objects.
+    """
+    generator = DummyDataGenerator(seed=42)
+    return generator.generate_entitlements(generator.generate_users(count=100))
+
+
 class TestDummyDataGenerator:
     """Test suite for DummyDataGenerator class."""
 
@@ -26,6 +41,7 @@ class TestDummyDataGenerator:
         assert all(user.display_name for user in users)
         assert all(user.principal_name for user in users)
         assert all(user.mail_address for user in users)
+        assert generator.generated_user_descriptors == {user.descriptor for user in users}
 
     def test_generate_groups(self, generator):
         """Test generating dummy groups."""
@@ -46,9 +62,8 @@ class TestDummyDataGenerator:
         assert all(isinstance(entitlement, Entitlement) for entitlement in entitlements)
 
         # Check that all users have entitlements
-        user_descriptors = {user.descriptor for user in users}
         entitlement_descriptors = {e.user_descriptor for e in entitlements}
-        assert user_descriptors == entitlement_descriptors
+        assert generator.generated_user_descriptors == entitlement_descriptors
 
         # Check variety of access levels
         access_levels = {e.access_level for e in entitlements}
@@ -57,7 +72,7 @@ class TestDummyDataGenerator:
     def test_generate_entitlements_without_users_raises_error(self, generator):
         """Test that generating entitlements without users raises an error."""
         with pytest.raises(ValueError, match="No users available"):
-            generator.generate_entitlements()
+            generator.generate_entitlements(users=[])
 
     def test_generate_memberships(self, generator):
         """Test generating dummy group memberships."""
@@ -69,8 +84,8 @@ class TestDummyDataGenerator:
         assert all(isinstance(membership, GroupMembership) for membership in memberships)
 
         # Check that memberships reference valid users and groups
-        user_descriptors = {user.descriptor for user in users}
-        group_descriptors = {group.descriptor for group in groups}
+        user_descriptors = generator.generated_user_descriptors
+        group_descriptors = generator.generated_group_descriptors
 
         for membership in memberships:
             if membership.member_type == SubjectKind.USER:
@@ -82,15 +97,15 @@ class TestDummyDataGenerator:
 
     def test_generate_memberships_without_users_raises_error(self, generator):
         """Test that generating memberships without users raises an error."""
-        groups = generator.generate_groups(count=5)
+        groups = [Group(descriptor="group-1", display_name="Group 1")]
         with pytest.raises(ValueError, match="No users available"):
-            generator.generate_memberships(groups=groups)
+            generator.generate_memberships(users=[], groups=groups)
 
     def test_generate_memberships_without_groups_raises_error(self, generator):
         """Test that generating memberships without groups raises an error."""
-        users = generator.generate_users(count=10)
+        users = [User(descriptor="user-1", display_name="User 1")]
         with pytest.raises(ValueError, match="No groups available"):
-            generator.generate_memberships(users=users)
+            generator.generate_memberships(users=users, groups=[])
 
     def test_generate_complete_dataset(self, generator):
         """Test generating a complete dataset."""
@@ -127,6 +142,15 @@ class TestDummyDataGenerator:
         assert len(data['entitlements']) == 10
         assert len(data['memberships']) > 0
 
+    def test_get_indexed(self, generator):
+        """Test retrieving generated data keyed by descriptor."""
+        users, groups, entitlements, _ = generator.generate_complete_dataset(num_users=10, num_groups=5)
+        users_by_descriptor, groups_by_descriptor, entitlements_by_user = generator.get_indexed()
+
+        assert list(users_by_descriptor.values()) == users
+        assert list(groups_by_descriptor.values()) == groups
+        assert all(entitlements_by_user[e.user_descriptor] is e for e in entitlements)
+
     def test_reproducibility_with_seed(self):
         """Test that using the same seed produces reproducible results."""
         # Generate data twice with the same seed to verify consistency
@@ -150,22 +174,15 @@ class TestDummyDataGenerator:
         for g1, g2 in zip(groups1, groups2):
             assert g1.display_name == g2.display_name
 
-    def test_access_level_distribution(self, generator):
+    def test_access_level_distribution(self, hundred_user_entitlements):
         """Test that entitlements have realistic access level distribution."""
-        users = generator.generate_users(count=100)
-        entitlements = generator.generate_entitlements(users)
-
-        # Count access levels
-        access_level_counts = {}
-        for entitlement in entitlements:
-            level = entitlement.access_level
-            access_level_counts[level] = access_level_counts.get(level, 0) + 1
+        access_level_counts = Counter(e.access_level for e in hundred_user_entitlements)
 
         # Should have multiple access levels represented
         assert len(access_level_counts) >= 3
 
         # Basic should be most common (around 60%)
-        assert access_level_counts.get(AccessLevel.BASIC, 0) > 40
+        assert access_level_counts[AccessLevel.BASIC] > 40
 
     def test_nested_group_memberships(self, generator):
         """Test that nested group memberships are created."""
@@ -181,12 +198,9 @@ class TestDummyDataGenerator:
 
         assert len(nested_memberships) > 0
 
-    def test_licensing_source_variety(self, generator):
+    def test_licensing_source_variety(self, hundred_user_entitlements):
         """Test that entitlements include different licensing sources."""
-        users = generator.generate_users(count=100)
-        entitlements = generator.generate_entitlements(users)
-
-        licensing_sources = {e.licensing_source for e in entitlements}
+        licensing_sources = {e.licensing_source for e in hundred_user_entitlements}
 
         # Should have both ACCOUNT and MSDN licensing sources
         assert len(licensing_sources) > 1
@@ -229,9 +243,7 @@ class TestDummyDataIntegration:
         # Create processor with dummy data (convert lists to dictionaries)
         report_config = ReportsConfig()
         processor = EntitlementDataProcessor(auth, config=report_config)
-        processor.users = {user.descriptor: user for user in users}
-        processor.groups = {group.descriptor: group for group in groups}
-        processor.entitlements = {ent.user_descriptor: ent for ent in entitlements}
+        processor.users, processor.groups, processor.entitlements = generator.get_indexed()
         processor.memberships = memberships
 
         # Process data
@@ -245,14 +257,12 @@ class TestDummyDataIntegration:
         assert report.total_entitlements == 30
         assert len(report.user_summaries) > 0
 
-    def test_report_generation_with_dummy_data(self):
+    def test_report_generation_with_dummy_data(self, tmp_path):
         """Test that reports can be generated with dummy data."""
         from src.data_processor import EntitlementDataProcessor
         from src.reporting import ReportGenerator
         from src.auth import AuthConfig, AzureDevOpsAuth
         from src.config import ReportsConfig
-        import tempfile
-        import shutil
         from pathlib import Path
 
         # Create dummy data
@@ -270,36 +280,27 @@ class TestDummyDataIntegration:
         auth = AzureDevOpsAuth(auth_config)
         report_config = ReportsConfig()
         processor = EntitlementDataProcessor(auth, config=report_config)
-        processor.users = {user.descriptor: user for user in users}
-        processor.groups = {group.descriptor: group for group in groups}
-        processor.entitlements = {ent.user_descriptor: ent for ent in entitlements}
+        processor.users, processor.groups, processor.entitlements = generator.get_indexed()
         processor.memberships = memberships
 
         # Process and generate report
         processor.process_user_entitlements()
         org_report = processor.generate_organization_report()
 
-        # Create temporary directory for reports
-        temp_dir = tempfile.mkdtemp()
-        try:
-            report_gen = ReportGenerator(temp_dir)
-            files = report_gen.generate_all_reports(org_report, formats=["csv", "json"])
-
-            # Verify files were created
-            assert "csv" in files
-            assert "json" in files
-
-            # Check CSV files
-            csv_files = files["csv"]
-            assert "user_summary" in csv_files
-            assert "chargeback" in csv_files
-            assert Path(csv_files["user_summary"]).exists()
-            assert Path(csv_files["chargeback"]).exists()
-
-            # Check JSON file
-            json_file = files["json"]
-            assert Path(json_file).exists()
-
-        finally:
-            # Cleanup
-            shutil.rmtree(temp_dir)
+        report_gen = ReportGenerator(str(tmp_path))
+        files = report_gen.generate_all_reports(org_report, formats=["csv", "json"])
+
+        # Verify files were created
+        assert "csv" in files
+        assert "json" in files
+
+        # Check CSV files
+        csv_files = files["csv"]
+        assert "user_summary" in csv_files
+        assert "chargeback" in csv_files
+        assert Path(csv_files["user_summary"]).exists()
+        assert Path(csv_files["chargeback"]).exists()
+
+        # Check JSON file
+        json_file = files["json"]
+        assert Path(json_file).exists()
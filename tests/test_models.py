@@ -2,9 +2,10 @@
 Tests for the data models module.
 """
 
+import json
 import pytest
 from datetime import datetime, timezone
-from pydantic import ValidationError
+from pydantic import TypeAdapter, ValidationError
 
 from src.models import (
     User, Group, Entitlement, GroupMembership, UserEntitlementSummary,
@@ -12,6 +13,24 @@ from src.models import (
 )
 
 
+FIXED_NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# Built once per module so every test reuses the same validators
+USER_ADAPTER = TypeAdapter(User)
+GROUP_ADAPTER = TypeAdapter(Group)
+
+FULL_ENTITLEMENT_JSON = json.dumps({
+    "user_descriptor": "user-123",
+    "access_level": "visualStudioSubscriber",
+    "license_display_name": "Visual Studio Subscriber",
+    "license_name": "vs-subscriber",
+    "account_license_type": "msdn",
+    "assignment_source": "group",
+    "project_entitlements": ["project-1", "project-2"],
+    "group_assignments": ["group-1", "group-2"]
+})
+
+
 class TestUser:
     """Tests for User model."""
 
@@ -29,18 +48,18 @@ class TestUser:
 
     def test_user_creation_full(self):
         """Test creating a user with all fields."""
-        user = User(
-            descriptor="user-123",
-            display_name="John Doe",
-            unique_name="john.doe@company.com",
-            principal_name="john.doe@company.com",
-            mail_address="john.doe@company.com",
-            domain="company.com",
-            origin="aad",
-            origin_id="aad-123",
-            is_active=True,
-            metadata={"custom": "value"}
-        )
+        user = USER_ADAPTER.validate_python({
+            "descriptor": "user-123",
+            "display_name": "John Doe",
+            "unique_name": "john.doe@company.com",
+            "principal_name": "john.doe@company.com",
+            "mail_address": "john.doe@company.com",
+            "domain": "company.com",
+            "origin": "aad",
+            "origin_id": "aad-123",
+            "is_active": True,
+            "metadata": {"custom": "value"}
+        })
 
         assert user.unique_name == "john.doe@company.com"
         assert user.domain == "company.com"
@@ -50,7 +69,7 @@ class TestUser:
     def test_user_empty_display_name(self):
         """Test that empty display name is rejected."""
         with pytest.raises(ValidationError, match="Name fields cannot be empty strings"):
-            User(descriptor="user-123", display_name="   ")
+            USER_ADAPTER.validate_python({"descriptor": "user-123", "display_name": "   "})
 
     def test_user_whitespace_stripping(self):
         """Test that whitespace is stripped from string fields."""
@@ -80,13 +99,13 @@ class TestGroup:
 
     def test_group_creation_with_members(self):
         """Test creating a group with members."""
-        group = Group(
-            descriptor="group-123",
-            display_name="Developers",
-            group_type=GroupType.AZURE_AD,
-            member_count=5,
-            members=["user-1", "user-2", "user-3"]
-        )
+        group = GROUP_ADAPTER.validate_python({
+            "descriptor": "group-123",
+            "display_name": "Developers",
+            "group_type": "azureActiveDirectory",
+            "member_count": 5,
+            "members": ["user-1", "user-2", "user-3"]
+        })
 
         assert group.group_type == GroupType.AZURE_AD
         assert group.member_count == 5
@@ -94,12 +113,12 @@ class TestGroup:
 
     def test_group_security_group(self):
         """Test group with security information."""
-        group = Group(
-            descriptor="group-123",
-            display_name="Security Group",
-            security_id="S-1-5-21-123456789",
-            is_security_group=True
-        )
+        group = GROUP_ADAPTER.validate_python({
+            "descriptor": "group-123",
+            "display_name": "Security Group",
+            "security_id": "S-1-5-21-123456789",
+            "is_security_group": True
+        })
 
         assert group.security_id == "S-1-5-21-123456789"
         assert group.is_security_group is True
@@ -122,16 +141,7 @@ class TestEntitlement:
 
     def test_entitlement_creation_full(self):
         """Test creating an entitlement with all fields."""
-        entitlement = Entitlement(
-            user_descriptor="user-123",
-            access_level=AccessLevel.VISUAL_STUDIO_SUBSCRIBER,
-            license_display_name="Visual Studio Subscriber",
-            license_name="vs-subscriber",
-            account_license_type="msdn",
-            assignment_source="group",
-            project_entitlements=["project-1", "project-2"],
-            group_assignments=["group-1", "group-2"]
-        )
+        entitlement = Entitlement.model_validate_json(FULL_ENTITLEMENT_JSON)
 
         assert entitlement.access_level == AccessLevel.VISUAL_STUDIO_SUBSCRIBER
         assert entitlement.license_display_name == "Visual Studio Subscriber"
@@ -172,19 +182,18 @@ class TestGroupMembership:
 
     def test_group_membership_with_metadata(self):
         """Test group membership with additional metadata."""
-        now = datetime.now(timezone.utc)
         membership = GroupMembership(
             group_descriptor="group-123",
             member_descriptor="group-456",
             member_type=SubjectKind.GROUP,
             is_active=True,
-            date_created=now,
+            date_created=FIXED_NOW,
             metadata={"source": "inheritance"}
         )
 
         assert membership.member_type == SubjectKind.GROUP
         assert membership.is_active is True
-        assert membership.date_created == now
+        assert membership.date_created == FIXED_NOW
         assert membership.metadata["source"] == "inheritance"
 
 
@@ -317,22 +326,19 @@ class TestOrganizationReport:
 class TestEnums:
     """Tests for enum types."""
 
-    def test_subject_kind_enum(self):
-        """Test SubjectKind enum values."""
-        assert SubjectKind.USER == "user"
-        assert SubjectKind.GROUP == "group"
-        assert SubjectKind.SERVICE_PRINCIPAL == "servicePrincipal"
-
-    def test_access_level_enum(self):
-        """Test AccessLevel enum values."""
-        assert AccessLevel.NONE == "none"
-        assert AccessLevel.BASIC == "basic"
-        assert AccessLevel.STAKEHOLDER == "stakeholder"
-        assert AccessLevel.VISUAL_STUDIO_SUBSCRIBER == "visualStudioSubscriber"
-
-    def test_group_type_enum(self):
-        """Test GroupType enum values."""
-        assert GroupType.WINDOWS == "windows"
-        assert GroupType.AZURE_AD == "azureActiveDirectory"
-        assert GroupType.SERVICE_PRINCIPAL == "servicePrincipal"
-        assert GroupType.UNKNOWN == "unknown"
\ No newline at end of file
+    @pytest.mark.parametrize("enum_value,expected", [
+        (SubjectKind.USER, "user"),
+        (SubjectKind.GROUP, "group"),
+        (SubjectKind.SERVICE_PRINCIPAL, "servicePrincipal"),
+        (AccessLevel.NONE, "none"),
+        (AccessLevel.BASIC, "basic"),
+        (AccessLevel.STAKEHOLDER, "stakeholder"),
+        (AccessLevel.VISUAL_STUDIO_SUBSCRIBER, "visualStudioSubscriber"),
+        (GroupType.WINDOWS, "windows"),
+        (GroupType.AZURE_AD, "azureActiveDirectory"),
+        (GroupType.SERVICE_PRINCIPAL, "servicePrincipal"),
+        (GroupType.UNKNOWN, "unknown"),
+    ])
+    def test_enum_value(self, enum_value, expected):
+        """Test enum members compare equal to their API string values."""
+        assert enum_value == expected
@@ -3,173 +3,274 @@ Tests for the reporting module.
 """
 
 import pytest
+import io
 import json
 import csv
-from pathlib import Path
-from unittest.mock import Mock, patch, mock_open
+import os
+import sys
+from unittest.mock import patch
 from datetime import datetime, timezone
-from tempfile import TemporaryDirectory
+from pathlib import Path
+from typing import NamedTuple
+
+from pydantic import TypeAdapter
 
-from src.reporting import ReportGenerator
+from src.reporting import ReportGenerator, ConsolidatedReportGenerator, _dump_json
 from src.models import (
     User, Group, Entitlement, UserEntitlementSummary, OrganizationReport,
-    AccessLevel, GroupType, SubjectKind
+    AccessLevel, GroupType
 )
 
 
-class TestReportGenerator:
-    """Tests for ReportGenerator."""
+FIXED_NOW = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# Built once per module so every test reuses the same validator and serializer
+REPORT_ADAPTER = TypeAdapter(OrganizationReport)
+
+
+class SampleData(NamedTuple):
+    """Sample models shared by the report generator tests."""
+
+    user1: User
+    user2: User
+    group1: Group
+    group2: Group
+    entitlement1: Entitlement
+    entitlement2: Entitlement
+    summary1: UserEntitlementSummary
+    summary2: UserEntitlementSummary
+    report: OrganizationReport
+
+
+def _read_csv(path):
+    """Read all data rows of a CSV file as dicts keyed by header."""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def _count_rows(path):
+    """Count the data rows of a CSV file without keeping them in memory."""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        return sum(1 for _ in csv.DictReader(f))
+
+
+def _csv_data_rows(path):
+    """Count the data rows of a CSV file by its line endings.
+
+    Only valid for files whose fields contain no embedded newlines.
+    """
+    return path.read_bytes().count(b"\n") - 1
+
+
+def _first_row(path):
+    """Read only the first data row of a CSV file, or None if it has none."""
+    with open(path, 'r', newline='', encoding='utf-8') as f:
+        return next(csv.DictReader(f), None)
+
+
+@pytest.fixture(scope="class")
+def sample_data():
+    """Sample users, groups and a two-user report, built once per test class.
+
+    Tests must treat the models as read-only; use ``mutable_report`` to
+    change the report.
+
+    Returns:
+        SampleData with the sample models.
+    """
+    user1 = User(
+        descriptor="user-1",
+        display_name="John Doe",
+        mail_address="john@test.com",
+        unique_name="john@test.com"
+    )
+
+    user2 = User(
+        descriptor="user-2",
+        display_name="Jane Smith",
+        mail_address="jane@test.com",
+        unique_name="jane@test.com"
+    )
+
+    group1 = Group(
+        descriptor="group-1",
+        display_name="Developers",
+        group_type=GroupType.AZURE_AD,
+        member_count=2
+    )
+
+    group2 = Group(
+        descriptor="group-2",
+        display_name="Managers",
+        group_type=GroupType.WINDOWS,
+        member_count=1
+    )
+
+    entitlement1 = Entitlement(
+        user_descriptor="user-1",
+        access_level=AccessLevel.BASIC,
+        last_accessed_date=FIXED_NOW
+    )
+
+    entitlement2 = Entitlement(
+        user_descriptor="user-2",
+        access_level=AccessLevel.STAKEHOLDER
+    )
+
+    summary1 = UserEntitlementSummary.model_construct(
+        user=user1,
+        entitlement=entitlement1,
+        direct_groups=[group1],
+        all_groups=[group1],
+        effective_access_level=AccessLevel.BASIC,
+        chargeback_groups=["Developers"],
+        license_cost=50.0,
+        last_updated=FIXED_NOW
+    )
+
+    summary2 = UserEntitlementSummary.model_construct(
+        user=user2,
+        entitlement=entitlement2,
+        direct_groups=[group2],
+        all_groups=[group2],
+        effective_access_level=AccessLevel.STAKEHOLDER,
+        chargeback_groups=["Managers"],
+        license_cost=25.0,
+        last_updated=FIXED_NOW
+    )
+
+    report = REPORT_ADAPTER.validate_python({
+        "organization": "test-org",
+        "total_users": 2,
+        "total_groups": 2,
+        "total_entitlements": 2,
+        "user_summaries": [summary1, summary2],
+        "groups_by_type": {"azureActiveDirectory": 1, "windows": 1},
+        "licenses_by_type": {"basic": 1, "stakeholder": 1},
+        "orphaned_groups": [],
+        "total_license_cost": 75.0,
+        "chargeback_by_group": {
+            "Developers": {
+                "total_users": 1,
+                "users": [
+                    {
+                        "user": "John Doe",
+                        "email": "john@test.com",
+                        "license": "basic",
+                        "cost": 50.0
+                    }
+                ],
+                "licenses": {"basic": 1},
+                "total_cost": 50.0
+            },
+            "Managers": {
+                "total_users": 1,
+                "users": [
+                    {
+                        "user": "Jane Smith",
+                        "email": "jane@test.com",
+                        "license": "stakeholder",
+                        "cost": 25.0
+                    }
+                ],
+                "licenses": {"stakeholder": 1},
+                "total_cost": 25.0
+            }
+        }
+    })
 
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.temp_dir = TemporaryDirectory()
-        self.output_dir = Path(self.temp_dir.name)
-        self.generator = ReportGenerator(str(self.output_dir))
-
-        # Create sample test data
-        self.sample_user1 = User(
-            descriptor="user-1",
-            display_name="John Doe",
-            mail_address="john@test.com",
-            unique_name="john@test.com"
-        )
+    return SampleData(
+        user1=user1, user2=user2,
+        group1=group1, group2=group2,
+        entitlement1=entitlement1, entitlement2=entitlement2,
+        summary1=summary1, summary2=summary2,
+        report=report
+    )
 
-        self.sample_user2 = User(
-            descriptor="user-2",
-            display_name="Jane Smith",
-            mail_address="jane@test.com",
-            unique_name="jane@test.com"
-        )
 
-        self.sample_group1 = Group(
-            descriptor="group-1",
-            display_name="Developers",
-            group_type=GroupType.AZURE_AD,
-            member_count=2
-        )
+@pytest.fixture(scope="class")
+def sample_report_json(sample_data):
+    """Serialize the sample report once per test class.
 
-        self.sample_group2 = Group(
-            descriptor="group-2",
-            display_name="Managers",
-            group_type=GroupType.WINDOWS,
-            member_count=1
-        )
+    Returns:
+        JSON bytes of the sample report.
+    """
+    return REPORT_ADAPTER.dump_json(sample_data.report)
 
-        self.sample_entitlement1 = Entitlement(
-            user_descriptor="user-1",
-            access_level=AccessLevel.BASIC,
-            last_accessed_date=datetime.now(timezone.utc)
-        )
 
-        self.sample_entitlement2 = Entitlement(
-            user_descriptor="user-2",
-            access_level=AccessLevel.STAKEHOLDER
-        )
+class TestReportGenerator:
+    """Tests for ReportGenerator."""
 
-        self.sample_summary1 = UserEntitlementSummary(
-            user=self.sample_user1,
-            entitlement=self.sample_entitlement1,
-            direct_groups=[self.sample_group1],
-            all_groups=[self.sample_group1],
-            effective_access_level=AccessLevel.BASIC,
-            chargeback_groups=["Developers"],
-            license_cost=50.0
-        )
+    @pytest.fixture
+    def mutable_report(self, sample_report_json):
+        """Fresh copy of the sample report that a single test may modify.
 
-        self.sample_summary2 = UserEntitlementSummary(
-            user=self.sample_user2,
-            entitlement=self.sample_entitlement2,
-            direct_groups=[self.sample_group2],
-            all_groups=[self.sample_group2],
-            effective_access_level=AccessLevel.STAKEHOLDER,
-            chargeback_groups=["Managers"],
-            license_cost=25.0
-        )
+        The copy is validated straight from JSON, which is cheaper than a
+        deep copy or validating from Python objects.
 
-        self.sample_report = OrganizationReport(
-            organization="test-org",
-            total_users=2,
-            total_groups=2,
-            total_entitlements=2,
-            user_summaries=[self.sample_summary1, self.sample_summary2],
-            groups_by_type={"azureActiveDirectory": 1, "windows": 1},
-            licenses_by_type={"basic": 1, "stakeholder": 1},
-            orphaned_groups=[],
-            total_license_cost=75.0,
-            chargeback_by_group={
-                "Developers": {
-                    "total_users": 1,
-                    "users": [
-                        {
-                            "user": "John Doe",
-                            "email": "john@test.com",
-                            "license": "basic",
-                            "cost": 50.0
-                        }
-                    ],
-                    "licenses": {"basic": 1},
-                    "total_cost": 50.0
-                },
-                "Managers": {
-                    "total_users": 1,
-                    "users": [
-                        {
-                            "user": "Jane Smith",
-                            "email": "jane@test.com",
-                            "license": "stakeholder",
-                            "cost": 25.0
-                        }
-                    ],
-                    "licenses": {"stakeholder": 1},
-                    "total_cost": 25.0
-                }
-            }
-        )
+        Returns:
+            OrganizationReport owned by the calling test.
+        """
+        return REPORT_ADAPTER.validate_json(sample_report_json)
 
-    def teardown_method(self):
-        """Clean up test fixtures."""
-        self.temp_dir.cleanup()
+    @pytest.fixture
+    def output_dir(self, tmp_path):
+        """Empty output directory for a single test.
 
-    def test_init(self):
-        """Test report generator initialization."""
-        assert self.generator.output_directory == self.output_dir
-        assert self.output_dir.exists()
+        Returns:
+            Path to the output directory.
+        """
+        return tmp_path
 
-    def test_init_creates_directory(self):
-        """Test that initialization creates output directory."""
-        with TemporaryDirectory() as temp_dir:
-            non_existent_dir = Path(temp_dir) / "reports"
-            generator = ReportGenerator(str(non_existent_dir))
-            assert non_existent_dir.exists()
+    @pytest.fixture
+    def generator(self, output_dir):
+        """Report generator writing to the test's output directory.
 
-    def test_generate_csv_reports(self):
-        """Test CSV reports generation."""
-        result = self.generator.generate_csv_reports(self.sample_report)
+        Returns:
+            ReportGenerator for ``output_dir``.
+        """
+        return ReportGenerator(str(output_dir))
 
-        assert len(result) == 4  # user_summary, chargeback, group_analysis, license_summary
+    def test_init(self, generator, output_dir):
+        """Test report generator initialization."""
+        assert generator.output_directory == output_dir
+        assert output_dir.exists()
 
-        # Check that all files were created
-        for report_type, file_path in result.items():
+    def test_init_creates_directory(self, tmp_path):
+        """Test that initialization creates output directory."""
+        non_existent_dir = tmp_path / "reports"
+        ReportGenerator(str(non_existent_dir))
+        assert non_existent_dir.exists()
+
+    @pytest.mark.parametrize("method,suffix", [
+        ("generate_csv_reports", ".csv"),
+        ("generate_json_report", ".json"),
+        ("generate_excel_report", ".xlsx"),
+    ])
+    def test_generate_single_format(self, sample_data, generator, method, suffix):
+        """Test each format generator writes its files with the expected suffix."""
+        result = getattr(generator, method)(sample_data.report)
+
+        # CSV output is one file per report type
+        file_paths = list(result.values()) if isinstance(result, dict) else [result]
+        if suffix == ".csv":
+            assert len(file_paths) == 4  # user_summary, chargeback, group_analysis, license_summary
+
+        for file_path in file_paths:
             assert file_path.exists()
-            assert file_path.suffix == ".csv"
-
-            # Check that files have content
-            with open(file_path, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                rows = list(reader)
-                # Some reports might be empty if no data, but headers should exist
-                assert reader.fieldnames is not None
+            assert file_path.suffix == suffix
 
-    def test_generate_json_report(self):
-        """Test JSON report generation."""
-        result = self.generator.generate_json_report(self.sample_report)
+            # Headers should exist even for reports without rows
+            if suffix == ".csv":
+                with open(file_path, 'r', newline='', encoding='utf-8') as f:
+                    assert csv.DictReader(f).fieldnames is not None
 
-        assert result.exists()
-        assert result.suffix == ".json"
+    def test_generate_json_report(self, sample_data, generator):
+        """Test JSON report content."""
+        output = io.BytesIO()
+        generator._write_json(sample_data.report, generator._prepare(sample_data.report), output)
 
-        # Verify JSON content
-        with open(result, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = json.loads(output.getvalue())
 
         assert data["metadata"]["organization"] == "test-org"
         assert data["metadata"]["total_users"] == 2
@@ -177,46 +278,211 @@ class TestReportGenerator:
         assert len(data["user_summaries"]) == 2
         assert "chargeback_analysis" in data
 
-    def test_generate_excel_report(self):
-        """Test Excel report generation."""
-        result = self.generator.generate_excel_report(self.sample_report)
+    def test_generate_json_report_stdlib_fallback(self, sample_data, generator):
+        """Test the JSON report is identical when orjson is not installed."""
+        expected = json.loads(generator.generate_json_report(sample_data.report).read_bytes())
 
-        assert result.exists()
-        assert result.suffix == ".xlsx"
+        with patch('src.reporting.orjson', None):
+            result = generator.generate_json_report(sample_data.report)
 
-    def test_generate_all_reports_csv_only(self):
-        """Test generating all reports with CSV format only."""
-        result = self.generator.generate_all_reports(self.sample_report, ["csv"])
+        assert json.loads(result.read_bytes()) == expected
 
-        assert "csv" in result
-        assert len(result) == 1
+    def test_dump_json_backends_agree(self, sample_data):
+        """Test both JSON backends serialize the same report and raw values identically."""
+        report_data = sample_data.report.model_dump()
+        extra = {"when": FIXED_NOW, "day": FIXED_NOW.date(), "level": AccessLevel.BASIC, "path": Path("a/b")}
+
+        expected = [json.loads(_dump_json(obj)) for obj in (report_data, extra)]
+        with patch('src.reporting.orjson', None):
+            result = [json.loads(_dump_json(obj)) for obj in (report_data, extra)]
+
+        assert result == expected
+        assert expected[1]["when"] == FIXED_NOW.isoformat()
+
+    def test_iter_json_chunks_streams_one_chunk_per_summary(self, sample_data, generator):
+        """Test each user summary is serialized as its own chunk."""
+        chunks = list(generator._iter_json_chunks(sample_data.report, generator._prepare(sample_data.report)))
+        summary_chunks = [chunk for chunk in chunks if b'"display_name": "' in chunk and b'"user"' in chunk]
 
-        csv_files = result["csv"]
-        assert len(csv_files) == 4
-        assert "user_summary" in csv_files
-        assert "chargeback" in csv_files
-        assert "group_analysis" in csv_files
-        assert "license_summary" in csv_files
+        assert len(summary_chunks) == 2
+        assert json.loads(b''.join(chunks))["user_summaries"][1]["user"]["display_name"] == "Jane Smith"
+
+    def test_generate_json_report_empty(self, generator):
+        """Test the streamed JSON report is valid for an empty report."""
+        empty_report = REPORT_ADAPTER.validate_python({"organization": "empty-org"})
+        output = io.BytesIO()
+        generator._write_json(empty_report, generator._prepare(empty_report), output)
+
+        data = json.loads(output.getvalue())
 
-    def test_generate_all_reports_all_formats(self):
-        """Test generating all reports with all formats."""
-        result = self.generator.generate_all_reports(
-            self.sample_report,
-            ["csv", "json", "excel"]
-        )
+        assert data["user_summaries"] == []
+        assert data["orphaned_groups"] == []
+
+    def test_excel_report_writes_strings_literally(self, mutable_report, generator):
+        """Test formula-like and URL-like names are stored as plain text in Excel."""
+        openpyxl = pytest.importorskip("openpyxl")
+        mutable_report.user_summaries[0].user.display_name = "=HYPERLINK(\"http://example.com\")"
+
+        result = generator.generate_excel_report(mutable_report)
+
+        sheet = openpyxl.load_workbook(result)["User Details"]
+        cell = sheet["B2"]
+        assert cell.value == "=HYPERLINK(\"http://example.com\")"
+        assert cell.data_type == "s"
+
+    def test_excel_numeric_sheets_store_numbers(self, sample_data, generator):
+        """Test chargeback and license counts and costs are written as numeric cells."""
+        openpyxl = pytest.importorskip("openpyxl")
+
+        result = generator.generate_excel_report(sample_data.report)
+
+        workbook = openpyxl.load_workbook(result)
+        chargeback_row = next(workbook["Chargeback Analysis"].iter_rows(min_row=2, max_row=2))
+        assert chargeback_row[0].data_type == "s"
+        assert all(cell.data_type == "n" for cell in chargeback_row[1:])
+        assert chargeback_row[6].value == 50
+        license_row = next(workbook["License Analysis"].iter_rows(min_row=2, max_row=2))
+        assert [cell.data_type for cell in license_row] == ["s", "n", "s", "s"]
+
+    def test_excel_report_openpyxl_fallback(self, mutable_report, generator):
+        """Test the workbook is written with openpyxl when xlsxwriter is unavailable."""
+        openpyxl = pytest.importorskip("openpyxl")
+        mutable_report.user_summaries[0].user.display_name = "=1+1"
+
+        with patch('src.reporting.xlsxwriter', None):
+            result = generator.generate_excel_report(mutable_report)
+
+        workbook = openpyxl.load_workbook(result)
+        assert workbook.sheetnames == [
+            "Summary", "User Details", "Chargeback Analysis", "Group Analysis", "License Analysis"
+        ]
+        sheet = workbook["User Details"]
+        assert sheet["A1"].font.b
+        assert sheet["B2"].value == "=1+1"
+        assert sheet["B2"].data_type == "s"
+
+    def test_excel_report_mmap_output(self, sample_data, generator, output_dir):
+        """Test the memory-mapped Excel write produces the same workbook."""
+        openpyxl = pytest.importorskip("openpyxl")
+        generator = ReportGenerator(str(output_dir / "mmap"), mmap_excel_output=True)
+
+        result = generator.generate_excel_report(sample_data.report)
+
+        workbook = openpyxl.load_workbook(result)
+        assert workbook["User Details"]["B3"].value == "Jane Smith"
+        assert workbook["License Analysis"].max_row == 3
+
+    def test_excel_report_split_sheets(self, sample_data, generator, output_dir):
+        """Test each worksheet is written to its own workbook when sheets are split."""
+        openpyxl = pytest.importorskip("openpyxl")
+        generator = ReportGenerator(str(output_dir), include_timestamp=False, split_excel_sheets=True)
+
+        result = generator.generate_excel_report(sample_data.report)
+
+        assert list(result) == ["summary", "user_details", "chargeback", "group_analysis", "license_analysis"]
+        assert result["chargeback"].name == "test-org_chargeback.xlsx"
+        assert openpyxl.load_workbook(result["user_details"]).sheetnames == ["User Details"]
+
+    @pytest.mark.parametrize("formats,expected_keys", [
+        (["csv"], {"csv"}),
+        (["csv", "json", "excel"], {"csv", "json", "excel"}),
+        # Unknown formats are logged and skipped rather than raising
+        (["invalid"], set()),
+    ])
+    def test_generate_all_reports(self, sample_data, generator, formats, expected_keys):
+        """Test generating all reports for a list of formats."""
+        result = generator.generate_all_reports(sample_data.report, formats)
+
+        assert set(result) == expected_keys
+        if "csv" in expected_keys:
+            assert set(result["csv"]) == {"user_summary", "chargeback", "group_analysis", "license_summary"}
+
+    def test_generate_all_reports_failed_format(self, sample_data, generator):
+        """Test a failing format is logged and skipped without blocking the others."""
+        with patch.object(generator, '_generate_json_report', side_effect=OSError("disk full")):
+            result = generator.generate_all_reports(sample_data.report, ["csv", "json", "excel"])
+
+        assert list(result) == ["csv", "excel"]
+
+    def test_prepare_summary_views(self, sample_data, generator):
+        """Test display strings are derived once per summary."""
+        prepared = generator._prepare(sample_data.report)
+
+        assert prepared.summary_views[0].all_group_names == ("Developers",)
+        assert prepared.summary_views[1].chargeback_groups == "Managers"
+
+    def test_prepare_chargeback_rows(self, sample_data, generator):
+        """Test chargeback rows are derived once with per-user cost."""
+        rows = generator._prepare(sample_data.report).chargeback_rows
 
-        assert len(result) == 3
-        assert "csv" in result
-        assert "json" in result
-        assert "excel" in result
+        assert [row["Group Name"] for row in rows] == ["Developers", "Managers"]
+        assert rows[0]["Total Cost"] == 50.0
+        assert rows[0]["Cost Per User"] == 50.0
+        assert rows[0]["Other Licenses"] == 1
+
+    def test_prepare_license_rows(self, sample_data, generator):
+        """Test license rows and total are derived once for CSV and Excel."""
+        prepared = generator._prepare(sample_data.report)
+
+        assert prepared.license_rows == [("Basic", 1, "50.0%"), ("Stakeholder", 1, "50.0%")]
+        assert prepared.total_licenses == 2
+
+    def test_prepare_unique_groups(self, sample_data, mutable_report, generator):
+        """Test unique groups skip VSTS groups and include orphans once."""
+        vsts_group = Group(descriptor="group-vsts", display_name="Project Valid Users", origin="vsts")
+        orphan_group = Group(descriptor="group-orphan", display_name="Empty Team")
+        mutable_report.user_summaries[0].all_groups.append(vsts_group)
+        mutable_report.orphaned_groups = [orphan_group, sample_data.group1]
 
-    def test_generate_all_reports_invalid_format(self):
-        """Test generating reports with invalid format."""
-        result = self.generator.generate_all_reports(self.sample_report, ["invalid"])
-        # Should just log warning and continue, not raise exception
-        assert len(result) == 0
+        prepared = generator._prepare(mutable_report)
+
+        assert [g.descriptor for g in prepared.unique_groups] == ["group-1", "group-2", "group-orphan"]
+        assert prepared.orphan_descriptors == {"group-orphan", "group-1"}
+
+    def test_unique_groups_collected_once_across_formats(self, sample_data, generator):
+        """Test every format reuses one group index per report."""
+        import src.reporting
 
-    def test_csv_special_characters(self):
+        with patch('src.reporting._collect_all_groups', wraps=src.reporting._collect_all_groups) as collect:
+            generator.generate_all_reports(sample_data.report, ["csv", "json", "excel"])
+
+        assert collect.call_count == 1
+
+    def test_regenerating_changed_report_uses_current_data(self, mutable_report, generator):
+        """Test a report changed after generation is not written from stale derived data."""
+        generator.generate_csv_reports(mutable_report)
+        mutable_report.user_summaries.pop(0)
+        mutable_report.chargeback_by_group.pop("Developers")
+
+        result = generator.generate_csv_reports(mutable_report)
+
+        rows = _read_csv(result["user_summary"])
+        assert [(row["User Name"], row["Direct Groups"]) for row in rows] == [("Jane Smith", "Managers")]
+        assert [row["Group Name"] for row in _read_csv(result["chargeback"])] == ["Managers"]
+
+    def test_group_analysis_csv_matches_orphans_by_descriptor(self, sample_data, mutable_report, generator):
+        """Test orphan status is matched by descriptor, not by model equality."""
+        stale_copy = sample_data.group2.model_copy(update={"member_count": 0})
+        mutable_report.orphaned_groups = [stale_copy]
+
+        result = generator.generate_csv_reports(mutable_report)
+
+        rows = {row["Group Name"]: row for row in _read_csv(result["group_analysis"])}
+
+        assert rows["Developers"]["Is Orphaned"] == "No"
+        assert rows["Managers"]["Is Orphaned"] == "Yes"
+
+    def test_user_details_sheet_rows(self, sample_data, generator):
+        """Test User Details rows follow the header in summary order."""
+        sheet = generator._user_details_sheet(sample_data.report, generator._prepare(sample_data.report))
+        rows = [dict(zip(sheet.header, row)) for row in sheet.rows]
+
+        assert [row["User Name"] for row in rows] == ["John Doe", "Jane Smith"]
+        assert [row["Chargeback Groups"] for row in rows] == ["Developers", "Managers"]
+        assert rows[0]["Total Groups Count"] == 1
+        assert rows[1]["License Cost"] == 25.0
+
+    def test_csv_special_characters(self, sample_data, generator):
         """Test CSV generation with special characters."""
         # Create user with special characters
         special_user = User(
@@ -225,88 +491,111 @@ class TestReportGenerator:
             mail_address="john@test.com"
         )
 
-        special_summary = UserEntitlementSummary(
+        special_summary = UserEntitlementSummary.model_construct(
             user=special_user,
-            entitlement=self.sample_entitlement1,
-            chargeback_groups=["Team, with \"comma\""]
+            entitlement=sample_data.entitlement1,
+            chargeback_groups=["Team, with \"comma\""],
+            last_updated=FIXED_NOW
         )
 
-        special_report = OrganizationReport(
-            organization="test-org",
-            user_summaries=[special_summary]
-        )
+        special_report = REPORT_ADAPTER.validate_python({
+            "organization": "test-org",
+            "user_summaries": [special_summary]
+        })
 
-        result = self.generator.generate_csv_reports(special_report)
+        result = generator.generate_csv_reports(special_report)
 
         # Verify the file was created and can be read
         user_summary_file = result["user_summary"]
-        with open(user_summary_file, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            rows = list(reader)
+        assert _count_rows(user_summary_file) == 1
+        assert _first_row(user_summary_file)["User Name"] == "John, \"Special\" User"
 
-        assert len(rows) == 1
-        assert rows[0]["User Name"] == "John, \"Special\" User"
+    def test_chargeback_csv_quotes_special_group_names(self, mutable_report, generator):
+        """Test chargeback CSV rows stay parseable when group names need quoting."""
+        mutable_report.chargeback_by_group["Team, with \"comma\""] = {
+            "total_users": 2,
+            "licenses": {"Basic": 2},
+            "total_cost": 12.0
+        }
+
+        result = generator.generate_csv_reports(mutable_report)
+
+        rows = _read_csv(result["chargeback"])
+
+        assert [row["Group Name"] for row in rows] == ["Developers", "Managers", "Team, with \"comma\""]
+        assert rows[2]["Basic Licenses"] == "2"
+        assert rows[2]["Cost Per User"] == "6.00"
+
+    def test_license_summary_csv_quotes_license_names(self, mutable_report, generator):
+        """Test license summary rows stay parseable when a license name needs quoting."""
+        mutable_report.licenses_by_type = {"Basic, Test Plans": 3, "basic": 1}
+
+        result = generator.generate_csv_reports(mutable_report)
+
+        rows = _read_csv(result["license_summary"])
+
+        assert [row["License Type"] for row in rows] == ["Basic, Test Plans", "Basic", "TOTAL"]
+        assert rows[0]["Percentage"] == "75.0%"
+        assert rows[2]["Count"] == "4"
 
-    def test_empty_report(self):
+    def test_empty_report(self, generator):
         """Test generating reports with empty data."""
-        empty_report = OrganizationReport(
-            organization="empty-org",
-            user_summaries=[]
-        )
+        empty_report = REPORT_ADAPTER.validate_python({
+            "organization": "empty-org",
+            "user_summaries": []
+        })
 
-        result = self.generator.generate_csv_reports(empty_report)
+        result = generator.generate_csv_reports(empty_report)
 
         # Files should still be created with headers
         for report_type, file_path in result.items():
             assert file_path.exists()
 
-            with open(file_path, 'r', newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                rows = list(reader)
-                # User summary should have no rows, but other reports might have summary data
-                if report_type == "user_summary":
-                    assert len(rows) == 0  # Only headers, no data
-                else:
-                    # Other reports might have summary rows even with empty data
-                    assert len(rows) >= 0
-
-    def test_large_dataset(self):
+            # User summary should have no rows, but other reports might have summary data
+            if report_type == "user_summary":
+                assert _csv_data_rows(file_path) == 0  # Only headers, no data
+            else:
+                # Other reports might have summary rows even with empty data
+                assert _count_rows(file_path) >= 0
+
+    @pytest.mark.parametrize("user_count", [10, pytest.param(100, marks=pytest.mark.slow)])
+    def test_large_dataset(self, generator, user_count):
         """Test handling of large datasets."""
-        # Create a larger dataset
-        large_summaries = []
-        for i in range(100):
-            user = User(
-                descriptor=f"user-{i}",
-                display_name=f"User {i}",
-                mail_address=f"user{i}@test.com"
-            )
-            summary = UserEntitlementSummary(
-                user=user,
-                entitlement=Entitlement(
-                    user_descriptor=f"user-{i}",
-                    access_level=AccessLevel.BASIC
-                ),
-                chargeback_groups=[f"Group-{i % 10}"]
+        # Only the first summary is validated; the rest skip validation since
+        # the test is about writing rows, not about the models
+        large_summaries = [UserEntitlementSummary(
+            user=User(descriptor="user-0", display_name="User 0", mail_address="user0@test.com"),
+            entitlement=Entitlement(user_descriptor="user-0", access_level=AccessLevel.BASIC),
+            chargeback_groups=["Group-0"]
+        )]
+        indices = range(1, user_count)
+        users = [
+            User.model_construct(descriptor=f"user-{i}", display_name=f"User {i}", mail_address=f"user{i}@test.com")
+            for i in indices
+        ]
+        entitlements = [
+            Entitlement.model_construct(user_descriptor=f"user-{i}", access_level=AccessLevel.BASIC)
+            for i in indices
+        ]
+        large_summaries.extend(
+            UserEntitlementSummary.model_construct(
+                user=user, entitlement=entitlement, chargeback_groups=[f"Group-{i % 10}"]
             )
-            large_summaries.append(summary)
+            for i, user, entitlement in zip(indices, users, entitlements)
+        )
 
-        large_report = OrganizationReport(
+        large_report = OrganizationReport.model_construct(
             organization="large-org",
-            total_users=100,
+            total_users=user_count,
             user_summaries=large_summaries
         )
 
-        result = self.generator.generate_csv_reports(large_report)
+        result = generator.generate_csv_reports(large_report)
 
         # Verify all data was written
-        user_summary_file = result["user_summary"]
-        with open(user_summary_file, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            rows = list(reader)
+        assert _csv_data_rows(result["user_summary"]) == user_count
 
-        assert len(rows) == 100
-
-    def test_unicode_handling(self):
+    def test_unicode_handling(self, sample_data, generator):
         """Test handling of Unicode characters."""
         unicode_user = User(
             descriptor="user-unicode",
@@ -314,38 +603,96 @@ class TestReportGenerator:
             mail_address="jose@test.com"
         )
 
-        unicode_summary = UserEntitlementSummary(
+        unicode_summary = UserEntitlementSummary.model_construct(
             user=unicode_user,
-            entitlement=self.sample_entitlement1,
-            chargeback_groups=["Développeurs"]
+            entitlement=sample_data.entitlement1,
+            chargeback_groups=["Développeurs"],
+            last_updated=FIXED_NOW
         )
 
-        unicode_report = OrganizationReport(
-            organization="test-org",
-            user_summaries=[unicode_summary]
-        )
+        unicode_report = REPORT_ADAPTER.validate_python({
+            "organization": "test-org",
+            "user_summaries": [unicode_summary]
+        })
 
-        result = self.generator.generate_csv_reports(unicode_report)
+        result = generator.generate_csv_reports(unicode_report)
 
         # Verify Unicode characters are preserved
         user_summary_file = result["user_summary"]
-        with open(user_summary_file, 'r', newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            rows = list(reader)
-
-        assert len(rows) == 1
-        assert rows[0]["User Name"] == "José María Azañar"
-        assert "Développeurs" in rows[0]["Chargeback Groups"]
-
-    @patch('builtins.open', side_effect=PermissionError("Permission denied"))
-    def test_file_permission_error(self, mock_open):
+        assert _count_rows(user_summary_file) == 1
+        row = _first_row(user_summary_file)
+        assert row["User Name"] == "José María Azañar"
+        assert "Développeurs" in row["Chargeback Groups"]
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="chmod does not restrict directories on Windows")
+    @pytest.mark.skipif(hasattr(os, "geteuid") and os.geteuid() == 0, reason="root ignores directory permissions")
+    def test_file_permission_error(self, sample_data, generator, output_dir):
         """Test handling of file permission errors."""
-        with pytest.raises(PermissionError):
-            self.generator.generate_csv_reports(self.sample_report)
-
-    def test_output_directory_permissions(self):
+        os.chmod(output_dir, 0o500)
+        try:
+            with pytest.raises(PermissionError):
+                generator.generate_csv_reports(sample_data.report)
+        finally:
+            os.chmod(output_dir, 0o700)
+
+    def test_output_directory_permissions(self, generator):
         """Test behavior when output directory has limited permissions."""
         # This test would need to be run with appropriate permissions
         # For now, just verify the directory exists
-        assert self.generator.output_directory.exists()
-        assert self.generator.output_directory.is_dir()
\ No newline at end of file
+        assert generator.output_directory.exists()
+        assert generator.output_directory.is_dir()
+
+
+class TestConsolidatedReportGenerator:
+    """Tests for ConsolidatedReportGenerator."""
+
+    @pytest.fixture
+    def generator(self, tmp_path):
+        """Consolidated report generator writing undated files to ``tmp_path``.
+
+        Returns:
+            ConsolidatedReportGenerator for the test's temporary directory.
+        """
+        return ConsolidatedReportGenerator(str(tmp_path), include_timestamp=False)
+
+    def _make_report(self, organization, chargeback_groups, cost):
+        user = User(descriptor=f"{organization}-user", display_name="John Doe", mail_address="john@test.com")
+        summary = UserEntitlementSummary.model_construct(
+            user=user,
+            entitlement=Entitlement(
+                user_descriptor=user.descriptor,
+                access_level=AccessLevel.BASIC,
+                license_display_name="Basic"
+            ),
+            chargeback_groups=chargeback_groups,
+            license_cost=cost,
+            last_updated=FIXED_NOW
+        )
+        return REPORT_ADAPTER.validate_python({"organization": organization, "user_summaries": [summary]})
+
+    def test_consolidated_user_report_merges_users(self, generator):
+        """Test users in several organizations are merged with sorted, deduplicated groups."""
+        reports = [
+            self._make_report("org-a", ["Zeta", "Alpha"], 6.0),
+            self._make_report("org-b", ["Beta", "Zeta"], 52.0)
+        ]
+
+        file_path = generator.generate_consolidated_user_report(reports)
+
+        rows = _read_csv(file_path)
+
+        assert len(rows) == 1
+        assert rows[0]["Organizations"] == "org-a, org-b"
+        assert rows[0]["Chargeback Groups"] == "Alpha; Beta; Zeta"
+        assert rows[0]["Total License Cost"] == "58.00"
+
+    def test_consolidated_reports_share_timestamp(self, tmp_path):
+        """Test consolidated reports from one generator get matching filename timestamps."""
+        generator = ConsolidatedReportGenerator(str(tmp_path))
+        reports = [self._make_report("org-a", ["Alpha"], 6.0)]
+
+        user_file = generator.generate_consolidated_user_report(reports)
+        chargeback_file = generator.generate_consolidated_chargeback_report(reports)
+
+        assert user_file.name == f"all_organizations_users_{generator.timestamp}.csv"
+        assert chargeback_file.name == f"all_organizations_chargeback_{generator.timestamp}.csv"